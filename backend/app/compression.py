@@ -0,0 +1,84 @@
+# app/compression.py
+"""
+Kompresja odpowiedzi: brotli, gdy klient go przyjmuje i moduł jest
+zainstalowany, w przeciwnym razie gzip (GZipMiddleware ze Starlette).
+
+Terminale na hali chodzą po słabym Wi-Fi – lista form (~0,5 MB JSON) po
+kompresji to kilkadziesiąt KB. Poniżej minimum_size odpowiedź idzie bez
+zmian (nagłówki i ramki kosztowałyby więcej niż zysk). Zdjęcia, pliki
+spakowane i strumienie SSE są pomijane (DEFAULT_EXCLUDED_CONTENT_TYPES).
+
+Poziomy są dobrane pod dynamiczne odpowiedzi, a nie pliki statyczne:
+gzip 6 i brotli 4 ściskają prawie tak samo jak maksymalne, a wielokrotnie
+szybciej. Duże ciała kompresowane są w wątku, żeby nie blokować pętli.
+"""
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+
+try:
+    import brotli
+except ImportError:  # brotli jest opcjonalny – bez niego tylko gzip
+    brotli = None
+
+
+def quality_values(header: str) -> dict:
+    """Accept / Accept-Encoding -> {wartość: q}; "gzip;q=0" oznacza odmowę."""
+    out = {}
+    for part in header.split(","):
+        name, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            out[name.strip().lower()] = q
+    return out
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int, thread_minimum_size: int, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self.thread_minimum_size = thread_minimum_size
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= self.thread_minimum_size:
+            return await run_in_threadpool(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=self.quality)
+        out = self._compressor.process(body)
+        return out + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=gzip_level)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = quality_values(Headers(scope=scope).get("accept-encoding", ""))
+        options = {"minimum_size": self.minimum_size, "exclude_content_types": self.exclude_content_types}
+        if brotli is not None and accepted.get("br", 0) > 0:
+            responder = BrotliResponder(self.app, quality=self.brotli_quality,
+                                        thread_minimum_size=self.thread_minimum_size, **options)
+        elif accepted.get("gzip", 0) > 0:
+            responder = GZipResponder(self.app, compresslevel=self.compresslevel,
+                                      thread_minimum_size=self.thread_minimum_size, **options)
+        else:
+            responder = IdentityResponder(self.app, **options)
+        await responder(scope, receive, send)
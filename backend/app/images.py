@@ -1,34 +1,301 @@
 # app/images.py
-from pathlib import Path
-from datetime import date
-from uuid import uuid4
-from fastapi import UploadFile
+import asyncio
+import functools
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app import settings
+
+# Pillow jest opcjonalny – bez niego nie generujemy miniatur. Sam import (~20 ms)
+# robi dopiero make_derivatives w procesach puli, nie start workera.
+HAS_PILLOW = find_spec("PIL") is not None
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent  # jeśli images.py jest w app/
 MEDIA_ROOT = BASE_DIR / "media"                    # musi pasować do main.py
 
-async def save_upload_file(upload_file: UploadFile, media_dir: str = "media"):
+# limity uploadu (zmienne środowiskowe w app/settings.py)
+MAX_UPLOAD_BYTES = settings.MEDIA_MAX_UPLOAD_MB * 1024 * 1024
+ALLOWED_CONTENT_TYPES = settings.MEDIA_ALLOWED_CONTENT_TYPES
+CHUNK_SIZE = 1024 * 1024
+# pliki w trakcie uploadu (przed policzeniem hasha) – ten sam system plików co magazyn
+INCOMING_DIR = ".incoming"
+# ile plików z jednego formularza zapisujemy równolegle
+UPLOAD_CONCURRENCY = settings.MEDIA_UPLOAD_CONCURRENCY
+
+# pochodne zdjęć: <nazwa>.thumb.webp / <nazwa>.medium.webp obok oryginału
+DERIVATIVE_SIZES = {"thumb": 320, "medium": 1280}
+DERIVATIVE_FORMAT = "JPEG" if settings.MEDIA_DERIVATIVE_FORMAT in ("jpg", "jpeg") else "WEBP"
+DERIVATIVE_EXT = ".jpg" if DERIVATIVE_FORMAT == "JPEG" else ".webp"
+DERIVATIVE_QUALITY = settings.MEDIA_DERIVATIVE_QUALITY
+DERIVATIVE_WORKERS = settings.MEDIA_DERIVATIVE_WORKERS
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff", ".gif"}
+
+_derivative_pool: Optional[ProcessPoolExecutor] = None
+_pending_derivatives = set()
+# URL-e oryginałów, których miniatury są na dysku – kopia media_blobs.derivatives,
+# odświeżana w tle (app/media_refs.py); photo_variants nie dotyka dysku ani bazy
+_ready_derivatives = set()
+
+
+def _open_temp(target_dir: Path):
+    target_dir.mkdir(parents=True, exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=target_dir, suffix=".part", delete=False)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _discard(tmp) -> None:
+    tmp.close()
+    _remove_quietly(tmp.name)
+
+
+def _write_chunk(tmp, digest, chunk: bytes) -> None:
+    tmp.write(chunk)
+    digest.update(chunk)
+
+
+def _finish(tmp, file_path: Path) -> bool:
+    """Przenosi plik tymczasowy pod nazwę z hasha; False gdy blob już istniał."""
+    if file_path.exists():
+        try:
+            # media_gc liczy karencję od mtime – stary osierocony blob jest znów w użyciu
+            os.utime(file_path)
+        except FileNotFoundError:
+            pass  # GC zabrał go w międzyczasie – zapisujemy naszą kopię
+        else:
+            for size in DERIVATIVE_SIZES:
+                try:
+                    os.utime(file_path.with_name(derivative_name(file_path.name, size)))
+                except FileNotFoundError:
+                    pass
+            _discard(tmp)
+            return False
+    tmp.flush()
+    os.fsync(tmp.fileno())
+    tmp.close()
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp.name, file_path)
+    return True
+
+
+def derivative_name(name: str, size: str) -> str:
+    stem = name.rsplit(".", 1)[0] if "." in name else name
+    return f"{stem}.{size}{DERIVATIVE_EXT}"
+
+
+def is_derivative(name: str) -> bool:
+    return any(name.endswith(f".{size}{DERIVATIVE_EXT}") for size in DERIVATIVE_SIZES)
+
+
+def derivative_url(url: Optional[str], size: str) -> Optional[str]:
+    if not url or not url.startswith("/media/"):
+        return None
+    p = PurePosixPath(url)
+    return str(p.with_name(derivative_name(p.name, size)))
+
+
+def set_ready_derivatives(urls) -> None:
+    global _ready_derivatives
+    _ready_derivatives = set(urls)
+
+
+def photo_variants(obj, fields) -> Dict[str, Dict[str, str]]:
     """
-    media_dir: np. "media/tpm" albo "media/book"
-    zapis: <media_dir>/<YYYY>/<MM>/<DD>/<uuid>.<ext>
-    url:   /media/<ścieżka_względem MEDIA_ROOT>
+    {pole: {"thumb": url, "medium": url}} dla zdjęć, z których powstają
+    pochodne (do schematów *Read). Tylko rozszerzenia z IMAGE_EXTENSIONS i
+    tylko z Pillow. Póki miniatury nie są zapisane w media_blobs (świeży upload,
+    nieudane generowanie, stary plik bez backfillu), warianty wskazują oryginał.
     """
-    today = date.today()
-    rel_date = Path(str(today.year)) / f"{today.month:02d}" / f"{today.day:02d}"
+    if not HAS_PILLOW:
+        return {}
+    out = {}
+    for field in fields:
+        url = getattr(obj, field, None)
+        if not derivative_url(url, "thumb") or PurePosixPath(url).suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        ready = url in _ready_derivatives
+        out[field] = {size: derivative_url(url, size) if ready else url for size in DERIVATIVE_SIZES}
+    return out
 
-    # media_dir może być "media/tpm" -> zrób z tego ścieżkę absolutną
-    target_dir = (BASE_DIR / media_dir) / rel_date
-    target_dir.mkdir(parents=True, exist_ok=True)
 
-    ext = Path(upload_file.filename or "").suffix or ".bin"
-    filename = f"{uuid4().hex}{ext}"
-    file_path = target_dir / filename
+def make_derivatives(src: str, overwrite: bool = False) -> List[str]:
+    """
+    Generuje miniatury dla jednego oryginału (uruchamiane w puli procesów).
+    Orientacja z EXIF jest nakładana na piksele, a same metadane nie są
+    zapisywane do pochodnych.
+    """
+    src_path = Path(src)
+    targets = {
+        size: src_path.with_name(derivative_name(src_path.name, size))
+        for size in DERIVATIVE_SIZES
+    }
+    if not overwrite and all(t.exists() for t in targets.values()):
+        return []
+
+    from PIL import Image, ImageOps
+
+    created = []
+    with Image.open(src_path) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        for size, edge in DERIVATIVE_SIZES.items():
+            target = targets[size]
+            if target.exists() and not overwrite:
+                continue
+            resized = im.copy()
+            resized.thumbnail((edge, edge))
+            tmp = target.with_name(target.name + ".part")
+            resized.save(tmp, format=DERIVATIVE_FORMAT, quality=DERIVATIVE_QUALITY)
+            os.replace(tmp, target)
+            created.append(str(target))
+    return created
 
-    content = await upload_file.read()
-    file_path.write_bytes(content)
+
+def get_derivative_pool() -> ProcessPoolExecutor:
+    global _derivative_pool
+    if _derivative_pool is None:
+        # spawn: nie forkujemy procesu z działającą pętlą zdarzeń i wątkami
+        _derivative_pool = ProcessPoolExecutor(
+            max_workers=DERIVATIVE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _derivative_pool
+
+
+def _derivatives_done(url: str, fut) -> None:
+    _pending_derivatives.discard(fut)
+    if fut.cancelled():
+        return
+    if fut.exception() is not None:
+        logger.warning("Derivative generation failed: %s", fut.exception())
+        return
+    from app.media_refs import record_derivatives
+
+    # ten worker widzi miniatury od razu, pozostałe po odświeżeniu z media_blobs
+    _ready_derivatives.add(url)
+    recorded = asyncio.get_running_loop().run_in_executor(None, record_derivatives, url)
+    _pending_derivatives.add(recorded)
+    recorded.add_done_callback(_recorded)
+
+
+def _recorded(fut) -> None:
+    _pending_derivatives.discard(fut)
+    if not fut.cancelled() and fut.exception() is not None:
+        logger.warning("Recording derivatives failed: %s", fut.exception())
+
+
+def schedule_derivatives(file_path: str) -> None:
+    """
+    Zleca wygenerowanie miniatur w tle – upload nie czeka na wynik. Po
+    sukcesie blob dostaje media_blobs.derivatives = true.
+    """
+    if not HAS_PILLOW or Path(file_path).suffix.lower() not in IMAGE_EXTENSIONS:
+        return
+    url = f"/media/{Path(file_path).relative_to(MEDIA_ROOT).as_posix()}"
+    fut = asyncio.get_running_loop().run_in_executor(get_derivative_pool(), make_derivatives, file_path)
+    _pending_derivatives.add(fut)
+    fut.add_done_callback(functools.partial(_derivatives_done, url))
+
+
+async def _store_upload(upload_file: UploadFile, media_dir: str):
+    content_type = (upload_file.content_type or "").lower()
+    if ALLOWED_CONTENT_TYPES and not content_type.startswith(ALLOWED_CONTENT_TYPES):
+        raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type or 'unknown'}")
+
+    if upload_file.size is not None and upload_file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+
+    # media_dir może być "media/blobs" -> zrób z tego ścieżkę absolutną
+    store_dir = BASE_DIR / media_dir
+    ext = (Path(upload_file.filename or "").suffix or ".bin").lower()
+
+    tmp = await run_in_threadpool(_open_temp, store_dir / INCOMING_DIR)
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        while True:
+            chunk = await upload_file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit",
+                )
+            await run_in_threadpool(_write_chunk, tmp, digest, chunk)
+
+        sha = digest.hexdigest()
+        file_path = store_dir / sha[:2] / sha[2:4] / f"{sha}{ext}"
+        await run_in_threadpool(_finish, tmp, file_path)
+    except BaseException:
+        await run_in_threadpool(_discard, tmp)
+        raise
+
+    # także przy deduplikacji: gotowe miniatury pula tylko sprawdzi, a brakujące
+    # (blob bez wiersza w media_blobs, nieudane generowanie) dorobi i zapisze flagę
+    schedule_derivatives(str(file_path))
 
     # url ma być względem MEDIA_ROOT
     rel_to_media = file_path.relative_to(MEDIA_ROOT).as_posix()
     public_url = f"/media/{rel_to_media}"
 
     return str(file_path), public_url
+
+
+async def save_upload_file(upload_file: UploadFile, media_dir: str = "media/blobs"):
+    """
+    media_dir: katalog magazynu względem BASE_DIR (domyślnie wspólny "media/blobs")
+    zapis: <media_dir>/<sha[:2]>/<sha[2:4]>/<sha256>.<ext>
+    url:   /media/<ścieżka_względem MEDIA_ROOT>
+
+    Plik jest strumieniowany kawałkami do pliku tymczasowego (I/O poza pętlą
+    zdarzeń), SHA-256 liczony jest w locie. Jeśli blob o tej treści już
+    istnieje, plik tymczasowy jest odrzucany i zwracany jest istniejący URL.
+    Przekroczenie MAX_UPLOAD_BYTES przerywa zapis -> 413.
+    """
+    return await _store_upload(upload_file, media_dir)
+
+
+async def save_upload_files(uploads: Dict[str, UploadFile], media_dir: str = "media/blobs") -> Dict[str, str]:
+    """
+    Zapisuje kilka plików z jednego formularza równolegle
+    (max UPLOAD_CONCURRENCY naraz) i zwraca {pole: public_url}.
+    Jeśli któryś zapis się nie uda, zapisane już pliki zostają na dysku: w tej
+    chwili może na nie wskazywać równoległe żądanie z tą samą treścią.
+    Nieużywane usuwa scripts/media_gc.py (karencja + ponowne sprawdzenie odwołań).
+    """
+    if not uploads:
+        return {}
+
+    sem = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+    async def _save(upload: UploadFile):
+        async with sem:
+            return await _store_upload(upload, media_dir)
+
+    fields = list(uploads)
+    results = await asyncio.gather(*(_save(uploads[f]) for f in fields), return_exceptions=True)
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        raise errors[0]
+
+    return {field: public_url for field, (_, public_url) in zip(fields, results)}
@@ -0,0 +1,82 @@
+# app/media_files.py
+import os
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from app import settings
+from app.images import is_derivative
+
+# nazwy oryginałów w media/ są unikalne i nigdy się nie zmieniają -> można je cache'ować "na zawsze"
+CACHE_CONTROL = f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable"
+# miniatury nie: media_derivatives --force albo inne MEDIA_DERIVATIVE_* podmieniają bajty
+# pod tą samą nazwą – ograniczony max-age, potem rewalidacja ETagiem z mtime
+DERIVATIVE_CACHE_CONTROL = f"public, max-age={settings.MEDIA_DERIVATIVE_CACHE_MAX_AGE}"
+
+# "" – bajty wysyła Python, "x-accel" – nginx (X-Accel-Redirect), "x-sendfile" – Apache/lighttpd
+OFFLOAD = settings.MEDIA_OFFLOAD
+# location w nginx oznaczona jako `internal`, wskazująca na ten sam katalog media/
+ACCEL_PREFIX = settings.MEDIA_ACCEL_PREFIX
+
+_SHA_NAME = re.compile(r"^([0-9a-f]{64})\.[^.]+$")
+
+
+def strong_etag(path: str, stat_result: os.stat_result) -> str:
+    """
+    Bloby (<sha256>.<ext>) dostają ETag z hasha treści – ten sam na każdym
+    workerze i po przeniesieniu plików. Miniatury (nazwa z hasha oryginału,
+    nie ich własnej treści) i stare nazwy (uuid) – z mtime_ns i rozmiaru.
+    """
+    m = _SHA_NAME.match(Path(path).name)
+    if m:
+        return f'"{m.group(1)}"'
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+class MediaFiles(StaticFiles):
+    """
+    StaticFiles dla /media: immutable Cache-Control dla oryginałów, krótszy
+    max-age dla miniatur, silne ETagi (304 na If-None-Match), Range obsługuje
+    FileResponse. Przy MEDIA_OFFLOAD odpowiedź zawiera tylko nagłówki, a plik
+    wysyła serwer przed aplikacją.
+
+    nginx (MEDIA_OFFLOAD=x-accel) – Cache-Control przychodzi z odpowiedzi
+    aplikacji (nginx przenosi go przy X-Accel-Redirect), bez add_header:
+        location /protected-media/ {
+            internal;
+            alias /srv/mouldbase/backend/media/;
+        }
+    """
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        headers = {
+            "cache-control": DERIVATIVE_CACHE_CONTROL if is_derivative(Path(full_path).name) else CACHE_CONTROL,
+            "etag": strong_etag(str(full_path), stat_result),
+        }
+        response = FileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        if status_code != 200 or OFFLOAD not in ("x-accel", "x-sendfile"):
+            return response
+
+        offload_headers = {
+            "cache-control": response.headers["cache-control"],
+            "etag": response.headers["etag"],
+            "last-modified": response.headers["last-modified"],
+        }
+        if OFFLOAD == "x-accel":
+            rel = self.get_path(scope).replace(os.sep, "/")
+            offload_headers["x-accel-redirect"] = f"{ACCEL_PREFIX}/{quote(rel)}"
+        else:
+            offload_headers["x-sendfile"] = os.path.abspath(full_path)
+        return Response(media_type=response.media_type, headers=offload_headers)
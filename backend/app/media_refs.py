@@ -0,0 +1,140 @@
+# app/media_refs.py
+import asyncio
+import logging
+import re
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import settings
+from app.images import HAS_PILLOW, MEDIA_ROOT, set_ready_derivatives
+from db.database import AsyncReadSessionLocal, SessionLocal
+from models.media import MediaBlob, MediaRef
+
+log = logging.getLogger(__name__)
+
+# /media/blobs/ab/cd/<sha256>.<ext> – tylko takie pliki są adresowane treścią
+_BLOB_URL = re.compile(r"^/media/.*/([0-9a-f]{64})\.[^/.]+$")
+
+
+def _insert(db: Session):
+    """insert() z ON CONFLICT dla dialektu sesji (PostgreSQL / SQLite)."""
+    return (sqlite if db.get_bind().dialect.name == "sqlite" else postgresql).insert(MediaBlob)
+
+
+def _blob_for_url(db: Session, url: str) -> Optional[MediaBlob]:
+    m = _BLOB_URL.match(url)
+    if not m:
+        return None  # stare pliki (uuid w katalogach po dacie) nie mają bloba
+
+    blob = db.query(MediaBlob).filter(MediaBlob.url == url).first()
+    if blob is None:
+        # ten sam nowy plik może dołączać równolegle inne żądanie (po to jest deduplikacja):
+        # ON CONFLICT DO NOTHING zamiast IntegrityError, potem wiersz – nasz albo jego
+        path = MEDIA_ROOT / url[len("/media/"):]
+        size = path.stat().st_size if path.exists() else None
+        db.execute(
+            _insert(db).values(sha256=m.group(1), url=url, size=size)
+            .on_conflict_do_nothing(index_elements=[MediaBlob.url])
+        )
+        blob = db.query(MediaBlob).filter(MediaBlob.url == url).one()
+    return blob
+
+
+def sync_media_refs(db: Session, owner_type: str, owner_id: int, urls: Dict[str, Optional[str]]) -> None:
+    """
+    Ustawia powiązania pole -> blob dla jednego rekordu ("mould" / "tpm" / "book").
+    urls: {pole: aktualny URL albo None}. Nie commituje – robi to wywołujący.
+    """
+    existing = {
+        ref.field: ref
+        for ref in db.query(MediaRef).filter(MediaRef.owner_type == owner_type, MediaRef.owner_id == owner_id)
+    }
+    for field, url in urls.items():
+        blob = _blob_for_url(db, url) if url else None
+        ref = existing.get(field)
+        if blob is None:
+            if ref is not None:
+                db.delete(ref)
+        elif ref is None:
+            db.add(MediaRef(blob_id=blob.id, owner_type=owner_type, owner_id=owner_id, field=field))
+        elif ref.blob_id != blob.id:
+            ref.blob_id = blob.id
+
+
+def drop_media_refs(db: Session, owner_type: str, owner_ids: Iterable[int]) -> None:
+    """Usuwa powiązania kasowanych rekordów (bloby zostają dla GC)."""
+    ids = list(owner_ids)
+    if ids:
+        db.execute(
+            delete(MediaRef)
+            .where(MediaRef.owner_type == owner_type, MediaRef.owner_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+
+
+# ---------- miniatury (media_blobs.derivatives) ----------
+
+def record_derivatives(url: str) -> None:
+    """
+    Po wygenerowaniu miniatur w tle (wątek puli, własna sesja). Wiersza bloba
+    może jeszcze nie być – upload commituje później – więc upsert: ON CONFLICT
+    czeka na transakcję uploadu i ustawia flagę w jej wierszu.
+    """
+    m = _BLOB_URL.match(url)
+    if not m:
+        return
+    path = MEDIA_ROOT / url[len("/media/"):]
+    with SessionLocal() as db:
+        stmt = _insert(db).values(sha256=m.group(1), url=url, size=path.stat().st_size, derivatives=True)
+        db.execute(stmt.on_conflict_do_update(index_elements=[MediaBlob.url], set_={"derivatives": True}))
+        db.commit()
+
+
+def mark_derivatives(db: Session, urls: Iterable[str]) -> int:
+    """Backfill flag dla istniejących blobów (scripts/media_derivatives); nie commituje."""
+    urls = list(urls)
+    marked = 0
+    for i in range(0, len(urls), 1000):
+        marked += db.execute(
+            update(MediaBlob)
+            .where(MediaBlob.url.in_(urls[i:i + 1000]), MediaBlob.derivatives.is_(False))
+            .values(derivatives=True)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    return marked
+
+
+async def load_ready_derivatives() -> None:
+    async with AsyncReadSessionLocal() as db:
+        urls = (await db.scalars(select(MediaBlob.url).where(MediaBlob.derivatives.is_(True)))).all()
+    set_ready_derivatives(urls)
+
+
+async def _refresh_ready_derivatives() -> None:
+    # pełny odczyt – bloby usunięte przez media_gc znikają z listy przy następnym obiegu
+    while True:
+        try:
+            await load_ready_derivatives()
+        except Exception:  # noqa: BLE001 – zostaje poprzednia lista, spróbujemy za chwilę
+            log.exception("loading ready derivatives failed")
+        await asyncio.sleep(settings.MEDIA_DERIVATIVES_REFRESH_SECONDS)
+
+
+def start_derivatives_refresh() -> Optional[asyncio.Task]:
+    """Z lifespan: lista zdjęć z miniaturami dla photo_variants (bez Pillow niepotrzebna)."""
+    if not HAS_PILLOW:
+        return None
+    return asyncio.create_task(_refresh_ready_derivatives())
+
+
+async def stop_derivatives_refresh(task: Optional[asyncio.Task]) -> None:
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
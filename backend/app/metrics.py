@@ -0,0 +1,197 @@
+# app/metrics.py
+"""
+Metryki HTTP i bazy w formacie Prometheus (bez zewnętrznych zależności).
+
+    http_requests_total{method,route,status}         liczba odpowiedzi
+    http_request_duration_seconds{method,route}      histogram czasu odpowiedzi
+    http_requests_in_progress{method}                żądania w toku (trasa znana dopiero po routingu)
+    db_queries_total{method,route}                   zapytania SQL wykonane w żądaniach
+    db_query_duration_seconds_total{method,route}    łączny czas tych zapytań
+
+`route` to szablon ścieżki (/moulds/{mould_number}), nie konkretny URL –
+liczba serii nie rośnie z liczbą form. Każdy worker uvicorna ma własne
+liczniki; Prometheus scrapuje je osobno albo przez sumowanie po instancjach.
+
+Zapytania liczą eventy SQLAlchemy na klasie Engine (sync, async przez
+sync_engine, replika) – wynik trafia do statystyk bieżącego żądania przez
+ContextVar, więc działa też dla handlerów sync w threadpoolu.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+SKIP_PATHS = ("/metrics",)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+# ---------- rejestr ----------
+# aktualizowany tylko z middleware (pętla zdarzeń), więc bez blokad
+
+_requests_total: dict = {}
+_in_progress: dict = {}  # method -> liczba
+_db_queries: dict = {}
+_db_time: dict = {}
+_latency: dict = {}  # (method, route) -> [liczniki kubełków..., +Inf], suma
+
+
+def _observe(method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+    key = (method, route)
+    _requests_total[(method, route, status)] = _requests_total.get((method, route, status), 0) + 1
+    _db_queries[key] = _db_queries.get(key, 0) + stats.queries
+    _db_time[key] = _db_time.get(key, 0.0) + stats.db_time
+
+    buckets, total = _latency.get(key) or ([0] * (len(LATENCY_BUCKETS) + 1), 0.0)
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if duration <= bound:
+            buckets[i] += 1
+            break
+    else:
+        buckets[-1] += 1
+    _latency[key] = (buckets, total + duration)
+
+
+def reset() -> None:
+    for registry in (_requests_total, _in_progress, _db_queries, _db_time, _latency):
+        registry.clear()
+
+
+def _labels(**labels) -> str:
+    def esc(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels.items()) + "}"
+
+
+def render() -> str:
+    """Tekstowy format ekspozycji Prometheus (text/plain; version=0.0.4)."""
+    out = [
+        "# HELP http_requests_total HTTP responses by route and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), value in sorted(_requests_total.items()):
+        out.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {value}")
+
+    out += [
+        "# HELP http_request_duration_seconds Time until the last response byte.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), (buckets, total) in sorted(_latency.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, buckets):
+            cumulative += count
+            out.append(f"http_request_duration_seconds_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+        cumulative += buckets[-1]
+        out.append(f"http_request_duration_seconds_bucket{_labels(method=method, route=route, le='+Inf')} {cumulative}")
+        out.append(f"http_request_duration_seconds_sum{_labels(method=method, route=route)} {total:.6f}")
+        out.append(f"http_request_duration_seconds_count{_labels(method=method, route=route)} {cumulative}")
+
+    out += [
+        "# HELP http_requests_in_progress Requests currently being handled.",
+        "# TYPE http_requests_in_progress gauge",
+    ]
+    for method, value in sorted(_in_progress.items()):
+        out.append(f"http_requests_in_progress{_labels(method=method)} {value}")
+
+    out += [
+        "# HELP db_queries_total SQL statements executed while handling requests.",
+        "# TYPE db_queries_total counter",
+    ]
+    for (method, route), value in sorted(_db_queries.items()):
+        out.append(f"db_queries_total{_labels(method=method, route=route)} {value}")
+
+    out += [
+        "# HELP db_query_duration_seconds_total Time spent in SQL statements while handling requests.",
+        "# TYPE db_query_duration_seconds_total counter",
+    ]
+    for (method, route), value in sorted(_db_time.items()):
+        out.append(f"db_query_duration_seconds_total{_labels(method=method, route=route)} {value:.6f}")
+
+    return "\n".join(out) + "\n"
+
+
+# ---------- SQLAlchemy ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_query_start")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+def install_db_hooks() -> None:
+    """Raz na proces – eventy na klasie Engine obejmują wszystkie engine'y."""
+    # SQLAlchemy dopiero tutaj – sam moduł (rejestr, middleware) nie ciągnie go przy imporcie
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------- middleware ----------
+
+class MetricsMiddleware:
+    """
+    Czyste ASGI (bez BaseHTTPMiddleware) – nie buforuje odpowiedzi i nie
+    zmienia wątku, w którym działa handler. Czas liczony do ostatniego
+    bajtu odpowiedzi. Przy server_timing=True dokłada nagłówek
+    Server-Timing: app;dur=..., db;dur=...;desc="N queries" (widoczny w
+    DevTools przeglądarki, czas do wysłania nagłówków).
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    app_ms = (time.perf_counter() - started) * 1000
+                    value = f'app;dur={app_ms:.1f}, db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"'
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode("latin-1"))]
+            await send(message)
+
+        _in_progress[method] = _in_progress.get(method, 0) + 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_progress[method] -= 1
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            _observe(method, route, status, time.perf_counter() - started, stats)
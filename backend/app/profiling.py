@@ -0,0 +1,178 @@
+# app/profiling.py
+"""
+Profilowanie pojedynczego żądania na życzenie – tylko z tokenem superadmina.
+
+    curl -H "Authorization: Bearer $TOKEN" -H "X-Profile: 1" "http://host:8000/analytics/machine-cards?date=2026-06-29"
+    curl -H "Authorization: Bearer $TOKEN" "http://host:8000/moulds/?search=F001&__profile=1"
+
+Żądanie wykonuje się normalnie pod profilerem próbkującym (pyinstrument,
+async_mode="enabled" – liczy się tylko ta korutyna, nie inne żądania na tej
+samej pętli), a app.query_debug zbiera jego zapytania SQL z czasami i
+miejscem w kodzie. Odpowiedź dostaje nagłówek X-Profile-Id, profil ląduje w
+PROFILE_DIR i jest dostępny (też tylko dla superadmina):
+
+    GET /debug/profiles                    ostatnie profile
+    GET /debug/profiles/{id}               metadane + lista SQL (JSON)
+    GET /debug/profiles/{id}/speedscope    flamegraph – plik do https://www.speedscope.app
+    GET /debug/profiles/{id}/html          widok pyinstrument
+
+Bez flagi (albo bez tokenu superadmina – flaga jest wtedy po cichu
+ignorowana) middleware tylko przegląda nagłówki i query string.
+Handlery sync (threadpool) widać w profilu jako oczekiwanie na wątek –
+ich SQL jest jednak w liście zapytań.
+"""
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from starlette.concurrency import run_in_threadpool
+
+from app import settings
+from app.query_debug import capture_request_queries
+
+# pyinstrument jest opcjonalny – bez niego profilowanie jest wyłączone; importowany
+# dopiero przy pierwszym profilowanym żądaniu, nie przy starcie workera
+HAS_PYINSTRUMENT = find_spec("pyinstrument") is not None
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROFILE_DIR = Path(settings.PROFILE_DIR) if settings.PROFILE_DIR else BASE_DIR / "profiles"
+
+HEADER = b"x-profile"
+QUERY_PARAM = "__profile"
+TRUTHY = ("1", "true", "yes", "on")
+FILES = {"meta": ".json", "speedscope": ".speedscope.json", "html": ".html"}
+
+
+def available() -> bool:
+    return HAS_PYINSTRUMENT
+
+
+def profile_path(profile_id: str, kind: str = "meta") -> Path:
+    return PROFILE_DIR / f"{profile_id}{FILES[kind]}"
+
+
+def _meta_files() -> list:
+    """Pliki metadanych od najnowszego."""
+    if not PROFILE_DIR.is_dir():
+        return []
+    return sorted((p for p in PROFILE_DIR.glob("*.json") if not p.name.endswith(FILES["speedscope"])), reverse=True)
+
+
+def list_profiles() -> list:
+    return [json.loads(path.read_text(encoding="utf-8")) for path in _meta_files()]
+
+
+def _requested(scope) -> bool:
+    """X-Profile: 1 albo ?__profile=1 (też true / yes / on) – __profile=0 czy foo__profile=1 nie włączają."""
+    query = scope.get("query_string", b"")
+    # tani test bajtów, zanim parsujemy query string każdego żądania
+    if QUERY_PARAM.encode() in query:
+        for name, value in parse_qsl(query.decode("latin-1")):
+            if name == QUERY_PARAM and value.strip().lower() in TRUTHY:
+                return True
+    return any(name == HEADER and value.decode("latin-1").strip().lower() in TRUTHY for name, value in scope["headers"])
+
+
+def _superadmin(scope) -> Optional[str]:
+    """Nazwa użytkownika, jeśli żądanie ma ważny token superadmina."""
+    from jose import JWTError, jwt
+    from routers.auth import ALGORITHM, SECRET_KEY
+
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            except JWTError:
+                return None
+            return payload.get("sub") if payload.get("role") == "superadmin" else None
+    return None
+
+
+def _store(profile_id: str, meta: dict, profiler) -> None:
+    from pyinstrument.renderers import SpeedscopeRenderer
+
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile_path(profile_id, "speedscope").write_text(profiler.output(SpeedscopeRenderer()), encoding="utf-8")
+    profile_path(profile_id, "html").write_text(profiler.output_html(), encoding="utf-8")
+    profile_path(profile_id).write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    for old in _meta_files()[settings.PROFILE_KEEP:]:
+        old_id = old.name[: -len(FILES["meta"])]
+        for kind in FILES:
+            profile_path(old_id, kind).unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Czyste ASGI – zwykłe żądania przechodzą bez żadnej dodatkowej pracy poza sprawdzeniem flagi."""
+
+    def __init__(self, app, interval: float = 0.001):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+        user = _superadmin(scope)
+        if user is None:
+            await self.app(scope, receive, send)
+            return
+
+        # id rośnie z czasem – sortowanie plików = kolejność profili
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        from pyinstrument import Profiler
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        started = time.perf_counter()
+        with capture_request_queries() as queries:
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.stop()
+        duration = time.perf_counter() - started
+
+        meta = {
+            "id": profile_id,
+            "user": user,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "route": getattr(scope.get("route"), "path", None),
+            "status": status,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(duration * 1000, 1),
+            "sql_count": len(queries),
+            "sql_ms": round(sum(q.duration for q in queries) * 1000, 1),
+            "sql": [
+                {"statement": " ".join(q.statement.split()), "duration_ms": round(q.duration * 1000, 2), "origin": q.origin}
+                for q in queries
+            ],
+        }
+        try:
+            await run_in_threadpool(_store, profile_id, meta, profiler)
+        except OSError:
+            log.exception("could not store profile %s", profile_id)
+        else:
+            log.info("profile %s: %s %s %.1f ms, %d queries", profile_id, meta["method"], meta["path"],
+                     meta["duration_ms"], meta["sql_count"])
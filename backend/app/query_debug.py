@@ -0,0 +1,200 @@
+# app/query_debug.py
+"""
+Tryb diagnostyczny zapytań SQL (dev / staging), włączany DB_QUERY_DEBUG=1.
+
+    - zapytania wolniejsze niż DB_SLOW_QUERY_MS lądują w logu razem z miejscem
+      w naszym kodzie, z którego wyszły (routers/..., app/...)
+    - na koniec żądania: ten sam SQL wykonany >= DB_NPLUS1_THRESHOLD razy
+      = podejrzenie N+1 (lazy load w pętli, from_attributes na relacji)
+
+Do testów (działa niezależnie od DB_QUERY_DEBUG):
+
+    from app.query_debug import assert_max_queries
+
+    with assert_max_queries(2, label="GET /production/orders"):
+        client.get("/production/orders")
+"""
+import logging
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+from app import settings
+
+log = logging.getLogger(__name__)
+
+PROJECT_DIR = str(Path(__file__).resolve().parent.parent)
+THIS_FILE = str(Path(__file__).resolve())
+
+
+@dataclass
+class CapturedQuery:
+    statement: str
+    duration: float
+    origin: str
+    parameters: object = None  # w formacie sterownika – do ponownego wykonania (np. EXPLAIN)
+    driver: str = ""  # psycopg2 / asyncpg / pysqlite ...
+
+
+@dataclass
+class RequestQueries:
+    counts: Counter = field(default_factory=Counter)
+    origins: dict = field(default_factory=dict)  # statement -> miejsce pierwszego wykonania
+
+
+_request_queries: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+# zapytania jednego żądania z pełnym SQL i czasami (profilowanie, app/profiling.py)
+_request_capture: ContextVar[Optional[list]] = ContextVar("request_capture", default=None)
+
+# aktywne assert_max_queries / capture_queries – globalne, bo TestClient
+# wykonuje aplikację w innym wątku niż test
+_captures: list = []
+_captures_lock = Lock()
+
+
+def _walk(frame) -> Optional[str]:
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(PROJECT_DIR) and filename != THIS_FILE and "site-packages" not in filename:
+            rel = Path(filename).relative_to(PROJECT_DIR).as_posix()
+            return f"{rel}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def query_origin() -> str:
+    """Pierwsza ramka stosu z kodu projektu. Dla AsyncSession zapytanie wykonuje
+    się w greenlecie SQLAlchemy – wtedy szukamy w stosie korutyny, która czeka."""
+    origin = _walk(sys._getframe(1))
+    if origin:
+        return origin
+    try:
+        import greenlet
+        parent = greenlet.getcurrent().parent
+        if parent is not None:
+            origin = _walk(parent.gr_frame)
+    except ImportError:
+        pass
+    return origin or "?"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("debug_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("debug_query_start")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    debug = settings.DB_QUERY_DEBUG
+    request = _request_queries.get()
+    slow = debug and elapsed * 1000 >= settings.DB_SLOW_QUERY_MS
+    first_in_request = request is not None and statement not in request.origins
+    request_capture = _request_capture.get()
+    origin = query_origin() if (slow or first_in_request or _captures or request_capture is not None) else None
+
+    if slow:
+        log.warning("slow query %.1f ms at %s: %s", elapsed * 1000, origin, " ".join(statement.split())[:500])
+    if request is not None:
+        request.counts[statement] += 1
+        if first_in_request:
+            request.origins[statement] = origin
+    if request_capture is not None:
+        # bez parametrów – profile zapisywane są na dysk
+        request_capture.append(CapturedQuery(statement, elapsed, origin, None, conn.dialect.driver))
+    if _captures:
+        with _captures_lock:
+            for captured in _captures:
+                captured.append(CapturedQuery(statement, elapsed, origin, parameters, conn.dialect.driver))
+
+
+def install_query_hooks() -> None:
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def repeated_statements(statements, threshold: int) -> list:
+    """[(liczba, sql)] dla zapytań powtórzonych >= threshold razy, od najczęstszego."""
+    counts = statements if isinstance(statements, Counter) else Counter(statements)
+    return [(n, sql) for sql, n in counts.most_common() if n >= threshold]
+
+
+# ---------- testy ----------
+
+@contextmanager
+def capture_queries():
+    """Zbiera wszystkie zapytania (dowolny engine, dowolny wątek) wykonane w bloku."""
+    install_query_hooks()
+    captured: list = []
+    with _captures_lock:
+        _captures.append(captured)
+    try:
+        yield captured
+    finally:
+        with _captures_lock:
+            _captures.remove(captured)
+
+
+@contextmanager
+def capture_request_queries():
+    """Jak capture_queries, ale tylko zapytania bieżącego kontekstu (żądania) –
+    ContextVar przechodzi też do threadpoola handlerów sync."""
+    install_query_hooks()
+    captured: list = []
+    token = _request_capture.set(captured)
+    try:
+        yield captured
+    finally:
+        _request_capture.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "block"):
+    """Budżet zapytań dla endpointu / fragmentu kodu – AssertionError po przekroczeniu."""
+    with capture_queries() as captured:
+        yield captured
+    if len(captured) > limit:
+        lines = [f"{label}: {len(captured)} queries, budget {limit}"]
+        for n, sql in repeated_statements([q.statement for q in captured], 2):
+            origin = next(q.origin for q in captured if q.statement == sql)
+            lines.append(f"  {n}x at {origin}: {' '.join(sql.split())[:200]}")
+        raise AssertionError("\n".join(lines))
+
+
+# ---------- middleware ----------
+
+class QueryDebugMiddleware:
+    """Raport N+1 na koniec każdego żądania (tylko przy DB_QUERY_DEBUG=1)."""
+
+    def __init__(self, app, threshold: int = 5):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestQueries()
+        token = _request_queries.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_queries.reset(token)
+            for n, sql in repeated_statements(request.counts, self.threshold):
+                log.warning(
+                    "possible N+1 in %s %s: %dx at %s: %s",
+                    scope["method"], scope["path"], n, request.origins.get(sql), " ".join(sql.split())[:300],
+                )
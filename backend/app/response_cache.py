@@ -0,0 +1,232 @@
+# app/response_cache.py
+"""
+Cache odpowiedzi dla danych słownikowych (statusy maszyn, grupy, typy
+zleceń, użytkownicy, stanowiska serwisowe) – w pamięci procesu, z ETag i 304.
+
+    @router.get("/machine-statuses", ...)
+    async def list_machine_statuses(request: Request, db: async_db_dependency):
+        cached = response_cache.lookup(request, "machine_statuses")
+        if cached.response is not None:
+            return cached.response            # z pamięci: 200 albo 304
+        rows = ...
+        return cached.store(MACHINE_STATUS_LIST.dump(rows))
+
+    # create / update / delete – po commit:
+    response_cache.invalidate("machine_statuses")
+
+Klucz to ścieżka + query string, więc cache nadaje się tylko dla odpowiedzi
+niezależnych od użytkownika. Zależności trasy (autoryzacja) wykonują się
+przed lookup(), więc cache ich nie omija.
+
+ETag jest skrótem treści (słaby – ciało i tak przechodzi przez kompresję),
+więc po wygaśnięciu wpisu i ponownym odczycie niezmienionych danych klient
+dalej dostaje 304. Cache-Control: private, no-cache – przeglądarka trzyma
+kopię, ale zawsze pyta z If-None-Match. Nagłówek X-Cache: HIT / MISS.
+
+Kilka workerów: invalidate() czyści wpisy lokalnie i na PostgreSQL rozsyła
+tagi przez NOTIFY (kanał response_cache) – każdy worker nasłuchuje na
+osobnym połączeniu (start_listener w lifespan). Gdy tego połączenia nie ma
+(SQLite, awaria), górną granicą nieaktualności w innych workerach jest
+RESPONSE_CACHE_TTL; po ponownym połączeniu cache jest czyszczony.
+
+Odczyt przy braku wpisu idzie na primary, nie na replikę – odpowiedź z
+opóźnionej repliki wisiałaby w cache do następnej zmiany. Zapis wpisu jest
+pomijany, jeśli między lookup() a store() było invalidate() (odczyt sprzed
+commitu nie przykryje świeżego unieważnienia).
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app import settings
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "response_cache"
+CACHE_CONTROL = "private, no-cache"
+MAX_ENTRIES = 256  # klucz zawiera query string – bez limitu dowolne ?x= rozdmuchałyby pamięć
+RECONNECT_DELAY = 5.0
+
+
+@dataclass
+class Entry:
+    body: bytes
+    etag: str
+    tags: tuple
+    media_type: str
+    expires: float
+
+
+# handlery sync działają w wątkach puli – stąd blokada
+_entries: dict = {}
+_lock = threading.Lock()
+_generation = 0
+_listener: Optional["Listener"] = None
+
+
+def etag_for(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _response(request: Request, entry: Entry, status: str) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL, "X-Cache": status}
+    if not_modified(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type=entry.media_type, headers=headers)
+
+
+@dataclass
+class Lookup:
+    request: Request
+    key: tuple
+    tags: tuple
+    generation: int
+    response: Optional[Response] = None
+
+    def store(self, body: bytes, media_type: str = "application/json") -> Response:
+        entry = Entry(body, etag_for(body), self.tags, media_type, time.monotonic() + settings.RESPONSE_CACHE_TTL)
+        if settings.RESPONSE_CACHE_TTL > 0:
+            with _lock:
+                if self.generation == _generation:
+                    _entries.pop(self.key, None)
+                    _entries[self.key] = entry
+                    while len(_entries) > MAX_ENTRIES:
+                        del _entries[next(iter(_entries))]
+        return _response(self.request, entry, "MISS")
+
+
+def lookup(request: Request, *tags: str) -> Lookup:
+    key = (request.url.path, request.url.query)
+    with _lock:
+        entry = _entries.get(key)
+        result = Lookup(request, key, tags, _generation)
+    if entry is not None and entry.expires > time.monotonic():
+        result.response = _response(request, entry, "HIT")
+    return result
+
+
+def _drop(tags: tuple) -> None:
+    """Usuwa wpisy z którymkolwiek z tagów; pusta krotka = wszystko."""
+    global _generation
+    with _lock:
+        _generation += 1
+        stale = [key for key, entry in _entries.items() if not tags or set(entry.tags) & set(tags)]
+        for key in stale:
+            del _entries[key]
+
+
+def invalidate(*tags: str) -> None:
+    """Wywoływane po commit – lokalnie od razu, w innych workerach przez NOTIFY."""
+    _drop(tags)
+    if _listener is not None:
+        _listener.publish(tags)
+
+
+def clear() -> None:
+    _drop(())
+
+
+# ---------- unieważnianie między workerami (PostgreSQL LISTEN/NOTIFY) ----------
+
+class Listener:
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.conn = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()  # jedno połączenie asyncpg = jedna operacja naraz
+        self._sending = set()  # pętla trzyma zadania tylko słabo – bez tego NOTIFY mógłby przepaść
+
+    async def run(self) -> None:
+        import asyncpg
+
+        while True:
+            lost = asyncio.Event()
+            try:
+                self.conn = await asyncpg.connect(self.dsn)
+                self.conn.add_termination_listener(lambda conn: lost.set())
+                await self.conn.add_listener(CHANNEL, self._on_notify)
+                clear()  # powiadomienia sprzed połączenia mogły przepaść
+                await lost.wait()
+                log.warning("response cache listener connection lost")
+            except (OSError, asyncpg.PostgresError) as exc:
+                log.warning("response cache listener unavailable: %s", exc)
+            finally:
+                conn, self.conn = self.conn, None
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            clear()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        if pid == conn.get_server_pid():
+            return  # własne powiadomienie – lokalnie już unieważnione
+        _drop(tuple(payload.split(",")) if payload else ())
+
+    async def _send(self, payload: str) -> None:
+        async with self._send_lock:
+            conn = self.conn
+            if conn is None:
+                return
+            try:
+                await conn.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+            except Exception:  # noqa: BLE001 – inne workery dogoni TTL
+                log.exception("response cache NOTIFY failed")
+
+    def _spawn_send(self, payload: str) -> None:
+        task = self.loop.create_task(self._send(payload))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    def publish(self, tags: tuple) -> None:
+        if self.conn is None or self.loop is None:
+            return
+        payload = ",".join(tags)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._spawn_send(payload)
+        else:
+            # handler sync w wątku puli
+            self.loop.call_soon_threadsafe(self._spawn_send, payload)
+
+
+async def start_listener(engine) -> Optional[Listener]:
+    """Z lifespan: tylko PostgreSQL i włączony cache."""
+    global _listener
+    if engine.dialect.name != "postgresql" or settings.RESPONSE_CACHE_TTL <= 0:
+        return None
+    listener = Listener(engine.url.set(drivername="postgresql").render_as_string(hide_password=False))
+    listener.loop = asyncio.get_running_loop()
+    listener.task = asyncio.create_task(listener.run())
+    _listener = listener
+    return listener
+
+
+async def stop_listener(listener: Optional[Listener]) -> None:
+    global _listener
+    if listener is None:
+        return
+    _listener = None
+    listener.task.cancel()
+    try:
+        await listener.task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,145 @@
+# app/responses.py
+"""
+Serializacja odpowiedzi (JSON, MessagePack dla dużych list).
+
+Trasy z response_model FastAPI serializuje sam: TypeAdapter powstaje raz przy
+rejestracji trasy, a dump_json idzie w pydantic-core prosto do bajtów – o ile
+trasa nie ma własnego response_class. Dlatego FastJSONResponse jest ustawiana
+w create_app() przez Default(...): trasy z response_model zostają na tej
+szybkiej ścieżce, a orjson przejmuje tylko trasy zwracające dict/list bez
+schematu (zamiast json.dumps).
+
+Duże listy (formy, TPM, logi, operacje, przezbrojenia):
+    select(*columns(Model))  wiersze zamiast encji ORM – bez mapy tożsamości
+                             i śledzenia zmian, których lista i tak nie używa
+    ListAdapter(schema)      gotowy TypeAdapter List[schema]: walidacja
+                             wierszy i serializacja w handlerze – w handlerach
+                             sync cała serializacja zostaje w wątku puli,
+                             zamiast wracać na pętlę zdarzeń
+
+Format list (list_format_dependency) – domyślnie bez zmian, tablica obiektów:
+    ?format=columnar           {"columns": [...], "rows": [[...], ...]} – klucze raz, nie w każdym wierszu
+    ?format=msgpack            MessagePack (application/msgpack), tablica obiektów
+    ?format=msgpack-columnar   MessagePack, układ kolumnowy
+    Accept: application/msgpack  MessagePack bez parametru format
+Wartości są te same co w JSON (daty jako tekst ISO), kolejność columns =
+pola schematu, a po nich pola wyliczane (photo_variants).
+"""
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Annotated, List, Optional
+
+from fastapi import Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy import inspect
+from starlette.responses import JSONResponse, Response
+
+from app.compression import quality_values
+
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny – bez niego zwykły json.dumps
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack jest opcjonalny – bez niego tylko JSON (Accept ignorowany, format=msgpack -> 406)
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_ACCEPT = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+
+def dumps(content) -> bytes:
+    if orjson is None:
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def columns(model) -> list:
+    """Kolumny modelu pod nazwami atrybutów (nie kolumn w bazie) – jak w schematach *Read; bez deferred."""
+    return [getattr(model, attr.key) for attr in inspect(model).column_attrs if not attr.deferred]
+
+
+# ---------- format list ----------
+
+class ListFormatParam(str, Enum):
+    json = "json"
+    columnar = "columnar"
+    msgpack = "msgpack"
+    msgpack_columnar = "msgpack-columnar"
+
+
+@dataclass(frozen=True)
+class ListFormat:
+    columnar: bool = False
+    msgpack: bool = False
+
+    @property
+    def media_type(self) -> str:
+        return MSGPACK_MEDIA_TYPE if self.msgpack else "application/json"
+
+
+DEFAULT_LIST_FORMAT = ListFormat()
+
+
+def accepts_msgpack(accept: str) -> bool:
+    """Tylko jawne application/msgpack (q > 0) – */* z przeglądarki zostaje przy JSON."""
+    accepted = quality_values(accept)
+    return any(accepted.get(media_type, 0) > 0 for media_type in MSGPACK_ACCEPT)
+
+
+def list_format(
+    request: Request,
+    format: Optional[ListFormatParam] = Query(None, description="json (domyślnie) / columnar / msgpack / msgpack-columnar"),
+) -> ListFormat:
+    if format is None:
+        use_msgpack = msgpack is not None and accepts_msgpack(request.headers.get("accept", ""))
+        return ListFormat(msgpack=use_msgpack)
+    fmt = ListFormat(
+        columnar=format in (ListFormatParam.columnar, ListFormatParam.msgpack_columnar),
+        msgpack=format in (ListFormatParam.msgpack, ListFormatParam.msgpack_columnar),
+    )
+    if fmt.msgpack and msgpack is None:
+        raise HTTPException(status_code=406, detail="MessagePack is not available")
+    return fmt
+
+
+list_format_dependency = Annotated[ListFormat, Depends(list_format)]
+
+# dokumentacja alternatywnych formatów w OpenAPI: @router.get(..., responses=LIST_FORMAT_RESPONSES)
+LIST_FORMAT_RESPONSES = {200: {"content": {MSGPACK_MEDIA_TYPE: {}}}}
+
+
+class ListAdapter:
+    def __init__(self, schema):
+        self.adapter = TypeAdapter(List[schema])
+        self.columns = list(schema.model_fields) + list(schema.model_computed_fields)
+
+    def validate(self, rows) -> list:
+        # from_attributes jak w FastAPI – wiersze Row i encje ORM czytane przez getattr
+        return self.adapter.validate_python(rows, from_attributes=True)
+
+    def dump_python(self, rows) -> list:
+        """Lista dictów z wartościami jak w JSON – do złożenia w większą odpowiedź (GET /sync)."""
+        return self.adapter.dump_python(self.validate(rows), mode="json")
+
+    def dump(self, rows, fmt: ListFormat = DEFAULT_LIST_FORMAT) -> bytes:
+        if fmt == DEFAULT_LIST_FORMAT:
+            return self.adapter.dump_json(self.validate(rows))
+
+        data = self.dump_python(rows)
+        if fmt.columnar:
+            data = {"columns": self.columns, "rows": [list(item.values()) for item in data]}
+        return msgpack.packb(data) if fmt.msgpack else dumps(data)
+
+    def response(self, rows, fmt: ListFormat = DEFAULT_LIST_FORMAT, status_code: int = 200) -> Response:
+        # Accept zmienia treść odpowiedzi – ważne dla cache po drodze
+        return Response(self.dump(rows, fmt), status_code=status_code, media_type=fmt.media_type,
+                        headers={"Vary": "Accept"})
@@ -0,0 +1,114 @@
+# app/sync.py
+"""
+Synchronizacja przyrostowa list dla terminali i dashboardów – GET /sync.
+
+    GET /sync                  {"token": "...", "changes": {}, "deleted": {}}
+    GET /sync?since=<token>    {"token": "...", "changes": {"moulds": [{...}], ...},
+                                "deleted": {"changeovers": [17, 18]}}
+
+Klient bierze token PRZED pobraniem pełnych list, potem co kilka sekund pyta
+o zmiany od ostatniego tokenu: wiersze z changes podmienia po id (są w tych
+samych schematach co listy), id z deleted usuwa. 410 Gone = przeładować
+listy i zacząć od nowego tokenu (token starszy niż SYNC_RETENTION_HOURS albo
+więcej niż SYNC_MAX_CHANGES zmienionych wierszy).
+
+Dziennik sync_changes (entity = nazwa tabeli, row_id) zapisują triggery w
+bazie, w tej samej transakcji co zmiana – żaden handler nie musi o nim
+pamiętać i widać też zmiany z SV, skryptów czy psql. Wiersz nie jest
+kopiowany: /sync czyta stan bieżący, a id, którego już nie ma, to usunięcie.
+
+Pozycja w tokenie:
+  PostgreSQL  xmin bieżącego snapshotu – transakcje o niższym txid są już
+              zakończone, więc zmiana nie przeskoczy tokenu, nawet gdy
+              transakcje commitują w innej kolejności niż dostały seq. Zmiany
+              z txid >= pozycji mogą przyjść dwa razy (podmiana po id, bez
+              szkody). Długa transakcja trzyma xmin – do jej końca odpowiedzi
+              powtarzają zmiany od jej startu.
+  SQLite      seq – zapisy są szeregowane, kolejność seq = kolejność commitów.
+
+Dziennik przycina samo /sync (co PRUNE_INTERVAL, z zapasem PRUNE_MARGIN na
+transakcje trwające w chwili wydania tokenu) – bez osobnego crona.
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import settings
+from db.database import AsyncSessionLocal
+from models.sync import SyncChange
+
+log = logging.getLogger(__name__)
+
+PRUNE_INTERVAL = 600.0
+PRUNE_MARGIN = timedelta(hours=1)
+
+_last_prune = 0.0
+
+
+def _is_sqlite(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "sqlite"
+
+
+def make_token(position: int) -> str:
+    return f"{position}.{int(time.time())}"
+
+
+def parse_token(token: str) -> int:
+    """Pozycja z tokenu; 400 dla śmieci, 410 dla tokenu starszego niż dziennik."""
+    try:
+        position, issued = (int(part) for part in token.split("."))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    if time.time() - issued > settings.SYNC_RETENTION_HOURS * 3600:
+        raise HTTPException(status_code=410, detail="Sync token expired – reload lists")
+    return position
+
+
+async def current_position(db: AsyncSession) -> int:
+    if _is_sqlite(db):
+        return (await db.scalar(select(func.max(SyncChange.seq))) or 0) + 1
+    return await db.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+
+
+async def changed_since(db: AsyncSession, position: int) -> Optional[dict]:
+    """{entity: {row_id, ...}}; None, gdy zmienionych wierszy jest więcej niż SYNC_MAX_CHANGES."""
+    column = SyncChange.seq if _is_sqlite(db) else SyncChange.txid
+    rows = (await db.execute(
+        select(SyncChange.entity, SyncChange.row_id)
+        .where(column >= position)
+        .distinct()
+        .limit(settings.SYNC_MAX_CHANGES + 1)
+    )).all()
+    if len(rows) > settings.SYNC_MAX_CHANGES:
+        return None
+    out = {}
+    for entity, row_id in rows:
+        out.setdefault(entity, set()).add(row_id)
+    return out
+
+
+async def prune_if_due() -> None:
+    """Usuwa wpisy starsze niż SYNC_RETENTION_HOURS + PRUNE_MARGIN – najwyżej raz na PRUNE_INTERVAL w procesie."""
+    global _last_prune
+    now = time.monotonic()
+    if now - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    # zawsze primary – sesja /sync może być na replice (read-only)
+    try:
+        async with AsyncSessionLocal() as db:
+            # czas bazy w tej samej postaci co server_default changed_at (PostgreSQL: bez strefy)
+            now_sql = func.now() if _is_sqlite(db) else func.localtimestamp()
+            cutoff = await db.scalar(select(now_sql)) - timedelta(hours=settings.SYNC_RETENTION_HOURS) - PRUNE_MARGIN
+            result = await db.execute(delete(SyncChange).where(SyncChange.changed_at < cutoff))
+            await db.commit()
+    except Exception:  # noqa: BLE001 – przycięcie spróbuje znów za PRUNE_INTERVAL
+        log.exception("sync journal prune failed")
+        return
+    if result.rowcount:
+        log.info("sync journal: pruned %d entries older than %s", result.rowcount, cutoff)
@@ -0,0 +1,391 @@
+# bench/api.py
+"""
+Benchmark gorących ścieżek API na bazie z danymi syntetycznymi.
+
+    cd backend
+    python -m scripts.seed_synthetic --scale medium --truncate
+    python -m bench.api --terminals 16 --duration 20 --json results/v2.json
+    python -m bench.api --terminals 16 --json results/v3.json --compare results/v2.json
+    python -m bench.api --url http://10.10.77.75:8000 --scenarios logs_post,moulds_search
+    DATABASE_URL=sqlite:///./bench.db python -m bench.api --in-process
+
+Bez --url startuje własny serwer (uvicorn main:create_app, --workers) na
+wolnym porcie – mierzymy przez prawdziwy HTTP, tak jak terminale na hali.
+Każdy scenariusz leci osobno przez --duration sekund: --terminals
+równoległych klientów, każdy z własnym tokenem, zapytanie za zapytaniem
+(bez przerw, więc to test nasycenia, a nie realnego ruchu).
+
+--in-process: aplikacja w tym samym procesie przez httpx.ASGITransport, bez
+sieci i bez serwera – np. na SQLite, gdy nie ma PostgreSQL (schemat zakłada
+lifespan, dane: seed_synthetic z tym samym DATABASE_URL). Klient i aplikacja
+dzielą jedną pętlę zdarzeń, więc liczby porównuj tylko między sobą.
+
+Scenariusze:
+    logs_post      POST /production/logs (bieżące operacje stanowisk, zapis + przeliczenie czasów)
+    worker_cards   GET /analytics/worker-cards?date=  (ostatni dzień z logami)
+    machine_cards  GET /analytics/machine-cards?date=
+    moulds_search  GET /moulds/?search=  (fragmenty numerów form i produktów)
+    changeovers    GET /changeovers/
+    auth_token     POST /auth/token  (bcrypt – z natury wolne)
+
+Wynik: p50/p95/p99/max, req/s i błędy per scenariusz, w JSON razem z
+commitem i licznościami tabel. --compare porównuje z wcześniejszym plikiem
+i kończy się kodem 1, gdy p95 albo req/s pogorszą się o więcej niż
+--threshold procent. Logi zapisane przez logs_post (note = "bench:<id>")
+są na końcu usuwane, a czasy ich operacji przeliczane ponownie.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+from sqlalchemy import text
+
+from db.database import engine
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "synthetic"  # hasło użytkowników z scripts/seed_synthetic.py
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# ---------- dane z bazy ----------
+
+def load_fixtures(rng: random.Random) -> dict:
+    """Identyfikatory i parametry zapytań wzięte z bazy (dane z seed_synthetic)."""
+    with engine.connect() as conn:
+        users = conn.execute(text(
+            "SELECT id, username, role FROM users WHERE username LIKE 'syn\\_%' ESCAPE '\\' ORDER BY id"
+        )).all()
+        if not users:
+            raise SystemExit("brak użytkowników syn_* – najpierw python -m scripts.seed_synthetic")
+        operations = conn.execute(text(
+            """
+            SELECT current_operation_id AS id, id AS workstation_id FROM workstations
+            WHERE current_operation_id IS NOT NULL ORDER BY id
+            """
+        )).all()
+        statuses = list(conn.execute(text("SELECT id FROM machine_statuses ORDER BY id")).scalars())
+        last_log = conn.execute(text("SELECT max(created_at) FROM operation_logs")).scalar()
+        if isinstance(last_log, str):  # SQLite: surowy tekst z text()
+            last_log = datetime.fromisoformat(last_log)
+        moulds = conn.execute(text(
+            "SELECT mould_number, product FROM moulds WHERE mould_number LIKE 'SYN-%' ORDER BY id LIMIT 2000"
+        )).all()
+        counts = {
+            table: conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+            for table in ("operation_logs", "operations", "moulds", "changeovers", "users")
+        }
+
+    search_terms = []
+    for mould_number, product in rng.sample(moulds, min(len(moulds), 50)):
+        search_terms.append(mould_number[4:8])  # np. "F001" – trafia w kilkadziesiąt form
+        if product:
+            search_terms.append(product.split()[0])
+
+    return {
+        "admins": [u.username for u in users if u.role in ("admin", "admindn", "superadmin")],
+        "users": [u.username for u in users],
+        "user_ids": {u.username: u.id for u in users},
+        "operations": [(op.id, op.workstation_id) for op in operations],
+        "statuses": statuses,
+        "analytics_date": (last_log - timedelta(days=1)).date().isoformat() if last_log else datetime.now().date().isoformat(),
+        "search_terms": search_terms or ["SYN"],
+        "counts": counts,
+    }
+
+
+# ---------- scenariusze ----------
+# (fx, terminal, rng) -> (metoda, url, kwargs do httpx)
+
+def logs_post(fx, terminal, rng):
+    operation_id, workstation_id = rng.choice(fx["operations"])
+    return "POST", "/production/logs", {"json": {
+        "operation_id": operation_id,
+        "workstation_id": workstation_id,
+        "status_id": rng.choice(fx["statuses"]),
+        "user_id": terminal["user_id"],
+        "note": fx["note"],
+    }}
+
+
+def worker_cards(fx, terminal, rng):
+    return "GET", "/analytics/worker-cards", {"params": {"date": fx["analytics_date"]}}
+
+
+def machine_cards(fx, terminal, rng):
+    return "GET", "/analytics/machine-cards", {"params": {"date": fx["analytics_date"]}}
+
+
+def moulds_search(fx, terminal, rng):
+    return "GET", "/moulds/", {"params": {"search": rng.choice(fx["search_terms"])}}
+
+
+def changeovers(fx, terminal, rng):
+    return "GET", "/changeovers/", {}
+
+
+def auth_token(fx, terminal, rng):
+    return "POST", "/auth/token", {"data": {"username": terminal["username"], "password": PASSWORD}}
+
+
+SCENARIOS = {
+    "logs_post": (logs_post, "user"),
+    "worker_cards": (worker_cards, "admin"),
+    "machine_cards": (machine_cards, "admin"),
+    "moulds_search": (moulds_search, "user"),
+    "changeovers": (changeovers, "user"),
+    "auth_token": (auth_token, "user"),
+}
+
+
+# ---------- serwer ----------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int) -> tuple:
+    port = free_port()
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:create_app", "--factory",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR, env=dict(os.environ),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"serwer zakończył się z kodem {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/production/machine-statuses", timeout=1).status_code == 200:
+                return proc, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("serwer nie wystartował w 30 s")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------- pomiar ----------
+
+async def login(client, username: str) -> str:
+    r = await client.post("/auth/token", data={"username": username, "password": PASSWORD})
+    r.raise_for_status()
+    return r.json()["access_token"]
+
+
+async def make_terminals(client, fx, role: str, n: int) -> list:
+    pool = fx["admins"] if role == "admin" else fx["users"]
+    names = [pool[i % len(pool)] for i in range(n)]
+    tokens = {}
+    for name in dict.fromkeys(names):
+        tokens[name] = await login(client, name)
+    return [
+        {"username": name, "user_id": fx["user_ids"][name], "headers": {"Authorization": f"Bearer {tokens[name]}"}}
+        for name in names
+    ]
+
+
+async def run_scenario(client, fx, name: str, args) -> dict:
+    build, role = SCENARIOS[name]
+    terminals = await make_terminals(client, fx, role, args.terminals)
+    latencies, errors, statuses = [], 0, {}
+
+    async def terminal_loop(i: int, terminal: dict, until: float, record: bool):
+        nonlocal errors
+        rng = random.Random(f"{args.seed}:{name}:{i}")
+        while time.perf_counter() < until:
+            method, url, kwargs = build(fx, terminal, rng)
+            t0 = time.perf_counter()
+            r = await client.request(method, url, headers=terminal["headers"], **kwargs)
+            if not record:
+                continue
+            latencies.append(time.perf_counter() - t0)
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+            if r.status_code >= 400:
+                errors += 1
+
+    if args.warmup:
+        until = time.perf_counter() + args.warmup
+        await asyncio.gather(*(terminal_loop(i, t, until, False) for i, t in enumerate(terminals)))
+
+    t0 = time.perf_counter()
+    until = t0 + args.duration
+    await asyncio.gather(*(terminal_loop(i, t, until, True) for i, t in enumerate(terminals)))
+    elapsed = time.perf_counter() - t0
+
+    if not latencies:
+        return {"scenario": name, "requests": 0, "errors": 0}
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+    }
+
+
+async def cleanup_logs(client, fx, headers: dict) -> int:
+    """Usuwa logi zapisane przez logs_post i przelicza czasy dotkniętych operacji."""
+    with engine.begin() as conn:
+        touched = list(conn.execute(
+            text("DELETE FROM operation_logs WHERE note = :note RETURNING operation_id"), {"note": fx["note"]},
+        ).scalars())
+    for operation_id in sorted(set(touched)):
+        await client.post(f"/production/operations/{operation_id}/recalculate", headers=headers)
+    return len(touched)
+
+
+@asynccontextmanager
+async def open_client(url: str | None, connections: int, timeout: float):
+    """Klient HTTP do serwera pod url albo (url=None) do aplikacji w tym procesie."""
+    if url is not None:
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+            yield client
+        return
+
+    from main import create_app
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            yield client
+
+
+async def run(args, fx, url: str | None) -> list:
+    async with open_client(url, args.terminals, args.timeout) as client:
+        results = []
+        for name in args.scenarios:
+            result = await run_scenario(client, fx, name, args)
+            results.append(result)
+            print(f"  {name}: {result.get('rps', 0)} req/s, p95 {result.get('p95_ms', '-')} ms", file=sys.stderr)
+        if "logs_post" in args.scenarios and not args.keep_writes:
+            admin = await make_terminals(client, fx, "admin", 1)
+            removed = await cleanup_logs(client, fx, admin[0]["headers"])
+            print(f"  cleanup: {removed} bench logs removed", file=sys.stderr)
+        return results
+
+
+# ---------- porównanie ----------
+
+def compare(results: list, baseline_path: str, threshold: float) -> bool:
+    """Wypisuje zmiany względem poprzedniego wyniku; True = jest regresja."""
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = {r["scenario"]: r for r in json.load(fh)["results"]}
+
+    regressed = False
+    print(f"\ncompared with {baseline_path} (threshold {threshold:g}%)")
+    print(f"{'scenario':<14} {'p95 ms':>16} {'req/s':>18}")
+    for r in results:
+        old = baseline.get(r["scenario"])
+        if not old or not r.get("requests") or not old.get("requests"):
+            continue
+        p95_change = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        rps_change = (r["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+        worse = p95_change > threshold or rps_change < -threshold
+        regressed |= worse
+        print(
+            f"{r['scenario']:<14} {old['p95_ms']:>7}->{r['p95_ms']:<8} {old['rps']:>8}->{r['rps']:<9}"
+            f"{'REGRESSION' if worse else ''}"
+        )
+    return regressed
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Latency and throughput of hot API paths under N concurrent terminals.")
+    parser.add_argument("--terminals", type=int, default=8, help="concurrent clients (shop-floor terminals)")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--url", help="benchmark a running server instead of starting one")
+    parser.add_argument("--in-process", action="store_true", help="run the app in this process via ASGI, no server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started server")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keep-writes", action="store_true", help="do not delete logs written by logs_post")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare with")
+    parser.add_argument("--threshold", type=float, default=15.0, help="regression threshold in percent")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    fx = load_fixtures(random.Random(args.seed))
+    fx["note"] = f"bench:{uuid.uuid4().hex[:8]}"
+    if "logs_post" in args.scenarios and not fx["operations"]:
+        parser.error("no workstation has a current operation – nothing for logs_post to log against")
+
+    if args.in_process:
+        proc, url = None, None
+    else:
+        proc, url = (None, args.url) if args.url else start_server(args.workers)
+    try:
+        results = asyncio.run(run(args, fx, url))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(f"{'scenario':<14} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+    for r in results:
+        if r["requests"]:
+            print(f"{r['scenario']:<14} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8} {r['errors']:>7}")
+        else:
+            print(f"{r['scenario']:<14} {'no requests completed':>43}")
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({
+                "commit": git_commit(),
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+                "args": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+                "dataset": fx["counts"],
+                "analytics_date": fx["analytics_date"],
+                "results": results,
+            }, fh, indent=2)
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
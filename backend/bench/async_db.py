@@ -0,0 +1,147 @@
+# bench/async_db.py
+"""
+Przepustowość przy równoległych żądaniach: stary wzorzec (async def + sync
+Session, zapytanie blokuje pętlę zdarzeń) vs AsyncSession (asyncpg).
+
+    cd backend
+    python -m bench.async_db
+    python -m bench.async_db --requests 400 --concurrency 32 --slow 4 --slow-seconds 1.0
+
+Scenariusz na jednej pętli zdarzeń (tak jak jeden worker uvicorna):
+w tle leci --slow "ciężkich" żądań (pg_sleep, zastępczo za analitykę),
+a równolegle --requests lekkich GET-ów listy stanowisk. Mierzymy req/s
+lekkich żądań i ich opóźnienia. Potrzebna działająca baza z db/database.py.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import APIRouter
+from sqlalchemy import select, text
+
+import main
+from db.database import SessionLocal, async_db_dependency
+from models.production import Workstation
+from routers import auth
+
+legacy = APIRouter(prefix="/_bench")
+
+
+@legacy.get("/legacy/workstations")
+async def legacy_workstations():
+    # tak wyglądały handlery przed AsyncSession – zapytanie wprost na pętli zdarzeń
+    db = SessionLocal()
+    try:
+        return [ws.id for ws in db.query(Workstation).order_by(Workstation.name.asc()).all()]
+    finally:
+        db.close()
+
+
+@legacy.get("/legacy/slow")
+async def legacy_slow(seconds: float):
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT pg_sleep(:s)"), {"s": seconds})
+    finally:
+        db.close()
+
+
+@legacy.get("/async/workstations")
+async def async_workstations(db: async_db_dependency):
+    return [ws.id for ws in (await db.scalars(select(Workstation).order_by(Workstation.name.asc()))).all()]
+
+
+@legacy.get("/async/slow")
+async def async_slow(seconds: float, db: async_db_dependency):
+    await db.execute(text("SELECT pg_sleep(:s)"), {"s": seconds})
+
+
+def build_app():
+    app = main.app
+    app.include_router(legacy)
+    for dep in (auth.user_required, auth.admin_required, auth.editor_required, auth.superadmin_required):
+        app.dependency_overrides[dep] = lambda: None
+    return app
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_scenario(client, mode: str, args) -> dict:
+    fast_url = f"/_bench/{mode}/workstations"
+    slow_url = f"/_bench/{mode}/slow"
+    latencies = []
+    errors = 0
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def fast():
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            r = await client.get(fast_url)
+            latencies.append(time.perf_counter() - t0)
+            if r.status_code != 200:
+                errors += 1
+
+    async def slow():
+        for _ in range(args.slow_rounds):
+            await client.get(slow_url, params={"seconds": args.slow_seconds})
+
+    # rozgrzanie puli połączeń
+    await asyncio.gather(*(client.get(fast_url) for _ in range(args.concurrency)))
+
+    t0 = time.perf_counter()
+    slow_tasks = [asyncio.create_task(slow()) for _ in range(args.slow)]
+    await asyncio.sleep(0)
+    await asyncio.gather(*(fast() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - t0
+    await asyncio.gather(*slow_tasks)
+
+    return {
+        "mode": mode,
+        "requests": args.requests,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(args.requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+    }
+
+
+async def run(args) -> list:
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        return [await run_scenario(client, mode, args) for mode in ("legacy", "async")]
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent throughput: sync Session on the loop vs AsyncSession.")
+    parser.add_argument("--requests", type=int, default=200, help="light requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--slow", type=int, default=2, help="parallel slow request streams")
+    parser.add_argument("--slow-rounds", type=int, default=3, help="slow requests per stream")
+    parser.add_argument("--slow-seconds", type=float, default=0.5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    print(f"{'mode':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'errors':>7}")
+    for r in results:
+        print(f"{r['mode']:<8} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['max_ms']:>8} {r['errors']:>7}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": results}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,228 @@
+# bench/payloads.py
+"""
+Rozmiar i koszt serializacji dużych list na danych syntetycznych.
+
+    cd backend
+    python -m scripts.seed_synthetic --scale medium --seed 1 --end 2026-06-30 --truncate
+    python -m bench.payloads
+    python -m bench.payloads --in-process --repeat 10 --json results/payloads.json
+    python -m bench.payloads --url http://10.10.77.75:8000 --scenarios moulds,changeovers
+
+Trzy części:
+
+  wire       każda lista pobrana z Accept-Encoding: identity / gzip / br –
+             bajty na drucie (po kompresji, tak jak idą po Wi-Fi do
+             terminala) i mediana czasu odpowiedzi.
+  serialize  ta sama, prawdziwa odpowiedź zwalidowana do schematu *Read i
+             zserializowana na trzy sposoby: json.dumps(jsonable_encoder(...))
+             (domyślna ścieżka FastAPI bez response_model), orjson
+             (FastJSONResponse) i TypeAdapter.dump_json (response_model /
+             ListAdapter z app/responses.py).
+  formats    ?format=json / columnar / msgpack / msgpack-columnar – bajty
+             bez kompresji i z gzip oraz czas parsowania po stronie klienta
+             (json.loads / msgpack.unpackb – w przeglądarce proporcje są
+             podobne: JSON.parse vs dekoder MessagePack).
+
+Bez --url startuje serwer jak bench.api (uvicorn, jeden worker).
+
+Scenariusze:
+    moulds        GET /moulds/  (do 1000 form)
+    tpm           GET /tpm/  (do 1000 zgłoszeń)
+    logs          GET /production/logs?operation_id=  (operacja z największą liczbą logów)
+    changeovers   GET /changeovers/?limit=5000
+    operations    GET /production/operations  (wszystkie operacje – największa lista)
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import text
+
+from bench.api import git_commit, load_fixtures, login, open_client, start_server
+from db.database import engine
+from schemas.changeovers import ChangeoverRead
+from schemas.mould import MouldReadWithTpm
+from schemas.moulds_tpm import MouldsTpmRead
+from schemas.production import OperationLogRead, OperationRead
+
+try:
+    import orjson
+except ImportError:  # bez orjson ta kolumna jest pomijana
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # bez msgpack formaty msgpack są pomijane
+    msgpack = None
+
+ENCODINGS = ("identity", "gzip", "br")
+FORMATS = ("json", "columnar", "msgpack", "msgpack-columnar")
+
+# (fx) -> (url, params, schema odpowiedzi)
+SCENARIOS = {
+    "moulds": lambda fx: ("/moulds/", {}, MouldReadWithTpm),
+    "tpm": lambda fx: ("/tpm/", {}, MouldsTpmRead),
+    "logs": lambda fx: ("/production/logs", {"operation_id": fx["busiest_operation"]}, OperationLogRead),
+    "changeovers": lambda fx: ("/changeovers/", {"limit": 5000}, ChangeoverRead),
+    "operations": lambda fx: ("/production/operations", {}, OperationRead),
+}
+
+
+def busiest_operation() -> int | None:
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT operation_id FROM operation_logs GROUP BY operation_id ORDER BY count(*) DESC LIMIT 1"
+        )).scalar()
+
+
+def timed(fn, repeat: int) -> float:
+    """Mediana w ms."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return round(statistics.median(times) * 1000, 2)
+
+
+def serialize_timings(payload: list, schema, repeat: int) -> dict:
+    adapter = TypeAdapter(List[schema])
+    items = adapter.validate_python(payload)
+    out = {
+        "stdlib_ms": timed(lambda: json.dumps(jsonable_encoder(items)).encode(), repeat),
+        "pydantic_ms": timed(lambda: adapter.dump_json(items), repeat),
+    }
+    if orjson is not None:
+        # FastJSONResponse dostaje to, co zwraca handler – tu dicty z model_dump
+        out["orjson_ms"] = timed(lambda: orjson.dumps([item.model_dump() for item in items]), repeat)
+    return out
+
+
+def decode(fmt: str, content: bytes):
+    return msgpack.unpackb(content) if fmt.startswith("msgpack") else json.loads(content)
+
+
+async def format_sizes(client, path: str, params: dict, headers: dict, repeat: int) -> dict:
+    out = {}
+    for fmt in FORMATS:
+        if fmt.startswith("msgpack") and msgpack is None:
+            continue
+        sizes = {}
+        for encoding in ("identity", "gzip"):
+            r = await client.get(path, params={**params, "format": fmt}, headers={**headers, "Accept-Encoding": encoding})
+            r.raise_for_status()
+            sizes[encoding] = r.num_bytes_downloaded
+        content = r.content
+        out[fmt] = {
+            "bytes": sizes["identity"],
+            "gzip_bytes": sizes["gzip"],
+            "parse_ms": await asyncio.to_thread(timed, lambda: decode(fmt, content), repeat),
+        }
+    return out
+
+
+async def measure(args, fx, url: str | None) -> list:
+    results = []
+    async with open_client(url, 1, args.timeout) as client:
+        headers = {"Authorization": f"Bearer {await login(client, fx['admins'][0])}"}
+        for name in args.scenarios:
+            path, params, schema = SCENARIOS[name](fx)
+            result = {"scenario": name, "url": path, "params": params}
+            payload = None
+            for encoding in ENCODINGS:
+                sizes, times = [], []
+                for _ in range(args.repeat + 1):  # pierwszy przebieg rozgrzewa cache
+                    started = time.perf_counter()
+                    r = await client.get(path, params=params, headers={**headers, "Accept-Encoding": encoding})
+                    times.append(time.perf_counter() - started)
+                    r.raise_for_status()
+                    sizes.append(r.num_bytes_downloaded)
+                result[encoding] = {
+                    "bytes": sizes[-1],
+                    "content_encoding": r.headers.get("content-encoding", "identity"),
+                    "median_ms": round(statistics.median(times[1:]) * 1000, 1),
+                }
+                payload = r.json()
+            result["items"] = len(payload)
+            result["serialize"] = await asyncio.to_thread(serialize_timings, payload, schema, args.repeat)
+            result["formats"] = await format_sizes(client, path, params, headers, args.repeat)
+            results.append(result)
+    return results
+
+
+def kb(n: int) -> str:
+    return f"{n / 1024:.0f}"
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Wire size per Accept-Encoding and list format, and serialization cost of large list responses.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--url", help="benchmark a running server instead of starting one")
+    parser.add_argument("--in-process", action="store_true", help="run the app in this process via ASGI, no server")
+    parser.add_argument("--repeat", type=int, default=5, help="measured repetitions per request / serializer")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    fx = load_fixtures(random.Random(0))
+    fx["busiest_operation"] = busiest_operation()
+    if "logs" in args.scenarios and fx["busiest_operation"] is None:
+        parser.error("no operation logs – seed the database first")
+
+    if args.in_process:
+        proc, url = None, None
+    else:
+        proc, url = (None, args.url) if args.url else start_server(1)
+    try:
+        results = asyncio.run(measure(args, fx, url))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(f"{'scenario':<12} {'items':>6} {'json KB':>8} {'gzip KB':>8} {'br KB':>7} "
+          f"{'ms id/gz/br':>16} {'stdlib ms':>10} {'orjson ms':>10} {'pydantic ms':>12}")
+    for r in results:
+        ident, gz, br, ser = r["identity"], r["gzip"], r["br"], r["serialize"]
+        times = f"{ident['median_ms']:.0f}/{gz['median_ms']:.0f}/{br['median_ms']:.0f}"
+        print(f"{r['scenario']:<12} {r['items']:>6} {kb(ident['bytes']):>8} "
+              f"{kb(gz['bytes']) + ('' if gz['content_encoding'] == 'gzip' else '*'):>8} "
+              f"{kb(br['bytes']) + ('' if br['content_encoding'] == 'br' else '*'):>7} {times:>16} "
+              f"{ser['stdlib_ms']:>10} {ser.get('orjson_ms', '-'):>10} {ser['pydantic_ms']:>12}")
+    if any(r["br"]["content_encoding"] != "br" or r["gzip"]["content_encoding"] != "gzip" for r in results):
+        print("* sent uncompressed (below COMPRESSION_MIN_BYTES, brotli missing or compression disabled)")
+
+    print(f"\n{'scenario':<12} {'format':<17} {'KB':>8} {'gzip KB':>8} {'parse ms':>9}")
+    for r in results:
+        for fmt, f in r["formats"].items():
+            print(f"{r['scenario']:<12} {fmt:<17} {kb(f['bytes']):>8} {kb(f['gzip_bytes']):>8} {f['parse_ms']:>9}")
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({
+                "commit": git_commit(),
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+                "args": {k: v for k, v in vars(args).items() if k != "json"},
+                "dataset": fx["counts"],
+                "results": results,
+            }, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,248 @@
+# bench/plans.py
+"""
+Kontrola planów zapytań dla najgorętszych ścieżek (PostgreSQL).
+
+    cd backend
+    python -m scripts.seed_synthetic --scale medium --seed 1 --end 2026-06-30 --truncate
+    python -m bench.plans --update         # zapisuje bench/plans_baseline.json
+    python -m bench.plans                  # porównuje, kod 1 przy regresji
+    python -m bench.plans --scenarios mould_search,tpm_search --tolerance 0.5 -v
+
+Zapytania nie są tu przepisane ręcznie: każdy scenariusz wywołuje prawdziwy
+endpoint (aplikacja w tym procesie, jak bench.api --in-process), a
+app.query_debug.capture_queries zbiera SQL razem z parametrami dokładnie
+tak, jak poszedł do bazy. Każde zapytanie przechodzi potem przez
+EXPLAIN (FORMAT JSON) – bez ANALYZE, więc nic nie jest wykonywane.
+
+Z planu bierzemy: użyte indeksy, tabele czytane Seq Scanem i całkowity koszt.
+Regresja względem pliku bazowego:
+    - zniknął indeks, którego plan używał (np. nowy filtr wymusił Seq Scan)
+    - koszt wzrósł o więcej niż --tolerance (0.3 = +30%)
+Niezależnie od pliku bazowego scenariusz musi użyć indeksów z
+REQUIRED_INDEXES – inaczej plan nagrany już na Seq Scanie przechodziłby
+porównanie po cichu. --update też tego pilnuje i takiego planu nie zapisze.
+Zapytania parowane są po treści SQL, a niedopasowane po kolejności w
+scenariuszu; zmieniony SQL jest tylko sygnalizowany (po świadomej zmianie –
+--update).
+
+Koszty zależą od danych i statystyk, więc plik bazowy ma sens tylko dla tego
+samego zbioru: seed_synthetic z tymi samymi --scale / --seed / --end.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+from pathlib import Path
+
+from app.query_debug import capture_queries
+from bench.api import PASSWORD, load_fixtures, open_client
+from db.database import async_engine, engine
+
+BASELINE = Path(__file__).resolve().parent / "plans_baseline.json"
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+# (fx) -> (metoda, url, kwargs do httpx)
+SCENARIOS = {
+    "log_recalculation": lambda fx: ("POST", f"/production/operations/{fx['operations'][0][0]}/recalculate", {}),
+    "worker_analytics": lambda fx: ("GET", "/analytics/worker-cards", {"params": {"date": fx["analytics_date"]}}),
+    "machine_analytics": lambda fx: ("GET", "/analytics/machine-cards", {"params": {"date": fx["analytics_date"]}}),
+    "mould_search": lambda fx: ("GET", "/moulds/", {"params": {"search": "F001"}}),
+    "open_changeovers": lambda fx: ("GET", "/changeovers/", {"params": {"only_open": "true"}}),
+    "tpm_search": lambda fx: ("GET", "/tpm/", {"params": {"search": "F001"}}),
+}
+
+# indeksy, których plan scenariusza musi użyć (w którymkolwiek zapytaniu)
+REQUIRED_INDEXES = {
+    "log_recalculation": ("ix_operation_logs_operation_id_created_at",),
+    "worker_analytics": ("ix_operation_logs_created_at",),
+    "machine_analytics": ("ix_operation_logs_created_at",),
+    "open_changeovers": ("ix_changeovers_open",),
+    # ILIKE '%...%' po numerze formy – bez pg_trgm żaden indeks tu nie pomoże (has_open_tpm
+    # listy planner liczy jednym hashowanym SubPlanem po moulds_tpm, nie sondą na formę)
+    "mould_search": (),
+    "tpm_search": (),
+}
+
+
+def statement_key(statement: str) -> str:
+    return hashlib.sha1(" ".join(statement.split()).encode()).hexdigest()[:12]
+
+
+def summarize_plan(plan: dict) -> dict:
+    indexes, seq_scans = set(), set()
+
+    def walk(node):
+        if node.get("Index Name"):
+            indexes.add(node["Index Name"])
+        if node.get("Node Type") == "Seq Scan":
+            seq_scans.add(node.get("Relation Name"))
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return {
+        "cost": plan["Plan"]["Total Cost"],
+        "indexes": sorted(indexes),
+        "seq_scans": sorted(seq_scans),
+    }
+
+
+async def explain(query) -> dict:
+    """EXPLAIN tym samym sterownikiem, który wykonał zapytanie (inne placeholdery)."""
+    sql = "EXPLAIN (FORMAT JSON) " + query.statement
+    if query.driver == "asyncpg":
+        async with async_engine.connect() as conn:
+            result = await conn.exec_driver_sql(sql, tuple(query.parameters or ()))
+            raw = result.scalar()
+    else:
+        with engine.connect() as conn:
+            raw = conn.exec_driver_sql(sql, query.parameters or {}).scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    return summarize_plan(plan)
+
+
+async def capture(args, fx) -> dict:
+    results = {}
+    async with open_client(None, 1, args.timeout) as client:
+        r = await client.post("/auth/token", data={"username": fx["admins"][0], "password": PASSWORD})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        for name in args.scenarios:
+            method, url, kwargs = SCENARIOS[name](fx)
+            with capture_queries() as captured:
+                r = await client.request(method, url, headers=headers, **kwargs)
+            if r.status_code >= 400:
+                raise SystemExit(f"{name}: {method} {url} -> {r.status_code} {r.text[:200]}")
+
+            statements = []
+            for query in captured:
+                if not query.statement.lstrip().upper().startswith(EXPLAINABLE):
+                    continue
+                statements.append({
+                    "sql": " ".join(query.statement.split()),
+                    "key": statement_key(query.statement),
+                    "origin": query.origin,
+                    **await explain(query),
+                })
+            results[name] = statements
+    return results
+
+
+def missing_indexes(current: dict) -> list:
+    """[(scenariusz, None, opis, True)] dla scenariuszy bez wymaganego indeksu w planie."""
+    findings = []
+    for name, statements in current.items():
+        used = {index for s in statements for index in s["indexes"]}
+        missing = [index for index in REQUIRED_INDEXES[name] if index not in used]
+        if missing:
+            findings.append((name, None, f"required index not used: {', '.join(missing)}", True))
+    return findings
+
+
+def report(findings: list) -> int:
+    for name, i, message, regression in findings:
+        where = f"{name}[{i}]" if i is not None else name
+        print(f"{'REGRESSION' if regression else 'note':<10} {where}: {message}")
+    return sum(1 for f in findings if f[3])
+
+
+def compare_statement(name, i, new: dict, old: dict, tolerance: float) -> list:
+    findings = []
+    lost = sorted(set(old["indexes"]) - set(new["indexes"]))
+    if lost:
+        findings.append((name, i, f"index no longer used: {', '.join(lost)}", True))
+    new_seq = sorted(set(new["seq_scans"]) - set(old["seq_scans"]))
+    if new_seq:
+        findings.append((name, i, f"new Seq Scan on: {', '.join(new_seq)}", bool(lost)))
+    if old["cost"] and new["cost"] > old["cost"] * (1 + tolerance):
+        findings.append((name, i, f"cost {old['cost']:.0f} -> {new['cost']:.0f} "
+                                  f"(+{(new['cost'] / old['cost'] - 1):.0%})", True))
+    return findings
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """
+    [(scenariusz, nr, opis, regresja?)]. Zapytania parowane najpierw po treści
+    SQL (liczba zapytań bywa zmienna – np. UPDATE tylko gdy wartość się
+    zmieniła), pozostałe po kolejności jako "SQL changed".
+    """
+    findings = []
+    for name, statements in current.items():
+        old_statements = baseline.get(name)
+        if old_statements is None:
+            findings.append((name, None, "no baseline for this scenario", False))
+            continue
+
+        unmatched_old = list(old_statements)
+        unmatched_new = []
+        for i, new in enumerate(statements):
+            old = next((o for o in unmatched_old if o["key"] == new["key"]), None)
+            if old is None:
+                unmatched_new.append((i, new))
+                continue
+            unmatched_old.remove(old)
+            findings += compare_statement(name, i, new, old, tolerance)
+
+        for (i, new), old in zip(unmatched_new, unmatched_old):
+            findings.append((name, i, "SQL changed", False))
+            findings += compare_statement(name, i, new, old, tolerance)
+        for i, _ in unmatched_new[len(unmatched_old):]:
+            findings.append((name, i, "new statement (not in baseline)", False))
+        if len(unmatched_old) > len(unmatched_new):
+            findings.append((name, None, f"{len(unmatched_old) - len(unmatched_new)} baseline statements not executed", False))
+    return findings
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot queries and compare plans with a baseline.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--update", action="store_true", help="write current plans as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative cost increase")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every statement with its plan summary")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if engine.dialect.name != "postgresql":
+        parser.error("plans are PostgreSQL-specific – point DATABASE_URL at a seeded PostgreSQL")
+
+    fx = load_fixtures(random.Random(0))
+    if not fx["operations"]:
+        parser.error("no workstation has a current operation – seed the database first")
+    current = asyncio.run(capture(args, fx))
+
+    if args.verbose:
+        for name, statements in current.items():
+            for i, s in enumerate(statements):
+                print(f"{name}[{i}] cost={s['cost']:.0f} indexes={s['indexes']} seq={s['seq_scans']}  {s['origin']}")
+                print(f"    {s['sql'][:160]}")
+
+    path = Path(args.baseline)
+    if args.update:
+        if report(missing_indexes(current)):
+            print("baseline not written – add the missing indexes (or fix REQUIRED_INDEXES) first")
+            return 1
+        baseline = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        baseline.update(current)
+        path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline written: {path} ({sum(len(v) for v in current.values())} statements)")
+        return 0
+
+    if not path.exists():
+        parser.error(f"no baseline at {path} – run with --update first")
+    findings = missing_indexes(current) + compare(current, json.loads(path.read_text(encoding="utf-8")), args.tolerance)
+    regressions = report(findings)
+    print(f"{len(args.scenarios)} scenarios, {sum(len(v) for v in current.values())} statements, {regressions} regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
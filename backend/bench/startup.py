@@ -0,0 +1,113 @@
+# bench/startup.py
+"""
+Czas zimnego startu workera: każdy pomiar w świeżym interpreterze.
+
+    cd backend
+    python -m bench.startup
+    python -m bench.startup --runs 10 --no-db --importtime 15
+
+Mierzone fazy:
+    import_main   `import main` (powinno być praktycznie zerowe – bez I/O i routerów)
+    create_app    import routerów/modeli + budowa aplikacji
+    lifespan      start serwera: katalog media/, sprawdzenie wersji schematu (baza)
+    process       cały proces od uruchomienia interpretera do wyjścia
+--no-db wyłącza sprawdzenie schematu (DB_SCHEMA_CHECK=off), np. gdy bazy nie ma.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+app = main.create_app()
+t2 = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        pass
+
+asyncio.run(boot())
+t3 = time.perf_counter()
+print(json.dumps({"import_main": t1 - t0, "create_app": t2 - t1, "lifespan": t3 - t2}))
+"""
+
+PHASES = ("import_main", "create_app", "lifespan", "process")
+
+
+def run_once(env) -> dict:
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - t0
+    return result
+
+
+def slowest_imports(env, top: int) -> list:
+    """Moduły z największym czasem własnym według `python -X importtime`."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main; main.create_app()"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start time of the app in fresh interpreters.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-db", action="store_true", help="skip the schema check (DB_SCHEMA_CHECK=off)")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list N slowest imports")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    if args.no_db:
+        env["DB_SCHEMA_CHECK"] = "off"
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    summary = {
+        phase: {
+            "median_ms": round(statistics.median(r[phase] for r in runs) * 1000, 1),
+            "max_ms": round(max(r[phase] for r in runs) * 1000, 1),
+        }
+        for phase in PHASES
+    }
+
+    print(f"{'phase':<12} {'median ms':>10} {'max ms':>10}")
+    for phase, row in summary.items():
+        print(f"{phase:<12} {row['median_ms']:>10} {row['max_ms']:>10}")
+
+    imports = []
+    if args.importtime:
+        imports = slowest_imports(env, args.importtime)
+        print(f"\n{'cumulative ms':>14} {'self ms':>8}  module")
+        for cumulative_us, self_us, name in imports:
+            print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "runs": runs, "summary": summary, "imports": imports}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
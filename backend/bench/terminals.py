@@ -0,0 +1,325 @@
+# bench/terminals.py
+"""
+Symulator terminali na hali: ile terminali obsłuży jedna instancja.
+
+    cd backend
+    python -m scripts.seed_synthetic --scale medium --truncate
+    python -m bench.terminals --steps 10,20,40,80,160 --step-duration 30
+    python -m bench.terminals --url http://10.10.77.75:8000 --poll 2 --status-interval 20 --json results/terminals.json
+    DATABASE_URL=sqlite:///./bench.db python -m bench.terminals --in-process --steps 5,10,20
+
+Każdy terminal jest przypięty do stanowiska (po kolei, przy większej liczbie
+terminali niż stanowisk – kilka na jedno) i zachowuje się jak aplikacja MES:
+
+    start        POST /auth/token, POST /mes-session/logs (login)
+    co --poll s  GET /production/workstations, GET /production/operations?task_id=
+    co ~--status-interval s
+                 zmiana statusu: PUT /production/workstations/{id} + POST /production/logs
+    koniec       POST /mes-session/logs (logout)
+
+Odstępy mają losowy rozrzut ±20%, a terminale startują w rozłożeniu na
+pierwszy okres, żeby nie odpytywać serwera w jednej chwili.
+
+Terminale dochodzą schodkami (--steps); po zalogowaniu nowych terminali
+(bcrypt nie wchodzi do pomiaru) i --ramp s rozgrzania każdy schodek mierzony
+jest przez --step-duration s. Per schodek: osiągnięte vs zadane req/s,
+p50/p95/p99 per akcja i odsetek błędów. Schodek jest nasycony, gdy
+p95 którejś akcji > --slo-ms, błędy > --max-error-rate albo serwer nie
+nadąża z zadanym ruchem (< 90% req/s). Wynik: największa liczba terminali
+przed pierwszym nasyceniem.
+
+Na koniec stan stanowisk jest przywracany, a logi zapisane przez symulator
+(operation_logs z note = "bench:<id>", mes_session_logs od startu) usuwane.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+from sqlalchemy import text
+
+from bench.api import PASSWORD, cleanup_logs, git_commit, open_client, percentile, start_server
+from db.database import engine
+
+ACTIONS = ("login", "session_log", "poll_workstations", "poll_operations", "status_put", "log_post")
+JITTER = 0.2
+
+
+def load_terminal_fixtures() -> dict:
+    with engine.connect() as conn:
+        users = conn.execute(text(
+            "SELECT id, username, role FROM users WHERE username LIKE 'syn\\_%' ESCAPE '\\' ORDER BY id"
+        )).all()
+        if not users:
+            raise SystemExit("brak użytkowników syn_* – najpierw python -m scripts.seed_synthetic")
+        workstations = conn.execute(text(
+            """
+            SELECT w.id, w.status_id, w.user_id, w.current_operation_id, o.task_id
+            FROM workstations w JOIN operations o ON o.id = w.current_operation_id
+            ORDER BY w.id
+            """
+        )).all()
+        if not workstations:
+            raise SystemExit("żadne stanowisko nie ma bieżącej operacji")
+        statuses = list(conn.execute(text("SELECT id FROM machine_statuses ORDER BY id")).scalars())
+        mes_log_start = conn.execute(text("SELECT coalesce(max(id), 0) FROM mes_session_logs")).scalar()
+    return {
+        "users": [(u.id, u.username) for u in users],
+        "admins": [u.username for u in users if u.role in ("admin", "admindn", "superadmin")],
+        "workstations": [dict(ws._mapping) for ws in workstations],
+        "statuses": statuses,
+        "mes_log_start": mes_log_start,
+    }
+
+
+class Collector:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.perf_counter()
+        self.latencies = {action: [] for action in ACTIONS}
+        self.errors = {action: 0 for action in ACTIONS}
+
+    def record(self, action: str, elapsed: float, ok: bool):
+        self.latencies[action].append(elapsed)
+        if not ok:
+            self.errors[action] += 1
+
+
+class Terminal:
+    def __init__(self, index: int, client, fx: dict, collector: Collector, args):
+        self.client = client
+        self.fx = fx
+        self.collector = collector
+        self.args = args
+        self.rng = random.Random(f"{args.seed}:{index}")
+        self.user_id, self.username = fx["users"][index % len(fx["users"])]
+        self.ws = fx["workstations"][index % len(fx["workstations"])]
+        self.headers = {}
+        self.ready = asyncio.Event()  # po logowaniu (albo jego porażce)
+
+    def jitter(self, seconds: float) -> float:
+        return seconds * self.rng.uniform(1 - JITTER, 1 + JITTER)
+
+    async def call(self, action: str, method: str, url: str, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = r.status_code < 400
+        except httpx.HTTPError:
+            r, ok = None, False
+        self.collector.record(action, time.perf_counter() - t0, ok)
+        return r
+
+    async def session_log(self, action: str):
+        await self.call("session_log", "POST", "/mes-session/logs", json={
+            "user_id": self.user_id, "username": self.username, "action": action,
+        })
+
+    async def run(self, stop: asyncio.Event):
+        try:
+            r = await self.call("login", "POST", "/auth/token", data={"username": self.username, "password": PASSWORD})
+        finally:
+            self.ready.set()
+        if r is None or r.status_code != 200:
+            return
+        self.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        await self.session_log("login")
+
+        now = time.perf_counter()
+        next_poll = now + self.rng.uniform(0, self.args.poll)
+        next_status = now + self.rng.uniform(0, self.args.status_interval)
+        while not stop.is_set():
+            delay = min(next_poll, next_status) - time.perf_counter()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(stop.wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+            now = time.perf_counter()
+            if now >= next_poll:
+                await self.call("poll_workstations", "GET", "/production/workstations")
+                await self.call("poll_operations", "GET", "/production/operations", params={"task_id": self.ws["task_id"]})
+                next_poll = max(next_poll + self.jitter(self.args.poll), now)
+            if now >= next_status:
+                await self.change_status()
+                next_status = max(next_status + self.jitter(self.args.status_interval), now)
+
+        await self.session_log("logout")
+
+    async def change_status(self):
+        status_id = self.rng.choice(self.fx["statuses"])
+        await self.call("status_put", "PUT", f"/production/workstations/{self.ws['id']}", json={
+            "status_id": status_id, "user_id": self.user_id,
+        })
+        await self.call("log_post", "POST", "/production/logs", json={
+            "operation_id": self.ws["current_operation_id"],
+            "workstation_id": self.ws["id"],
+            "status_id": status_id,
+            "user_id": self.user_id,
+            "note": self.fx["note"],
+        })
+
+
+def offered_rps(terminals: int, args) -> float:
+    """Ruch, jaki terminale generują przy natychmiastowych odpowiedziach."""
+    return terminals * (2 / args.poll + 2 / args.status_interval)
+
+
+def summarize_step(terminals: int, collector: Collector, args) -> dict:
+    elapsed = time.perf_counter() - collector.started
+    total = sum(len(v) for v in collector.latencies.values())
+    errors = sum(collector.errors.values())
+    actions = {}
+    for action, values in collector.latencies.items():
+        if not values:
+            continue
+        actions[action] = {
+            "requests": len(values),
+            "errors": collector.errors[action],
+            "p50_ms": round(statistics.median(values) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+
+    offered = offered_rps(terminals, args)
+    achieved = total / elapsed if elapsed else 0.0
+    error_rate = errors / total if total else 1.0
+    reasons = []
+    slow = [a for a, row in actions.items() if a != "login" and row["p95_ms"] > args.slo_ms]
+    if slow:
+        reasons.append(f"p95 > {args.slo_ms:g} ms: {', '.join(slow)}")
+    if error_rate > args.max_error_rate:
+        reasons.append(f"errors {error_rate:.1%}")
+    if achieved < 0.9 * offered:
+        reasons.append(f"throughput {achieved:.1f}/{offered:.1f} req/s")
+    return {
+        "terminals": terminals,
+        "offered_rps": round(offered, 1),
+        "achieved_rps": round(achieved, 1),
+        "requests": total,
+        "error_rate": round(error_rate, 4),
+        "saturated": bool(reasons),
+        "reasons": reasons,
+        "actions": actions,
+    }
+
+
+async def restore(client, fx: dict) -> None:
+    with engine.begin() as conn:
+        for ws in fx["workstations"]:
+            conn.execute(
+                text("UPDATE workstations SET status_id = :status_id, user_id = :user_id WHERE id = :id"), ws,
+            )
+        conn.execute(
+            text("DELETE FROM mes_session_logs WHERE id > :start AND username LIKE 'syn\\_%' ESCAPE '\\'"),
+            {"start": fx["mes_log_start"]},
+        )
+    r = await client.post("/auth/token", data={"username": fx["admins"][0], "password": PASSWORD})
+    removed = await cleanup_logs(client, fx, {"Authorization": f"Bearer {r.json()['access_token']}"})
+    print(f"cleanup: workstations restored, {removed} operation logs removed", file=sys.stderr)
+
+
+async def run(args, fx: dict, url: str | None) -> list:
+    async with open_client(url, max(args.steps), args.timeout) as client:
+        collector = Collector()
+        stop = asyncio.Event()
+        tasks, steps = [], []
+        try:
+            for count in args.steps:
+                added = [Terminal(i, client, fx, collector, args) for i in range(len(tasks), count)]
+                tasks += [asyncio.create_task(terminal.run(stop)) for terminal in added]
+                await asyncio.gather(*(terminal.ready.wait() for terminal in added))
+                await asyncio.sleep(args.ramp)
+                collector.reset()
+                await asyncio.sleep(args.step_duration)
+                step = summarize_step(count, collector, args)
+                steps.append(step)
+                print(
+                    f"  {count:>4} terminals: {step['achieved_rps']}/{step['offered_rps']} req/s, "
+                    f"errors {step['error_rate']:.1%}{'  SATURATED: ' + '; '.join(step['reasons']) if step['saturated'] else ''}",
+                    file=sys.stderr,
+                )
+                if step["saturated"] and args.stop_on_saturation:
+                    break
+        finally:
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if not args.keep_writes:
+                await restore(client, fx)
+        return steps
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate shop-floor terminals and find the saturation point.")
+    parser.add_argument("--steps", default="5,10,20,40,80", help="comma-separated terminal counts")
+    parser.add_argument("--step-duration", type=float, default=20.0, help="measured seconds per step")
+    parser.add_argument("--ramp", type=float, default=5.0, help="unmeasured seconds after adding terminals")
+    parser.add_argument("--poll", type=float, default=5.0, help="seconds between workstation/operation polls")
+    parser.add_argument("--status-interval", type=float, default=60.0, help="seconds between status changes")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p95 limit per action")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--stop-on-saturation", action="store_true")
+    parser.add_argument("--url", help="load a running server instead of starting one")
+    parser.add_argument("--in-process", action="store_true", help="run the app in this process via ASGI, no server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started server")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keep-writes", action="store_true", help="keep logs and workstation states written by terminals")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+    args.steps = sorted({int(s) for s in args.steps.split(",") if s.strip()})
+
+    fx = load_terminal_fixtures()
+    fx["note"] = f"bench:{uuid.uuid4().hex[:8]}"
+
+    if args.in_process:
+        proc, url = None, None
+    else:
+        proc, url = (None, args.url) if args.url else start_server(args.workers)
+    try:
+        steps = asyncio.run(run(args, fx, url))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(f"{'terminals':>9} {'req/s':>14} {'errors':>7} " + " ".join(f"{a[:12]:>12}" for a in ACTIONS[2:]))
+    for step in steps:
+        p95 = " ".join(f"{step['actions'].get(a, {}).get('p95_ms', '-'):>12}" for a in ACTIONS[2:])
+        rps = f"{step['achieved_rps']}/{step['offered_rps']}"
+        print(f"{step['terminals']:>9} {rps:>14} {step['error_rate']:>7.1%} {p95}{'  *' if step['saturated'] else ''}")
+    print("(p95 ms per action, * = saturated)")
+
+    capacity = 0
+    for step in steps:
+        if step["saturated"]:
+            break
+        capacity = step["terminals"]
+    print(f"capacity: {capacity} terminals within p95 <= {args.slo_ms:g} ms and errors <= {args.max_error_rate:.1%}"
+          + ("" if any(s["saturated"] for s in steps) else " (not saturated – try more steps)"))
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({
+                "commit": git_commit(),
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+                "args": {k: v for k, v in vars(args).items() if k != "json"},
+                "capacity": capacity,
+                "steps": steps,
+            }, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -5,11 +5,15 @@ from fastapi import FastAPI, HTTPException, Depends
 from typing import Annotated, List
 from sqlalchemy.orm import Session
 
+from db import sqlite
+
 URL_DATABASE = "sqlite:///./mouldbase.db"
 
 engine = create_engine(
     URL_DATABASE, connect_args={"check_same_thread": False}
 )
+# WAL, busy_timeout, foreign_keys, cache – jak dla DATABASE_URL=sqlite:/// (db/sqlite.py)
+sqlite.apply_pragmas(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,136 @@
+# db/schema.py
+"""
+Sprawdzenie przy starcie, czy baza jest na najnowszej migracji (alembic head).
+
+Jedno zapytanie do alembic_version – zamiast Base.metadata.create_all, które
+na każdym workerze refleksjonowało wszystkie tabele, a i tak nie umiało dodać
+kolumn ani indeksów do istniejących tabel. Sam Alembic (~0.1 s importu) nie
+jest tu potrzebny: head wyznaczamy z nagłówków plików w migrations/versions.
+
+SQLite (testy / benchmarki, db/sqlite.py) nie przechodzi przez migracje –
+create_sqlite_schema() zakłada tabele z modeli, zastępczy widok current_sv,
+triggery dziennika sync_changes i oznacza bazę jako będącą na head.
+"""
+import logging
+import re
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from app import settings
+
+log = logging.getLogger(__name__)
+
+VERSIONS_DIR = Path(__file__).resolve().parent.parent / "migrations" / "versions"
+
+_REVISION = re.compile(r"^revision(?::[^=]*)?=\s*['\"](\w+)['\"]", re.M)
+_DOWN_REVISION = re.compile(r"^down_revision(?::[^=]*)?=(.*)$", re.M)
+
+
+# na PostgreSQL current_sv to widok systemu SV (poza naszymi migracjami);
+# na SQLite zastępczy widok z bieżącym stanem stanowisk – inne kolumny,
+# ale /current_sv zwraca dowolne wiersze, więc endpoint działa tak samo
+CURRENT_SV_SQLITE = """
+CREATE VIEW IF NOT EXISTS current_sv AS
+SELECT w.id AS workstation_id, w.name AS workstation, ms.status_no, ms.name AS status,
+       t.detail_number, t.detail_name, o.operation_no, u.username
+FROM workstations w
+LEFT JOIN machine_statuses ms ON ms.id = w.status_id
+LEFT JOIN production_tasks t ON t.id = w.current_task_id
+LEFT JOIN operations o ON o.id = w.current_operation_id
+LEFT JOIN users u ON u.id = w.user_id
+"""
+
+
+def sqlite_sync_triggers(table: str, parent: tuple | None) -> list:
+    """
+    Odpowiednik triggerów sync_journal z migracji 0003. Bez txid – na SQLite
+    zapisy są szeregowane, więc pozycją dla GET /sync jest samo seq. UPDATE
+    trafia do dziennika zawsze (porównanie wszystkich kolumn nie jest tego warte).
+    """
+    statements = []
+    for event, ref in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        refs = (ref, "OLD") if event == "UPDATE" and parent else (ref,)
+        inserts = [f"INSERT INTO sync_changes (entity, row_id) VALUES ('{table}', {ref}.id);"]
+        if parent:
+            parent_table, fk = parent
+            inserts += [f"INSERT INTO sync_changes (entity, row_id) SELECT '{parent_table}', {r}.{fk} WHERE {r}.{fk} IS NOT NULL;"
+                        for r in refs]
+        statements.append(f"CREATE TRIGGER IF NOT EXISTS sync_journal_{table}_{event.lower()} "
+                          f"AFTER {event} ON {table} BEGIN {' '.join(inserts)} END")
+    return statements
+
+
+class SchemaNotAtHead(RuntimeError):
+    pass
+
+
+def head_revisions(versions_dir: Path = VERSIONS_DIR) -> set:
+    """Rewizje, na które nie wskazuje żadne down_revision (jak ScriptDirectory.get_heads())."""
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        rev = _REVISION.search(source)
+        if not rev:
+            continue
+        revisions.add(rev.group(1))
+        down = _DOWN_REVISION.search(source)
+        if down:
+            parents.update(re.findall(r"['\"](\w+)['\"]", down.group(1)))
+    return revisions - parents
+
+
+def current_revisions(engine) -> set:
+    with engine.connect() as conn:
+        try:
+            return set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+        except DBAPIError:
+            return set()  # brak tabeli alembic_version
+
+
+def create_sqlite_schema(engine) -> None:
+    """Idempotentne: brakujące tabele, widok current_sv, triggery dziennika, alembic_version = head."""
+    from db.database import Base
+    import models.analytics, models.calendar, models.calendar_log, models.changeovers  # noqa: F401,E401
+    import models.changeovers_log, models.media, models.mes_session, models.mould  # noqa: F401,E401
+    import models.moulds_book, models.moulds_tpm, models.production, models.service, models.user  # noqa: F401,E401
+    from models.sync import SYNC_TABLES  # też rejestruje tabelę sync_changes
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(CURRENT_SV_SQLITE))
+        for table, parent in SYNC_TABLES.items():
+            for statement in sqlite_sync_triggers(table, parent):
+                conn.execute(text(statement))
+        conn.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) PRIMARY KEY)"))
+        if conn.execute(text("SELECT count(*) FROM alembic_version")).scalar() == 0:
+            for revision in head_revisions():
+                conn.execute(text("INSERT INTO alembic_version (version_num) VALUES (:v)"), {"v": revision})
+
+
+def check_schema_at_head(engine, mode: str | None = None) -> None:
+    """mode: "error" – wyjątek, "warn" – tylko log, "off" – nic nie sprawdzaj."""
+    mode = mode or settings.DB_SCHEMA_CHECK
+    if mode == "off":
+        return
+
+    heads, current = head_revisions(), current_revisions(engine)
+    if current == heads:
+        return
+
+    if not current:
+        if engine.dialect.name == "sqlite":
+            hint = "SQLite – create_sqlite_schema() przy starcie aplikacji"
+        elif "moulds" in inspect(engine).get_table_names():
+            hint = "baza założona przez create_all – `alembic stamp 0001`, potem `alembic upgrade head`"
+        else:
+            hint = "pusta baza – `alembic upgrade head`"
+    else:
+        hint = "`alembic upgrade head`"
+    msg = f"Schemat bazy nie jest na head migracji (baza: {sorted(current) or 'brak'}, kod: {sorted(heads)}): {hint}"
+
+    if mode == "warn":
+        log.warning(msg)
+        return
+    raise SchemaNotAtHead(msg)
@@ -0,0 +1,51 @@
+# db/sqlite.py
+"""
+SQLite jako lekka baza dla testów i benchmarków w jednym procesie
+(DATABASE_URL=sqlite:///./mouldbase.db) – bez działającego PostgreSQL.
+
+Engine sync (pysqlite) i async (aiosqlite) pracują na tym samym pliku, więc
+przy każdym połączeniu ustawiamy:
+
+    journal_mode=WAL      czytelnicy nie blokują zapisu i odwrotnie
+    synchronous           NORMAL – przy WAL bezpieczne dla spójności, fsync tylko na checkpoint
+    busy_timeout          czekanie na blokadę zapisu zamiast "database is locked"
+    foreign_keys=ON       SQLite domyślnie nie sprawdza kluczy obcych
+    cache_size / mmap_size / temp_store=MEMORY
+
+Baza w pamięci (sqlite://) nie nadaje się – każdy engine widziałby inną.
+"""
+from sqlalchemy import event
+
+from app import settings
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def async_url(url: str) -> str:
+    """sqlite:///plik.db -> sqlite+aiosqlite:///plik.db"""
+    return "sqlite+aiosqlite:" + url.split(":", 1)[1]
+
+
+def pragmas() -> list:
+    return [
+        "journal_mode=WAL",
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "foreign_keys=ON",
+        f"cache_size=-{settings.SQLITE_CACHE_MB * 1024}",  # ujemne = KiB
+        f"mmap_size={settings.SQLITE_MMAP_MB * 1024 * 1024}",
+        "temp_store=MEMORY",
+    ]
+
+
+def apply_pragmas(engine) -> None:
+    """Listener "connect" – dla AsyncEngine podajemy engine.sync_engine."""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas():
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
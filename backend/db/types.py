@@ -0,0 +1,10 @@
+# db/types.py
+"""
+Typy kolumn zależne od dialektu – ten sam model działa na PostgreSQL i SQLite.
+
+    JSONType   JSONB na PostgreSQL (indeksowalny, operatory @> ?), JSON (tekst) na SQLite
+"""
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+JSONType = JSON().with_variant(JSONB(), "postgresql")
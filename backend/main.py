@@ -1,45 +1,23 @@
-from fastapi import FastAPI, HTTPException, Depends
-from typing import Annotated, List
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from db.database import SessionLocal, engine
-from models.user import Users
-from db.database import Base
-from fastapi.middleware.cors import CORSMiddleware
-from schemas.orders_position import Orders_position_Base, Orders_position_Model
-from routers.auth import router as auth_router
-from fastapi.middleware.cors import CORSMiddleware
-from routers.mould import router as mould_router
-from routers.moulds_tpm import router as moulds_tpm_router
-from routers.moulds_book import router as moulds_book_router
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
-from routers.changeovers import router as changeovers_router
-from models.changeovers import Changeover  # ważne przed create_all
-from routers.changeovers import router as changeovers_router
-from routers.changeovers_log import router as changeovers_log_router
-from models.calendar import CalendarEntry  # wa‘•ne przed create_all
-from routers.calendar import router as calendar_router
-from models.calendar_log import CalendarLog  # wa‘•ne przed create_all
-from routers.calendar_log import router as calendar_log_router
-from models.production import MachineGroup, MachineStatus, OrderType, ProductionOrder, ProductionTask, Workstation, Operation, OperationLog
-from routers.production import router as production_router
-from routers.service import router as service_router
-from routers.current_sv import router as current_sv_router
-from models.analytics import AnalyticaWorkers, AnalyticaMachines  # before create_all
-from routers.analytics import router as analytics_router
-from models.mes_session import MesSessionLog  # before create_all
-from routers.mes_session import router as mes_session_router
-
-app = FastAPI()
-
-Path("../media").mkdir(parents=True, exist_ok=True)
-Path("../media/book").mkdir(parents=True, exist_ok=True)
-Path("../media/tpm").mkdir(parents=True, exist_ok=True)
-
-app.mount("/media", StaticFiles(directory="media"), name="media")
-
-origins = [
+"""
+Punkt wejścia aplikacji.
+
+    uvicorn main:app --host 0.0.0.0 --port 8000
+    uvicorn main:create_app --factory --host 0.0.0.0 --port 8000
+
+Import modułu nie robi żadnego I/O i nie ładuje nawet FastAPI – aplikację buduje
+create_app(), a `main.app` powstaje leniwie przy pierwszym odwołaniu.
+Katalog media/ i zgodność schematu z migracjami sprawdzane są w lifespan,
+czyli dopiero przy starcie serwera.
+"""
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
     # "http://localhost:8000",
@@ -53,33 +31,130 @@ origins = [
     "http://192.168.1.29:5173",
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    # allow_origins=origins,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app import media_refs, response_cache
+    from app.images import MEDIA_ROOT
+    from db.database import engine
+    from db.schema import check_schema_at_head, create_sqlite_schema
+
+    MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
+    if engine.dialect.name == "sqlite":
+        # testy / benchmarki w jednym procesie – schemat prosto z modeli
+        create_sqlite_schema(engine)
+    # schemat zmieniają tylko migracje (alembic upgrade head) – tu jedynie szybkie sprawdzenie wersji
+    check_schema_at_head(engine)
+    # unieważnianie cache słowników między workerami (LISTEN/NOTIFY, tylko PostgreSQL)
+    listener = await response_cache.start_listener(engine)
+    # które zdjęcia mają już miniatury (photo_variants) – odświeżane w tle
+    derivatives_refresh = media_refs.start_derivatives_refresh()
+    yield
+    await media_refs.stop_derivatives_refresh(derivatives_refresh)
+    await response_cache.stop_listener(listener)
+
+
+def create_app() -> FastAPI:
+    # FastAPI i routery (a z nimi modele, SQLAlchemy, passlib...) importowane dopiero
+    # tutaj; metryki, profilowanie i debug SQL – tylko gdy są włączone
+    from fastapi import FastAPI
+    from fastapi.datastructures import Default
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from app import settings
+    from app.compression import CompressionMiddleware
+    from app.images import MEDIA_ROOT
+    from app.media_files import MediaFiles
+    from app.responses import FastJSONResponse
+    from routers.analytics import router as analytics_router
+    from routers.auth import router as auth_router
+    from routers.calendar import router as calendar_router
+    from routers.calendar_log import router as calendar_log_router
+    from routers.changeovers import router as changeovers_router
+    from routers.changeovers_log import router as changeovers_log_router
+    from routers.current_sv import router as current_sv_router
+    from routers.mes_session import router as mes_session_router
+    from routers.mould import router as mould_router
+    from routers.moulds_book import router as moulds_book_router
+    from routers.moulds_tpm import router as moulds_tpm_router
+    from routers.production import router as production_router
+    from routers.service import router as service_router
+    from routers.sync import router as sync_router
+
+    # Default(...) – trasy z response_model zostają przy dump_json z pydantic-core,
+    # orjson tylko dla tras zwracających dict/list bez schematu (app/responses.py)
+    app = FastAPI(lifespan=lifespan, default_response_class=Default(FastJSONResponse))
+
+    # katalog tworzy lifespan – przy budowaniu aplikacji nie dotykamy dysku
+    app.mount("/media", MediaFiles(directory=MEDIA_ROOT, check_dir=False), name="media")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
     )
-       
-Base.metadata.create_all(bind=engine)
+    if settings.COMPRESSION_MIN_BYTES > 0:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_BYTES,
+            gzip_level=settings.GZIP_LEVEL,
+            brotli_quality=settings.BROTLI_QUALITY,
+        )
+    if settings.METRICS_ENABLED:
+        from app import metrics
+        from routers.metrics import router as metrics_router
+
+        # dodany jako ostatni = najbardziej zewnętrzny, więc mierzy też CORS
+        metrics.install_db_hooks()
+        app.add_middleware(metrics.MetricsMiddleware, server_timing=settings.METRICS_SERVER_TIMING)
+        app.include_router(metrics_router)
+    if settings.DB_QUERY_DEBUG:
+        from app import query_debug
+
+        query_debug.install_query_hooks()
+        app.add_middleware(query_debug.QueryDebugMiddleware, threshold=settings.DB_NPLUS1_THRESHOLD)
+    if settings.PROFILING_ENABLED:
+        from app import profiling
+
+        if profiling.available():
+            from routers.debug import router as debug_router
+
+            # bez flagi X-Profile: 1 / ?__profile=1 od superadmina tylko przepuszcza żądanie
+            app.add_middleware(profiling.ProfilingMiddleware, interval=settings.PROFILE_INTERVAL_MS / 1000)
+            app.include_router(debug_router)
+
+    app.include_router(auth_router)
+    app.include_router(mould_router)
+    app.include_router(moulds_tpm_router)
+    app.include_router(moulds_book_router)
+    app.include_router(changeovers_router)
+    app.include_router(changeovers_log_router)
+    app.include_router(calendar_router)
+    app.include_router(calendar_log_router)
+    app.include_router(production_router)
+    app.include_router(service_router)
+    app.include_router(current_sv_router)
+    app.include_router(analytics_router)
+    app.include_router(mes_session_router)
+    app.include_router(sync_router)
+    return app
+
+
+_app = None
 
-app.include_router(auth_router)
-app.include_router(mould_router)
-app.include_router(moulds_tpm_router)
-app.include_router(moulds_book_router)
-app.include_router(changeovers_router)
-app.include_router(changeovers_log_router)
-app.include_router(calendar_router)
-app.include_router(calendar_log_router)
-app.include_router(production_router)
-app.include_router(service_router)
-app.include_router(current_sv_router)
-app.include_router(analytics_router)
-app.include_router(mes_session_router)
 
+def __getattr__(name):
+    # `uvicorn main:app` i `main.app` działają jak dawniej, ale aplikacja powstaje dopiero na żądanie
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
@@ -0,0 +1,60 @@
+# migrations/env.py
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app import settings
+from db.database import Base
+# wszystkie moduły z tabelami – inaczej autogenerate uzna je za usunięte
+import models.analytics, models.calendar, models.calendar_log, models.changeovers  # noqa: F401,E401
+import models.changeovers_log, models.media, models.mes_session, models.mould  # noqa: F401,E401
+import models.moulds_book, models.moulds_tpm, models.production, models.service, models.sync  # noqa: F401,E401
+import models.user  # noqa: F401
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # w bazie są też obiekty spoza models/ (np. widok current_sv z systemu SV) –
+    # autogenerate nie może proponować ich usunięcia
+    if type_ == "table" and reflected and compare_to is None:
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # DDL (np. CREATE INDEX na dużej tabeli) nie może wpaść na statement_timeout aplikacji
+    connectable = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            compare_type=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,371 @@
+"""baseline – schemat taki, jaki zakładał Base.metadata.create_all przed migracjami
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Istniejącą bazę (założoną przez create_all) wystarczy oznaczyć:
+    alembic stamp 0001
+a potem `alembic upgrade head`.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('machine_groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_machine_groups_id'), 'machine_groups', ['id'], unique=False)
+    op.create_table('machine_statuses',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status_no', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('color', sa.String(length=30), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_machine_statuses_id'), 'machine_statuses', ['id'], unique=False)
+    op.create_index(op.f('ix_machine_statuses_status_no'), 'machine_statuses', ['status_no'], unique=True)
+    op.create_table('mes_session_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=100), nullable=False),
+    sa.Column('action', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mes_session_logs_id'), 'mes_session_logs', ['id'], unique=False)
+    op.create_table('moulds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mould_number', sa.String(length=128), nullable=False),
+    sa.Column('product', sa.Text(), nullable=False),
+    sa.Column('released', sa.Date(), nullable=True),
+    sa.Column('company', sa.Text(), nullable=False),
+    sa.Column('czy_przezbrajalna', sa.Boolean(), nullable=True),
+    sa.Column('mould_photo', sa.Text(), nullable=True),
+    sa.Column('product_photo', sa.Text(), nullable=True),
+    sa.Column('hot_system_photo', sa.Text(), nullable=True),
+    sa.Column('extra_photo_1', sa.Text(), nullable=True),
+    sa.Column('extra_photo_2', sa.Text(), nullable=True),
+    sa.Column('extra_photo_3', sa.Text(), nullable=True),
+    sa.Column('extra_photo_4', sa.Text(), nullable=True),
+    sa.Column('extra_photo_5', sa.Text(), nullable=True),
+    sa.Column('num_of_cavities', sa.String(length=128), nullable=True),
+    sa.Column('tool_weight', sa.String(length=128), nullable=True),
+    sa.Column('total_cycles', sa.Integer(), nullable=False),
+    sa.Column('to_maint_cycles', sa.Integer(), nullable=False),
+    sa.Column('from_maint_cycles', sa.Integer(), nullable=False),
+    sa.Column('place', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Integer(), nullable=False),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_moulds_id'), 'moulds', ['id'], unique=False)
+    op.create_index(op.f('ix_moulds_mould_number'), 'moulds', ['mould_number'], unique=True)
+    op.create_table('order_types',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_types_code'), 'order_types', ['code'], unique=True)
+    op.create_index(op.f('ix_order_types_id'), 'order_types', ['id'], unique=False)
+    op.create_table('service_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('operator', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.String(length=50), nullable=True),
+    sa.Column('status_service', sa.String(length=50), nullable=True),
+    sa.Column('mes_activ_service_id', sa.Integer(), nullable=True),
+    sa.Column('mes_activ_changeover_id', sa.Integer(), nullable=True),
+    sa.Column('status_changeover', sa.String(length=50), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_service_log_id'), 'service_log', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(length=2000), nullable=True),
+    sa.Column('author', sa.String(), nullable=True),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_index(op.f('ix_users_author'), 'users', ['author'], unique=False)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('production_orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_number', sa.String(length=64), nullable=False),
+    sa.Column('order_type_id', sa.Integer(), nullable=False),
+    sa.Column('is_done', sa.Boolean(), nullable=False),
+    sa.Column('team', sa.String(length=100), nullable=True),
+    sa.Column('product_name', sa.String(length=100), nullable=True),
+    sa.ForeignKeyConstraint(['order_type_id'], ['order_types.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_production_orders_id'), 'production_orders', ['id'], unique=False)
+    op.create_index(op.f('ix_production_orders_order_number'), 'production_orders', ['order_number'], unique=True)
+    op.create_table('production_tasks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('detail_number', sa.String(length=100), nullable=False),
+    sa.Column('detail_name', sa.String(length=100), nullable=False),
+    sa.Column('is_done', sa.Boolean(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['production_orders.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_production_tasks_id'), 'production_tasks', ['id'], unique=False)
+    op.create_table('workstations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('cost_center', sa.String(length=50), nullable=True),
+    sa.Column('status_id', sa.Integer(), nullable=True),
+    sa.Column('current_task_id', sa.Integer(), nullable=True),
+    sa.Column('current_operation_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('machine_group_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['current_task_id'], ['production_tasks.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['machine_group_id'], ['machine_groups.id'], ),
+    sa.ForeignKeyConstraint(['status_id'], ['machine_statuses.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_workstations_id'), 'workstations', ['id'], unique=False)
+    op.create_table('operations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('operation_no', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('suggested_duration_min', sa.Integer(), nullable=True),
+    sa.Column('is_done', sa.Boolean(), nullable=False),
+    sa.Column('is_released', sa.Boolean(), nullable=False),
+    sa.Column('is_started', sa.Boolean(), nullable=False),
+    sa.Column('duration_total_min', sa.Integer(), nullable=False),
+    sa.Column('duration_shift_min', sa.Integer(), nullable=False),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.Column('workstation_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['task_id'], ['production_tasks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['workstation_id'], ['workstations.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_operations_id'), 'operations', ['id'], unique=False)
+    # workstations <-> operations to cykl – klucz dodawany po utworzeniu obu tabel (nazwa jak z create_all)
+    op.create_foreign_key('workstations_current_operation_id_fkey', 'workstations', 'operations',
+                          ['current_operation_id'], ['id'], ondelete='SET NULL')
+    op.create_table('analytica_machines',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workstation_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('operation_id', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['operation_id'], ['operations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['workstation_id'], ['workstations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('workstation_id', 'date', 'operation_id', name='uq_ws_date_operation')
+    )
+    op.create_index(op.f('ix_analytica_machines_date'), 'analytica_machines', ['date'], unique=False)
+    op.create_index(op.f('ix_analytica_machines_id'), 'analytica_machines', ['id'], unique=False)
+    op.create_table('analytica_workers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('workstation_id', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['workstation_id'], ['workstations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'date', 'workstation_id', name='uq_user_date_workstation')
+    )
+    op.create_index(op.f('ix_analytica_workers_date'), 'analytica_workers', ['date'], unique=False)
+    op.create_index(op.f('ix_analytica_workers_id'), 'analytica_workers', ['id'], unique=False)
+    op.create_table('calendar_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mould_id', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.DateTime(), nullable=True),
+    sa.Column('end_date', sa.DateTime(), nullable=True),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_by', sa.Text(), nullable=True),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['mould_id'], ['moulds.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_calendar_entries_id'), 'calendar_entries', ['id'], unique=False)
+    op.create_table('changeovers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('from_mould_id', sa.Integer(), nullable=False),
+    sa.Column('to_mould_id', sa.Integer(), nullable=False),
+    sa.Column('available_date', sa.DateTime(), nullable=True),
+    sa.Column('needed_date', sa.DateTime(), nullable=True),
+    sa.Column('czy_wykonano', sa.Boolean(), nullable=False),
+    sa.Column('updated_by', sa.Text(), nullable=True),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['from_mould_id'], ['moulds.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['to_mould_id'], ['moulds.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_changeovers_id'), 'changeovers', ['id'], unique=False)
+    op.create_table('mouldbase_mouldsbook',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mould_id_id', sa.Integer(), nullable=False),
+    sa.Column('sv', sa.Integer(), nullable=True),
+    sa.Column('created', sa.Date(), nullable=False),
+    sa.Column('extra_photo_1', sa.Text(), nullable=True),
+    sa.Column('extra_photo_2', sa.Text(), nullable=True),
+    sa.Column('czas_trwania', sa.Integer(), nullable=True),
+    sa.Column('czas_wylaczenia', sa.Integer(), nullable=True),
+    sa.Column('tpm_type', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('opis_zgloszenia', sa.Text(), nullable=True),
+    sa.Column('ido', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['mould_id_id'], ['moulds.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mouldbase_mouldsbook_id'), 'mouldbase_mouldsbook', ['id'], unique=False)
+    op.create_table('moulds_tpm',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mould_id', sa.Integer(), nullable=False),
+    sa.Column('sv', sa.Integer(), nullable=True),
+    sa.Column('created', sa.Date(), nullable=False),
+    sa.Column('extra_photo_1', sa.Text(), nullable=True),
+    sa.Column('extra_photo_2', sa.Text(), nullable=True),
+    sa.Column('tpm_time_type', sa.Integer(), nullable=False),
+    sa.Column('opis_zgloszenia', sa.Text(), nullable=True),
+    sa.Column('ido', sa.Integer(), nullable=True),
+    sa.Column('status', sa.Integer(), nullable=False),
+    sa.Column('changed', sa.Date(), nullable=True),
+    sa.Column('author', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['mould_id'], ['moulds.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_moulds_tpm_id'), 'moulds_tpm', ['id'], unique=False)
+    op.create_table('operation_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('operation_id', sa.Integer(), nullable=False),
+    sa.Column('status_id', sa.Integer(), nullable=True),
+    sa.Column('workstation_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('note', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['operation_id'], ['operations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['status_id'], ['machine_statuses.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['workstation_id'], ['workstations.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_operation_logs_id'), 'operation_logs', ['id'], unique=False)
+    op.create_table('stanowiska_service',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nazwa_stanowiska', sa.String(length=100), nullable=False),
+    sa.Column('st', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('aktualne_przezbrojenie_id', sa.Integer(), nullable=True),
+    sa.Column('aktualne_zlecenie_serwisowe_id', sa.Integer(), nullable=True),
+    sa.Column('aktualny_typ_zlecenia', sa.String(length=100), nullable=True),
+    sa.Column('status_changeovers', sa.String(length=50), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('nazwa_stanowiska')
+    )
+    op.create_index(op.f('ix_stanowiska_service_id'), 'stanowiska_service', ['id'], unique=False)
+    op.create_table('calendar_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('calendar_entry_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.Text(), nullable=False),
+    sa.Column('old_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('new_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('updated_by', sa.Text(), nullable=True),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['calendar_entry_id'], ['calendar_entries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_calendar_log_id'), 'calendar_log', ['id'], unique=False)
+    op.create_table('changeovers_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('changeover_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.Text(), nullable=False),
+    sa.Column('old_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('new_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('updated_by', sa.Text(), nullable=True),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['changeover_id'], ['changeovers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_changeovers_log_id'), 'changeovers_log', ['id'], unique=False)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('workstations_current_operation_id_fkey', 'workstations', type_='foreignkey')
+    op.drop_index(op.f('ix_changeovers_log_id'), table_name='changeovers_log')
+    op.drop_table('changeovers_log')
+    op.drop_index(op.f('ix_calendar_log_id'), table_name='calendar_log')
+    op.drop_table('calendar_log')
+    op.drop_index(op.f('ix_stanowiska_service_id'), table_name='stanowiska_service')
+    op.drop_table('stanowiska_service')
+    op.drop_index(op.f('ix_operation_logs_id'), table_name='operation_logs')
+    op.drop_table('operation_logs')
+    op.drop_index(op.f('ix_moulds_tpm_id'), table_name='moulds_tpm')
+    op.drop_table('moulds_tpm')
+    op.drop_index(op.f('ix_mouldbase_mouldsbook_id'), table_name='mouldbase_mouldsbook')
+    op.drop_table('mouldbase_mouldsbook')
+    op.drop_index(op.f('ix_changeovers_id'), table_name='changeovers')
+    op.drop_table('changeovers')
+    op.drop_index(op.f('ix_calendar_entries_id'), table_name='calendar_entries')
+    op.drop_table('calendar_entries')
+    op.drop_index(op.f('ix_analytica_workers_id'), table_name='analytica_workers')
+    op.drop_index(op.f('ix_analytica_workers_date'), table_name='analytica_workers')
+    op.drop_table('analytica_workers')
+    op.drop_index(op.f('ix_analytica_machines_id'), table_name='analytica_machines')
+    op.drop_index(op.f('ix_analytica_machines_date'), table_name='analytica_machines')
+    op.drop_table('analytica_machines')
+    op.drop_index(op.f('ix_operations_id'), table_name='operations')
+    op.drop_table('operations')
+    op.drop_index(op.f('ix_workstations_id'), table_name='workstations')
+    op.drop_table('workstations')
+    op.drop_index(op.f('ix_production_tasks_id'), table_name='production_tasks')
+    op.drop_table('production_tasks')
+    op.drop_index(op.f('ix_production_orders_order_number'), table_name='production_orders')
+    op.drop_index(op.f('ix_production_orders_id'), table_name='production_orders')
+    op.drop_table('production_orders')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_author'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_service_log_id'), table_name='service_log')
+    op.drop_table('service_log')
+    op.drop_index(op.f('ix_order_types_id'), table_name='order_types')
+    op.drop_index(op.f('ix_order_types_code'), table_name='order_types')
+    op.drop_table('order_types')
+    op.drop_index(op.f('ix_moulds_mould_number'), table_name='moulds')
+    op.drop_index(op.f('ix_moulds_id'), table_name='moulds')
+    op.drop_table('moulds')
+    op.drop_index(op.f('ix_mes_session_logs_id'), table_name='mes_session_logs')
+    op.drop_table('mes_session_logs')
+    op.drop_index(op.f('ix_machine_statuses_status_no'), table_name='machine_statuses')
+    op.drop_index(op.f('ix_machine_statuses_id'), table_name='machine_statuses')
+    op.drop_table('machine_statuses')
+    op.drop_index(op.f('ix_machine_groups_id'), table_name='machine_groups')
+    op.drop_table('machine_groups')
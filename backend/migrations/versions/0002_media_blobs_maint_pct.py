@@ -0,0 +1,57 @@
+"""media_blobs / media_refs i indeks rankingu przeglądów form
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('media_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+    op.create_index(op.f('ix_media_blobs_id'), 'media_blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_media_blobs_sha256'), 'media_blobs', ['sha256'], unique=False)
+    op.create_table('media_refs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('blob_id', sa.Integer(), nullable=False),
+    sa.Column('owner_type', sa.String(length=20), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('field', sa.String(length=50), nullable=False),
+    sa.Column('created', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['blob_id'], ['media_blobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('owner_type', 'owner_id', 'field', name='uq_media_ref_owner_field')
+    )
+    op.create_index(op.f('ix_media_refs_blob_id'), 'media_refs', ['blob_id'], unique=False)
+    op.create_index(op.f('ix_media_refs_id'), 'media_refs', ['id'], unique=False)
+    op.create_index('ix_moulds_maint_pct', 'moulds', [sa.literal_column('(from_maint_cycles * 100 / nullif(to_maint_cycles, 0)) DESC NULLS LAST')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_moulds_maint_pct', table_name='moulds')
+    op.drop_index(op.f('ix_media_refs_id'), table_name='media_refs')
+    op.drop_index(op.f('ix_media_refs_blob_id'), table_name='media_refs')
+    op.drop_table('media_refs')
+    op.drop_index(op.f('ix_media_blobs_sha256'), table_name='media_blobs')
+    op.drop_index(op.f('ix_media_blobs_id'), table_name='media_blobs')
+    op.drop_table('media_blobs')
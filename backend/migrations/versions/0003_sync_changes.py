@@ -0,0 +1,82 @@
+"""sync_changes – dziennik zmian dla GET /sync (triggery na śledzonych tabelach)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tabela -> argumenty triggera (tabela nadrzędna, kolumna FK) – jak SYNC_TABLES w models/sync.py
+TABLES = {
+    'workstations': (),
+    'operations': (),
+    'changeovers': (),
+    'calendar_entries': (),
+    'moulds': (),
+    'moulds_tpm': ('moulds', 'mould_id'),
+}
+
+# OLD i NEW (przy INSERT / DELETE jedno z nich jest NULL) – przy zmianie FK
+# w UPDATE trafiają do dziennika obie formy nadrzędne
+SYNC_JOURNAL_FUNCTION = """
+CREATE FUNCTION sync_journal() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO sync_changes (entity, row_id, txid)
+    SELECT entity, row_id, pg_current_xact_id()::text::bigint
+    FROM (
+        SELECT TG_TABLE_NAME::text AS entity, (r ->> 'id')::int AS row_id
+        FROM unnest(ARRAY[to_jsonb(OLD), to_jsonb(NEW)]) AS r
+        UNION
+        SELECT TG_ARGV[0], (r ->> TG_ARGV[1])::int
+        FROM unnest(ARRAY[to_jsonb(OLD), to_jsonb(NEW)]) AS r
+        WHERE TG_NARGS = 2
+    ) AS changed
+    WHERE row_id IS NOT NULL;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sync_changes',
+    sa.Column('seq', sa.BigInteger(), nullable=False),
+    sa.Column('entity', sa.String(length=30), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('txid', sa.BigInteger(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index(op.f('ix_sync_changes_changed_at'), 'sync_changes', ['changed_at'], unique=False)
+    op.create_index(op.f('ix_sync_changes_txid'), 'sync_changes', ['txid'], unique=False)
+
+    op.execute(SYNC_JOURNAL_FUNCTION)
+    for table, args in TABLES.items():
+        argv = ", ".join(f"'{arg}'" for arg in args)
+        op.execute(f"CREATE TRIGGER sync_journal_ins_del AFTER INSERT OR DELETE ON {table} "
+                   f"FOR EACH ROW EXECUTE FUNCTION sync_journal({argv})")
+        # UPDATE bez faktycznej zmiany (np. zapis formularza bez edycji) nie rusza klientów
+        op.execute(f"CREATE TRIGGER sync_journal_upd AFTER UPDATE ON {table} "
+                   f"FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*) EXECUTE FUNCTION sync_journal({argv})")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER sync_journal_upd ON {table}")
+        op.execute(f"DROP TRIGGER sync_journal_ins_del ON {table}")
+    op.execute("DROP FUNCTION sync_journal()")
+    op.drop_index(op.f('ix_sync_changes_txid'), table_name='sync_changes')
+    op.drop_index(op.f('ix_sync_changes_changed_at'), table_name='sync_changes')
+    op.drop_table('sync_changes')
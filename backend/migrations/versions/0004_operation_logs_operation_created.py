@@ -0,0 +1,32 @@
+"""indeks operation_logs (operation_id, created_at)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY – terminale piszą logi cały czas, zwykły CREATE INDEX blokowałby INSERT
+    with op.get_context().autocommit_block():
+        op.create_index('ix_operation_logs_operation_id_created_at', 'operation_logs', ['operation_id', 'created_at'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_operation_logs_operation_id_created_at', table_name='operation_logs',
+                      postgresql_concurrently=True)
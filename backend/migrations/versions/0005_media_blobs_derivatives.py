@@ -0,0 +1,28 @@
+"""media_blobs.derivatives – czy miniatury zdjęcia są na dysku
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # istniejące bloby dostają false – flagi uzupełnia `python -m scripts.media_derivatives`
+    op.add_column('media_blobs', sa.Column('derivatives', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('media_blobs', 'derivatives')
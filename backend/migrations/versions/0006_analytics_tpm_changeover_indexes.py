@@ -0,0 +1,37 @@
+"""indeksy: operation_logs (created_at), moulds_tpm (mould_id, status), otwarte changeovers
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY – jak w 0004, bez blokowania zapisów do logów / zgłoszeń
+    with op.get_context().autocommit_block():
+        op.create_index('ix_operation_logs_created_at', 'operation_logs', ['created_at'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_moulds_tpm_mould_id_status', 'moulds_tpm', ['mould_id', 'status'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_changeovers_open', 'changeovers', ['id'], unique=False,
+                        postgresql_where=sa.text('czy_wykonano = false'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_changeovers_open', table_name='changeovers', postgresql_concurrently=True)
+        op.drop_index('ix_moulds_tpm_mould_id_status', table_name='moulds_tpm', postgresql_concurrently=True)
+        op.drop_index('ix_operation_logs_created_at', table_name='operation_logs', postgresql_concurrently=True)
@@ -2,8 +2,8 @@
 from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import JSONB
 from db.database import Base
+from db.types import JSONType
 
 
 class CalendarLog(Base):
@@ -15,8 +15,8 @@ class CalendarLog(Base):
 
     action = Column(Text, nullable=False)  # CREATE / UPDATE / TOGGLE_STATUS / DELETE
 
-    old_data = Column(JSONB, nullable=True)
-    new_data = Column(JSONB, nullable=True)
+    old_data = Column(JSONType, nullable=True)
+    new_data = Column(JSONType, nullable=True)
 
     updated_by = Column(Text, nullable=True)
 
@@ -1,5 +1,5 @@
 # models/changeovers.py
-from sqlalchemy import Column, Integer, Boolean, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, Boolean, ForeignKey, Text, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db.database import Base
@@ -33,3 +33,9 @@ class Changeover(Base):
         passive_deletes=True,
         order_by="desc(ChangeoverLog.id)",
     )
+
+    __table_args__ = (
+        # otwarte przezbrojenia (?only_open=true) – mała część tabeli, od najnowszych
+        Index("ix_changeovers_open", "id",
+              postgresql_where=text("czy_wykonano = false"), sqlite_where=text("czy_wykonano = false")),
+    )
@@ -2,8 +2,8 @@
 from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import JSONB
 from db.database import Base
+from db.types import JSONType
 
 
 class ChangeoverLog(Base):
@@ -16,8 +16,8 @@ class ChangeoverLog(Base):
     action = Column(Text, nullable=False)  # CREATE / UPDATE / TOGGLE_DONE / DELETE
 
     # snapshoty JSON
-    old_data = Column(JSONB, nullable=True)
-    new_data = Column(JSONB, nullable=True)
+    old_data = Column(JSONType, nullable=True)
+    new_data = Column(JSONType, nullable=True)
 
     updated_by = Column(Text, nullable=True)
 
@@ -0,0 +1,39 @@
+# models/media.py
+from sqlalchemy import Column, Integer, BigInteger, Boolean, String, Text, DateTime, ForeignKey, UniqueConstraint, false
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from db.database import Base
+
+
+class MediaBlob(Base):
+    """Plik w media/blobs adresowany treścią (nazwa = SHA-256)."""
+    __tablename__ = "media_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    url = Column(Text, nullable=False, unique=True)
+    size = Column(BigInteger, nullable=True)
+    # miniatury (thumb/medium) są na dysku – ustawia generowanie w tle i scripts/media_derivatives
+    derivatives = Column(Boolean, nullable=False, server_default=false())
+    created = Column(DateTime, nullable=False, server_default=func.now())
+
+    refs = relationship("MediaRef", back_populates="blob", passive_deletes=True)
+
+
+class MediaRef(Base):
+    """Które pole którego rekordu (mould / tpm / book) wskazuje na dany blob."""
+    __tablename__ = "media_refs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    blob_id = Column(Integer, ForeignKey("media_blobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    owner_type = Column(String(20), nullable=False)  # "mould" / "tpm" / "book"
+    owner_id = Column(Integer, nullable=False)
+    field = Column(String(50), nullable=False)
+    created = Column(DateTime, nullable=False, server_default=func.now())
+
+    blob = relationship("MediaBlob", back_populates="refs")
+
+    __table_args__ = (
+        UniqueConstraint("owner_type", "owner_id", "field", name="uq_media_ref_owner_field"),
+    )
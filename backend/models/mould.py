@@ -1,7 +1,7 @@
 # models/mould.py
 from datetime import date
 from enum import IntEnum
-from sqlalchemy import Column, Integer, String, Text, Date, Boolean
+from sqlalchemy import Column, Integer, String, Text, Date, Boolean, Index, func
 from sqlalchemy.orm import relationship
 from db.database import Base
 
@@ -92,3 +92,13 @@ class Mould(Base):
             return 1.0 / pct
         else:
             return 0.1
+
+
+# procent do przeglądu liczony w SQL – odpowiednik Mould.to_maint()
+# (NULL gdy to_maint_cycles = 0, dzielenie całkowite jak int() w Pythonie)
+maint_pct_expr = (Mould.from_maint_cycles * 100).op("/", return_type=Integer)(
+    func.nullif(Mould.to_maint_cycles, 0)
+)
+
+# NULLS LAST w indeksie zna tylko PostgreSQL – na SQLite (testy) indeksu nie zakładamy
+Index("ix_moulds_maint_pct", maint_pct_expr.desc().nulls_last()).ddl_if(dialect="postgresql")
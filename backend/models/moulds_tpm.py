@@ -1,7 +1,7 @@
 # models/moulds_tpm.py
 from datetime import date
 from enum import IntEnum
-from sqlalchemy import Column, Integer, Text, Date, ForeignKey
+from sqlalchemy import Column, Integer, Text, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from db.database import Base
 
@@ -34,5 +34,10 @@ class MouldsTpm(Base):
 
     mould = relationship("Mould", back_populates="tpm")
 
+    __table_args__ = (
+        # zgłoszenia jednej formy – has_open_tpm przy GET/PUT /moulds/{nr}, kasowanie formy
+        Index("ix_moulds_tpm_mould_id_status", "mould_id", "status"),
+    )
+
     def name_with_description(self) -> str:
         return f"{self.created} / {self.mould_id} / {self.opis_zgloszenia}"
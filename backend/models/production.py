@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -121,3 +121,10 @@ class OperationLog(Base):
     operation = relationship("Operation", back_populates="logs")
     status = relationship("MachineStatus", back_populates="operation_logs")
     workstation = relationship("Workstation", back_populates="logs")
+
+    __table_args__ = (
+        # logi jednej operacji w kolejności czasu – recalculate_operation_durations, /production/logs
+        Index("ix_operation_logs_operation_id_created_at", "operation_id", "created_at"),
+        # logi z zakresu dat (wszystkie operacje) – karty pracowników i maszyn w /analytics
+        Index("ix_operation_logs_created_at", "created_at"),
+    )
@@ -0,0 +1,31 @@
+# models/sync.py
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from sqlalchemy.sql import func
+
+from db.database import Base
+
+# tabele śledzone przez dziennik (GET /sync) -> (tabela nadrzędna, kolumna FK), której
+# wiersz też trzeba wysłać ponownie: has_open_tpm formy zależy od jej zgłoszeń TPM
+SYNC_TABLES = {
+    "workstations": None,
+    "operations": None,
+    "changeovers": None,
+    "calendar_entries": None,
+    "moulds": None,
+    "moulds_tpm": ("moulds", "mould_id"),
+}
+
+
+class SyncChange(Base):
+    """
+    Dziennik zmian dla GET /sync – wiersze dopisują wyłącznie triggery w bazie
+    (PostgreSQL: migracja 0003, SQLite: db/schema.py), aplikacja tylko czyta i przycina.
+    """
+    __tablename__ = "sync_changes"
+
+    # INTEGER PRIMARY KEY na SQLite = rowid, rośnie w kolejności zapisów
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    entity = Column(String(30), nullable=False)  # nazwa tabeli
+    row_id = Column(Integer, nullable=False)
+    txid = Column(BigInteger, nullable=True, index=True)  # PostgreSQL: pg_current_xact_id(); SQLite: NULL
+    changed_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
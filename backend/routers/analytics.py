@@ -2,10 +2,10 @@ from datetime import date, datetime, timedelta
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func as sa_func
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func as sa_func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.database import db_dependency
+from db.database import async_db_dependency, async_read_db_dependency
 from models.analytics import AnalyticaMachines, AnalyticaWorkers
 from models.production import MachineStatus, Operation, OperationLog, ProductionOrder, ProductionTask, Workstation
 from models.user import Users
@@ -21,13 +21,13 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 WORK_STATUS_NOS = {1, 2, 3}  # Praca z operatorem, Praca bez operatora, Ustawianie
 
 
-def _get_work_status_ids(db: Session) -> set:
+async def _get_work_status_ids(db: AsyncSession) -> set:
     """Get status IDs that represent active work (praca z operatorem, bez operatora, ustawianie)."""
-    rows = db.query(MachineStatus.id).filter(MachineStatus.status_no.in_(WORK_STATUS_NOS)).all()
-    return {r.id for r in rows}
+    rows = await db.scalars(select(MachineStatus.id).where(MachineStatus.status_no.in_(WORK_STATUS_NOS)))
+    return set(rows)
 
 
-def _compute_from_logs(db: Session, target_date: date) -> dict:
+async def _compute_from_logs(db: AsyncSession, target_date: date) -> dict:
     """
     Compute worker time per workstation from operation_logs for a given date.
     Sequential processing: only count time when current status is a work status
@@ -36,16 +36,17 @@ def _compute_from_logs(db: Session, target_date: date) -> dict:
     """
     day_start = datetime.combine(target_date, datetime.min.time())
     day_end = day_start + timedelta(days=1)
-    work_ids = _get_work_status_ids(db)
+    work_ids = await _get_work_status_ids(db)
 
     logs = (
-        db.query(OperationLog)
-        .filter(OperationLog.created_at >= day_start, OperationLog.created_at < day_end)
-        .filter(OperationLog.user_id.isnot(None))
-        .filter(OperationLog.workstation_id.isnot(None))
-        .order_by(OperationLog.user_id, OperationLog.created_at)
-        .all()
-    )
+        await db.scalars(
+            select(OperationLog)
+            .where(OperationLog.created_at >= day_start, OperationLog.created_at < day_end)
+            .where(OperationLog.user_id.isnot(None))
+            .where(OperationLog.workstation_id.isnot(None))
+            .order_by(OperationLog.user_id, OperationLog.created_at)
+        )
+    ).all()
 
     result = {}
     user_logs = {}
@@ -74,23 +75,23 @@ def _compute_from_logs(db: Session, target_date: date) -> dict:
 
 
 @router.get("/worker-cards", response_model=WorkerCardResponse, dependencies=[Depends(admin_required)])
-async def get_worker_cards(target_date: date = Query(..., alias="date"), db: db_dependency = None):
+async def get_worker_cards(target_date: date = Query(..., alias="date"), db: async_read_db_dependency = None):
     # Get all users
-    users = db.query(Users.id, Users.username).all()
+    users = (await db.execute(select(Users.id, Users.username))).all()
     user_map = {u.id: u.username for u in users}
 
     # Get workstation names
-    workstations = db.query(Workstation.id, Workstation.name).all()
+    workstations = (await db.execute(select(Workstation.id, Workstation.name))).all()
     ws_map = {ws.id: ws.name for ws in workstations}
 
     # Get saved analytics data for this date
-    saved = db.query(AnalyticaWorkers).filter(AnalyticaWorkers.date == target_date).all()
+    saved = (await db.scalars(select(AnalyticaWorkers).where(AnalyticaWorkers.date == target_date))).all()
     saved_by_user = {}
     for row in saved:
         saved_by_user.setdefault(row.user_id, []).append(row)
 
     # Compute from logs for users without saved data
-    log_data = _compute_from_logs(db, target_date)
+    log_data = await _compute_from_logs(db, target_date)
 
     workers = []
     # Collect all user_ids that have either saved data or log data
@@ -136,12 +137,12 @@ async def get_worker_cards(target_date: date = Query(..., alias="date"), db: db_
 
 
 @router.post("/worker-cards", dependencies=[Depends(admin_required)])
-async def save_worker_card(payload: WorkerCardSave, db: db_dependency = None):
+async def save_worker_card(payload: WorkerCardSave, db: async_db_dependency = None):
     # Delete existing entries for this user+date
-    db.query(AnalyticaWorkers).filter(
+    await db.execute(delete(AnalyticaWorkers).where(
         AnalyticaWorkers.user_id == payload.user_id,
         AnalyticaWorkers.date == payload.date,
-    ).delete()
+    ))
 
     # Insert new entries
     for entry in payload.entries:
@@ -155,9 +156,9 @@ async def save_worker_card(payload: WorkerCardSave, db: db_dependency = None):
             db.add(obj)
 
     try:
-        db.commit()
+        await db.commit()
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=409, detail="Could not save worker card")
 
     return {"message": "Worker card saved", "user_id": payload.user_id, "date": str(payload.date)}
@@ -167,20 +168,20 @@ async def save_worker_card(payload: WorkerCardSave, db: db_dependency = None):
 async def reset_worker_card(
     user_id: int = Query(...),
     target_date: date = Query(..., alias="date"),
-    db: db_dependency = None,
+    db: async_db_dependency = None,
 ):
-    deleted = db.query(AnalyticaWorkers).filter(
+    deleted = (await db.execute(delete(AnalyticaWorkers).where(
         AnalyticaWorkers.user_id == user_id,
         AnalyticaWorkers.date == target_date,
-    ).delete()
+    ))).rowcount
 
-    db.commit()
+    await db.commit()
     return {"message": f"Deleted {deleted} entries", "user_id": user_id, "date": str(target_date)}
 
 
 # ==================== Machine cards ====================
 
-def _compute_machine_from_logs(db: Session, target_date: date) -> dict:
+async def _compute_machine_from_logs(db: AsyncSession, target_date: date) -> dict:
     """
     Compute machine time per operation from operation_logs for a given date.
     Process logs PER MACHINE (workstation) — each machine is evaluated independently.
@@ -190,16 +191,17 @@ def _compute_machine_from_logs(db: Session, target_date: date) -> dict:
     """
     day_start = datetime.combine(target_date, datetime.min.time())
     day_end = day_start + timedelta(days=1)
-    work_ids = _get_work_status_ids(db)
+    work_ids = await _get_work_status_ids(db)
 
     logs = (
-        db.query(OperationLog)
-        .filter(OperationLog.created_at >= day_start, OperationLog.created_at < day_end)
-        .filter(OperationLog.workstation_id.isnot(None))
-        .filter(OperationLog.operation_id.isnot(None))
-        .order_by(OperationLog.workstation_id, OperationLog.created_at)
-        .all()
-    )
+        await db.scalars(
+            select(OperationLog)
+            .where(OperationLog.created_at >= day_start, OperationLog.created_at < day_end)
+            .where(OperationLog.workstation_id.isnot(None))
+            .where(OperationLog.operation_id.isnot(None))
+            .order_by(OperationLog.workstation_id, OperationLog.created_at)
+        )
+    ).all()
 
     result = {}
     # Group by workstation — machine-centric view
@@ -241,25 +243,25 @@ def _build_operation_label(op, task_map, order_map):
 
 
 @router.get("/machine-cards", response_model=MachineCardResponse, dependencies=[Depends(admin_required)])
-async def get_machine_cards(target_date: date = Query(..., alias="date"), db: db_dependency = None):
-    workstations = db.query(Workstation).all()
+async def get_machine_cards(target_date: date = Query(..., alias="date"), db: async_read_db_dependency = None):
+    workstations = (await db.scalars(select(Workstation))).all()
     ws_map = {ws.id: ws.name for ws in workstations}
 
-    operations = db.query(Operation).all()
+    operations = (await db.scalars(select(Operation))).all()
     op_map = {op.id: op for op in operations}
 
-    tasks = db.query(ProductionTask).all()
+    tasks = (await db.scalars(select(ProductionTask))).all()
     task_map = {t.id: t for t in tasks}
 
-    orders = db.query(ProductionOrder).all()
+    orders = (await db.scalars(select(ProductionOrder))).all()
     order_map = {o.id: o for o in orders}
 
-    saved = db.query(AnalyticaMachines).filter(AnalyticaMachines.date == target_date).all()
+    saved = (await db.scalars(select(AnalyticaMachines).where(AnalyticaMachines.date == target_date))).all()
     saved_by_ws = {}
     for row in saved:
         saved_by_ws.setdefault(row.workstation_id, []).append(row)
 
-    log_data = _compute_machine_from_logs(db, target_date)
+    log_data = await _compute_machine_from_logs(db, target_date)
 
     machines = []
     all_ws_ids = set(saved_by_ws.keys()) | set(log_data.keys())
@@ -316,11 +318,11 @@ async def get_machine_cards(target_date: date = Query(..., alias="date"), db: db
 
 
 @router.post("/machine-cards", dependencies=[Depends(admin_required)])
-async def save_machine_card(payload: MachineCardSave, db: db_dependency = None):
-    db.query(AnalyticaMachines).filter(
+async def save_machine_card(payload: MachineCardSave, db: async_db_dependency = None):
+    await db.execute(delete(AnalyticaMachines).where(
         AnalyticaMachines.workstation_id == payload.workstation_id,
         AnalyticaMachines.date == payload.date,
-    ).delete()
+    ))
 
     for entry in payload.entries:
         if entry.minutes > 0:
@@ -333,9 +335,9 @@ async def save_machine_card(payload: MachineCardSave, db: db_dependency = None):
             db.add(obj)
 
     try:
-        db.commit()
+        await db.commit()
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=409, detail="Could not save machine card")
 
     return {"message": "Machine card saved", "workstation_id": payload.workstation_id, "date": str(payload.date)}
@@ -345,12 +347,12 @@ async def save_machine_card(payload: MachineCardSave, db: db_dependency = None):
 async def reset_machine_card(
     workstation_id: int = Query(...),
     target_date: date = Query(..., alias="date"),
-    db: db_dependency = None,
+    db: async_db_dependency = None,
 ):
-    deleted = db.query(AnalyticaMachines).filter(
+    deleted = (await db.execute(delete(AnalyticaMachines).where(
         AnalyticaMachines.workstation_id == workstation_id,
         AnalyticaMachines.date == target_date,
-    ).delete()
+    ))).rowcount
 
-    db.commit()
+    await db.commit()
     return {"message": f"Deleted {deleted} entries", "workstation_id": workstation_id, "date": str(target_date)}
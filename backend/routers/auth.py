@@ -1,18 +1,21 @@
 # routers/auth.py
 from datetime import timedelta
+from functools import lru_cache
 from typing import Annotated, List
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, SecretStr
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 from starlette import status
 from sqlalchemy.exc import IntegrityError
 
-from db.database import SessionLocal
+from app import response_cache
+from db.database import async_db_dependency
 from models.user import Users
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import jwt, JWTError
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -20,7 +23,14 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 SECRET_KEY = "secret"
 ALGORITHM = "HS256"
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=1)
+def get_bcrypt_context():
+    # passlib/jose ładowane przy pierwszym logowaniu, nie przy starcie workera
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 oauth2bearer = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 
@@ -38,32 +48,30 @@ class UserOut(CreateUserRequest):
     password: SecretStr = Field(hidden=True)
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-db_dependency = Annotated[Session, Depends(get_db)]
-
-
 def create_access_token(username: str, user_id: int, role: str, expires_delta: timedelta):
+    from jose import jwt
+
     encode = {"sub": username, "id": user_id, "role": role}
     return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def authenticate_user(username: str, password: str, db: Session):
-    user = db.query(Users).filter(Users.username == username).first()
+async def authenticate_user(username: str, password: str, db: AsyncSession):
+    user = (
+        await db.execute(
+            select(Users).options(undefer(Users.hashed_password)).where(Users.username == username)
+        )
+    ).scalars().first()
     if not user:
         return False
-    if not bcrypt_context.verify(password, user.hashed_password):
+    # bcrypt celowo jest wolny (~100-300 ms) – nie na pętli zdarzeń
+    if not await run_in_threadpool(get_bcrypt_context().verify, password, user.hashed_password):
         return False
     return user
 
 
 async def get_current_user(token: Annotated[str, Depends(oauth2bearer)]):
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -100,8 +108,10 @@ superadmin_required = RoleChecker(["superadmin"])
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_user(db: db_dependency, create_user_request: CreateUserRequest):
-    existing_user = db.query(Users).filter(Users.username == create_user_request.username).first()
+async def create_user(db: async_db_dependency, create_user_request: CreateUserRequest):
+    existing_user = (
+        await db.execute(select(Users.id).where(Users.username == create_user_request.username))
+    ).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -110,18 +120,19 @@ async def create_user(db: db_dependency, create_user_request: CreateUserRequest)
 
     create_user_model = Users(
         username=create_user_request.username,
-        hashed_password=bcrypt_context.hash(create_user_request.password),
+        hashed_password=await run_in_threadpool(get_bcrypt_context().hash, create_user_request.password),
     )
 
     db.add(create_user_model)
     try:
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Użytkownik o takiej nazwie już istnieje.",
         )
+    response_cache.invalidate("users")  # GET /production/users
 
     return {"message": f"User {create_user_request.username} added"}
 
@@ -129,9 +140,9 @@ async def create_user(db: db_dependency, create_user_request: CreateUserRequest)
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: db_dependency,
+    db: async_db_dependency,
 ):
-    user = authenticate_user(form_data.username, form_data.password, db)
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user")
 
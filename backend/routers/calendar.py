@@ -7,7 +7,7 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, Form, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from db.database import SessionLocal, db_dependency
+from db.database import db_dependency, read_db_dependency
 from models.calendar import CalendarEntry
 from models.calendar_log import CalendarLog
 from models.mould import Mould
@@ -19,14 +19,6 @@ from routers.auth import user_dependency, editor_required
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 def parse_dt_or_none(val: Optional[str], field_name: str) -> Optional[datetime]:
     """
     Obsluga datetime-local z React: 'YYYY-MM-DDTHH:MM'
@@ -101,13 +93,13 @@ def add_log(
 
 
 @router.post("/", response_model=CalendarRead, dependencies=[Depends(editor_required)])
-async def create_calendar_entry(
+def create_calendar_entry(
     mould_id: int = Form(...),
     start_date: Optional[str] = Form(None),
     end_date: Optional[str] = Form(None),
     comment: Optional[str] = Form(None),
     is_active: bool = Form(True),
-    db: Session = Depends(get_db),
+    db: db_dependency = None,
     user: user_dependency = None,
 ):
     require_mould(db, mould_id)
@@ -140,8 +132,8 @@ async def create_calendar_entry(
 
 
 @router.get("/", response_model=List[CalendarRead])
-async def list_calendar_entries(
-    db: db_dependency,
+def list_calendar_entries(
+    db: read_db_dependency,
     search: str | None = Query(None, description="Szukana forma (mould_number)"),
     skip: int = 0,
     limit: int = 1000,
@@ -162,7 +154,7 @@ async def list_calendar_entries(
 
 
 @router.get("/{entry_id}", response_model=CalendarRead)
-async def get_calendar_entry(
+def get_calendar_entry(
     entry_id: int,
     db: db_dependency,
 ):
@@ -173,14 +165,14 @@ async def get_calendar_entry(
 
 
 @router.put("/{entry_id}", response_model=CalendarRead, dependencies=[Depends(editor_required)])
-async def update_calendar_entry(
+def update_calendar_entry(
     entry_id: int,
     mould_id: Optional[int] = Form(None),
     start_date: Optional[str] = Form(None),
     end_date: Optional[str] = Form(None),
     comment: Optional[str] = Form(None),
     is_active: Optional[bool] = Form(None),
-    db: Session = Depends(get_db),
+    db: db_dependency = None,
     user: user_dependency = None,
 ):
     entry = db.query(CalendarEntry).filter(CalendarEntry.id == entry_id).first()
@@ -228,9 +220,9 @@ async def update_calendar_entry(
 
 
 @router.delete("/{entry_id}", status_code=204, dependencies=[Depends(editor_required)])
-async def delete_calendar_entry(
+def delete_calendar_entry(
     entry_id: int,
-    db: Session = Depends(get_db),
+    db: db_dependency = None,
     user: user_dependency = None,
 ):
     entry = db.query(CalendarEntry).filter(CalendarEntry.id == entry_id).first()
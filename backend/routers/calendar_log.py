@@ -2,9 +2,8 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
 
-from db.database import SessionLocal
+from db.database import db_dependency
 from models.calendar import CalendarEntry
 from models.calendar_log import CalendarLog
 from schemas.calendar_log import CalendarLogRead
@@ -13,23 +12,15 @@ from routers.auth import user_dependency, admin_required
 router = APIRouter(prefix="/calendar", tags=["calendar-log"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get(
     "/{entry_id}/log",
     response_model=List[CalendarLogRead],
     dependencies=[Depends(admin_required)],
 )
-async def get_calendar_log(
+def get_calendar_log(
     entry_id: int,
     limit: int = Query(200, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: db_dependency = None,
     user: user_dependency = None,
 ):
     if not user or user.get("role") != "superadmin":
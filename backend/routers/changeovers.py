@@ -7,7 +7,8 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, Form, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from db.database import SessionLocal, db_dependency
+from app.responses import LIST_FORMAT_RESPONSES, ListAdapter, columns, list_format_dependency
+from db.database import db_dependency, read_db_dependency
 from models.changeovers import Changeover
 from models.changeovers_log import ChangeoverLog
 from models.mould import Mould
@@ -18,13 +19,7 @@ from routers.auth import user_dependency, admin_required
 
 router = APIRouter(prefix="/changeovers", tags=["changeovers"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+CHANGEOVER_LIST = ListAdapter(ChangeoverRead)
 
 
 # ---------- helpers ----------
@@ -114,14 +109,14 @@ def get_username_from_user(user: Optional[dict]) -> Optional[str]:
 # ---------- routes ----------
 
 @router.post("/", response_model=ChangeoverRead, dependencies=[Depends(admin_required)])
-async def create_changeover(
+def create_changeover(
     from_mould_id: int = Form(...),
     to_mould_id: int = Form(...),
     available_date: Optional[str] = Form(None),
     needed_date: Optional[str] = Form(None),
     czy_wykonano: bool = Form(False),
 
-    db: Session = Depends(get_db),
+    db: db_dependency = None,
     user: user_dependency = None,  # NIE dawaj Depends() – user_dependency już ma Depends w Annotated
 ):
     require_mould(db, from_mould_id, "from_mould")
@@ -160,9 +155,10 @@ async def create_changeover(
     return co
 
 
-@router.get("/", response_model=List[ChangeoverRead])
-async def list_changeovers(
-    db: db_dependency,
+@router.get("/", response_model=List[ChangeoverRead], responses=LIST_FORMAT_RESPONSES)
+def list_changeovers(
+    db: read_db_dependency,
+    fmt: list_format_dependency,
     # kompatybilność
     skip: int = 0,
     limit: int = 5000,
@@ -178,28 +174,29 @@ async def list_changeovers(
     - najpierw WSZYSTKIE niewykonane (czy_wykonano = false)
     - potem zrealizowane (czy_wykonano = true) stronicowane po 10 (done_page_size)
     """
-    q_open = db.query(Changeover).filter(Changeover.czy_wykonano == False)  # noqa: E712
+    # wiersze kolumn zamiast encji; walidacja i JSON jeszcze w wątku handlera (app/responses.py)
+    q_open = db.query(*columns(Changeover)).filter(Changeover.czy_wykonano == False)  # noqa: E712
     open_rows = q_open.order_by(Changeover.id.desc()).all()
 
     if only_open:
         # opcjonalnie zostawiamy skip/limit dla kompatybilności
         if skip or limit:
-            return open_rows[skip: skip + limit]
-        return open_rows
+            return CHANGEOVER_LIST.response(open_rows[skip: skip + limit], fmt)
+        return CHANGEOVER_LIST.response(open_rows, fmt)
 
-    q_done = db.query(Changeover).filter(Changeover.czy_wykonano == True)  # noqa: E712
+    q_done = db.query(*columns(Changeover)).filter(Changeover.czy_wykonano == True)  # noqa: E712
     done_skip = (done_page - 1) * done_page_size
     done_rows = q_done.order_by(Changeover.id.desc()).offset(done_skip).limit(done_page_size).all()
 
     # kompatybilność: jeśli ktoś nadal używa skip/limit na całości
     rows = open_rows + done_rows
     if skip or limit:
-        return rows[skip: skip + limit]
-    return rows
+        return CHANGEOVER_LIST.response(rows[skip: skip + limit], fmt)
+    return CHANGEOVER_LIST.response(rows, fmt)
 
 
 @router.get("/{changeover_id}", response_model=ChangeoverRead)
-async def get_changeover(changeover_id: int, db: db_dependency):
+def get_changeover(changeover_id: int, db: db_dependency):
     co = db.query(Changeover).filter(Changeover.id == changeover_id).first()
     if not co:
         raise HTTPException(status_code=404, detail="Changeover not found")
@@ -207,7 +204,7 @@ async def get_changeover(changeover_id: int, db: db_dependency):
 
 
 @router.put("/{changeover_id}", response_model=ChangeoverRead, dependencies=[Depends(admin_required)])
-async def update_changeover(
+def update_changeover(
     changeover_id: int,
 
     from_mould_id: Optional[int] = Form(None),
@@ -216,7 +213,7 @@ async def update_changeover(
     needed_date: Optional[str] = Form(None),     # "" -> None
     czy_wykonano: Optional[bool] = Form(None),
 
-    db: Session = Depends(get_db),
+    db: db_dependency = None,
     user: user_dependency = None,
 ):
     co = db.query(Changeover).filter(Changeover.id == changeover_id).first()
@@ -268,9 +265,9 @@ async def update_changeover(
 
 
 @router.delete("/{changeover_id}", status_code=204, dependencies=[Depends(admin_required)])
-async def delete_changeover(
+def delete_changeover(
     changeover_id: int,
-    db: Session = Depends(get_db),
+    db: db_dependency = None,
     user: user_dependency = None,
 ):
     """
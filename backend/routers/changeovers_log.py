@@ -2,9 +2,8 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
 
-from db.database import SessionLocal
+from db.database import db_dependency
 from models.changeovers import Changeover
 from models.changeovers_log import ChangeoverLog
 from schemas.changeovers_log import ChangeoverLogRead
@@ -14,23 +13,15 @@ from routers.auth import user_dependency, admin_required
 router = APIRouter(prefix="/changeovers", tags=["changeovers-log"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get(
     "/{changeover_id}/log",
     response_model=List[ChangeoverLogRead],
     dependencies=[Depends(admin_required)],  # min. admin -> potem dopinamy superadmin check
 )
-async def get_changeover_log(
+def get_changeover_log(
     changeover_id: int,
     limit: int = Query(200, ge=1, le=1000),
-    db: Session = Depends(get_db),
+    db: db_dependency = None,
     user: user_dependency = None,
 ):
     # tylko superadmin
@@ -3,20 +3,21 @@ from typing import Any, Dict, List
 from fastapi import APIRouter
 from sqlalchemy import text
 
-from db.database import db_dependency
+from db.database import read_db_dependency
 
 router = APIRouter(prefix="/current_sv", tags=["current_sv"])
 
 
 @router.get("/", response_model=List[Dict[str, Any]])
-async def list_current_sv(
-    db: db_dependency,
+def list_current_sv(
+    db: read_db_dependency,
     skip: int = 0,
     limit: int = 1000,
 ):
     rows = (
         db.execute(
-            text("SELECT * FROM current_sv OFFSET :skip LIMIT :limit"),
+            # LIMIT przed OFFSET – ta kolejność działa też na SQLite
+            text("SELECT * FROM current_sv LIMIT :limit OFFSET :skip"),
             {"skip": skip, "limit": limit},
         )
         .mappings()
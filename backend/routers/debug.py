@@ -0,0 +1,43 @@
+# routers/debug.py
+import json
+import re
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+
+from app import profiling
+from routers.auth import superadmin_required
+
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(superadmin_required)])
+
+# id z ProfilingMiddleware – sprawdzany, zanim trafi do ścieżki pliku
+PROFILE_ID = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{8}$")
+
+
+def _profile_file(profile_id: str, kind: str):
+    path = profiling.profile_path(profile_id, kind) if PROFILE_ID.match(profile_id) else None
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return path
+
+
+@router.get("/profiles")
+def list_profiles():
+    # bez listy SQL – ta jest w szczegółach profilu
+    return [{k: v for k, v in meta.items() if k != "sql"} for meta in profiling.list_profiles()]
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    return json.loads(_profile_file(profile_id, "meta").read_text(encoding="utf-8"))
+
+
+@router.get("/profiles/{profile_id}/speedscope")
+def get_profile_speedscope(profile_id: str):
+    return FileResponse(_profile_file(profile_id, "speedscope"), media_type="application/json",
+                        filename=f"{profile_id}.speedscope.json")
+
+
+@router.get("/profiles/{profile_id}/html")
+def get_profile_html(profile_id: str):
+    return FileResponse(_profile_file(profile_id, "html"), media_type="text/html")
@@ -2,7 +2,7 @@ from typing import List
 
 from fastapi import APIRouter
 
-from db.database import db_dependency
+from db.database import db_dependency, read_db_dependency
 from models.mes_session import MesSessionLog
 from schemas.mes_session import MesSessionLogCreate, MesSessionLogRead
 
@@ -19,5 +19,5 @@ def create_session_log(payload: MesSessionLogCreate, db: db_dependency):
 
 
 @router.get("/logs", response_model=List[MesSessionLogRead])
-def list_session_logs(db: db_dependency):
+def list_session_logs(db: read_db_dependency):
     return db.query(MesSessionLog).order_by(MesSessionLog.id.desc()).all()
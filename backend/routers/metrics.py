@@ -0,0 +1,13 @@
+# routers/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    # scrapowane przez Prometheus – liczniki tego workera
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,30 +1,53 @@
 # routers/mould.py
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, Path, Response
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from typing import Optional, Dict, List
 
-from db.database import SessionLocal, db_dependency
-from models.mould import Mould
-from schemas.mould import MouldReadWithTpm
-from app.images import save_upload_file
-from sqlalchemy import or_, and_, exists
+from db.database import async_db_dependency, async_read_db_dependency
+from models.mould import Mould, maint_pct_expr
+from schemas.mould import MOULD_PHOTO_FIELDS, MouldRead, MouldReadWithTpm, MouldMaintenanceDue, MouldCyclesIngest, MouldCyclesResult, MouldMaintAlert
+from app.images import save_upload_files
+from app.media_refs import sync_media_refs, drop_media_refs
+from app.responses import LIST_FORMAT_RESPONSES, ListAdapter, columns, list_format_dependency
+from sqlalchemy import or_, and_, exists, select, update
 
-from routers.auth import admin_required, user_dependency 
+from routers.auth import admin_required, user_required, user_dependency 
 
 # ✅ TPM
 from models.moulds_tpm import MouldsTpm, Statusy
+from models.moulds_book import MouldsBook
 
 router = APIRouter(prefix="/moulds", tags=["moulds"])
 
+OPEN_TPM_STATUSES = [Statusy.OTWARTY.value, Statusy.W_TRAKCIE_REALIZACJI.value]
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+MOULD_LIST = ListAdapter(MouldReadWithTpm)
+
+# has_open_tpm jako kolumna wiersza listy (też GET /sync)
+HAS_OPEN_TPM = exists().where(
+    and_(
+        MouldsTpm.mould_id == Mould.id,
+        MouldsTpm.status.in_(OPEN_TPM_STATUSES),
+    )
+).label("has_open_tpm")
+
+
+async def has_open_tpm(db: AsyncSession, mould_id: int) -> bool:
+    row = await db.execute(
+        select(MouldsTpm.id)
+        .where(and_(MouldsTpm.mould_id == mould_id, MouldsTpm.status.in_(OPEN_TPM_STATUSES)))
+        .limit(1)
+    )
+    return row.first() is not None
+
+
+def _drop_mould_media_refs(db, m: Mould) -> None:
+    # sync (przez AsyncSession.run_sync) – powiązania formy i jej TPM / wpisów książki
+    drop_media_refs(db, "mould", [m.id])
+    drop_media_refs(db, "tpm", db.scalars(select(MouldsTpm.id).where(MouldsTpm.mould_id == m.id)).all())
+    drop_media_refs(db, "book", db.scalars(select(MouldsBook.id).where(MouldsBook.mould_id == m.id)).all())
 
 
 # =========================
@@ -70,7 +93,7 @@ async def create_mould(
     extra_photo_5: Optional[UploadFile] = File(None),
     extra_photo_5_path: Optional[str] = Form(None),
 
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
     mould_number_up = mould_number.strip().upper()
 
@@ -78,7 +101,7 @@ async def create_mould(
     if released and released.strip():
         released_date = datetime.strptime(released, "%Y-%m-%d").date()
 
-    existing = db.query(Mould).filter(Mould.mould_number == mould_number_up).first()
+    existing = await db.scalar(select(Mould.id).where(Mould.mould_number == mould_number_up))
     if existing:
         raise HTTPException(status_code=400, detail="Mould with this number already exists")
 
@@ -93,11 +116,14 @@ async def create_mould(
         "extra_photo_5": (extra_photo_5, extra_photo_5_path),
     }
 
+    uploaded = await save_upload_files(
+        {field_name: upload_obj for field_name, (upload_obj, _) in file_map.items() if upload_obj is not None}
+    )
+
     saved_urls: Dict[str, Optional[str]] = {}
     for field_name, (upload_obj, path_value) in file_map.items():
         if upload_obj is not None:
-            _, public_url = await save_upload_file(upload_obj)
-            saved_urls[field_name] = public_url
+            saved_urls[field_name] = uploaded[field_name]
         elif path_value:
             saved_urls[field_name] = path_value
         else:
@@ -128,8 +154,11 @@ async def create_mould(
     )
 
     db.add(m)
-    db.commit()
-    db.refresh(m)
+    await db.flush()
+    urls = {f: getattr(m, f) for f in MOULD_PHOTO_FIELDS}
+    await db.run_sync(sync_media_refs, "mould", m.id, urls)
+    await db.commit()
+    await db.refresh(m)
 
     out = MouldReadWithTpm.model_validate(m).model_dump()
     out["has_open_tpm"] = False
@@ -139,60 +168,126 @@ async def create_mould(
 # =========================
 # LIST
 # =========================
-@router.get("/", response_model=List[MouldReadWithTpm])
+@router.get("/", response_model=List[MouldReadWithTpm], responses=LIST_FORMAT_RESPONSES)
 async def read_molds(
-    db: db_dependency,
+    db: async_read_db_dependency,
+    fmt: list_format_dependency,
     search: str | None = Query(None, description="Szukane słowo w mould_number lub product"),
     skip: int = 0,
     limit: int = 1000,
 ):
-    open_statuses = [Statusy.OTWARTY.value, Statusy.W_TRAKCIE_REALIZACJI.value]
-
-    has_open_tpm_expr = exists().where(
-        and_(
-            MouldsTpm.mould_id == Mould.id,
-            MouldsTpm.status.in_(open_statuses),
-        )
-    ).label("has_open_tpm")
-
-    query = db.query(Mould, has_open_tpm_expr)
+    # wiersze zamiast encji – lista do 1000 form, has_open_tpm jako zwykła kolumna wiersza
+    query = select(*columns(Mould), HAS_OPEN_TPM)
 
     if search:
         like = f"%{search}%"
-        query = query.filter(or_(Mould.mould_number.ilike(like), Mould.product.ilike(like)))
+        query = query.where(or_(Mould.mould_number.ilike(like), Mould.product.ilike(like)))
+
+    rows = (await db.execute(query.offset(skip).limit(limit))).all()
+    return MOULD_LIST.response(rows, fmt)
+
+
+# =========================
+# MAINTENANCE DUE  ✅ GET /moulds/maintenance-due
+# =========================
+@router.get("/maintenance-due", response_model=List[MouldMaintenanceDue])
+async def read_maintenance_due(
+    db: async_read_db_dependency,
+    place: Optional[int] = Query(None, description="PobytFormy"),
+    status: Optional[int] = Query(None, description="StanFormy"),
+    limit: int = Query(20, ge=1, le=500),
+):
+    """
+    Ranking form najbliżej przeglądu – procent liczony w bazie
+    (ix_moulds_maint_pct), bez ładowania całej tabeli.
+    """
+    pct = maint_pct_expr.label("to_maint")
+    query = select(Mould, pct).where(maint_pct_expr.isnot(None))
+
+    if place is not None:
+        query = query.where(Mould.place == place)
+    if status is not None:
+        query = query.where(Mould.status == status)
 
-    rows = query.offset(skip).limit(limit).all()
+    rows = (await db.execute(query.order_by(maint_pct_expr.desc().nulls_last(), Mould.id.asc()).limit(limit))).all()
 
     result = []
-    for mould, has_open_tpm in rows:
-        data = MouldReadWithTpm.model_validate(mould).model_dump()
-        data["has_open_tpm"] = bool(has_open_tpm)
+    for mould, to_maint in rows:
+        # MouldRead, nie MouldMaintenanceDue – from_attributes wziąłby metodę Mould.to_maint
+        data = MouldRead.model_validate(mould).model_dump()
+        data["to_maint"] = int(to_maint)
         result.append(data)
 
     return result
 
 
+# =========================
+# CYCLES  ✅ POST /moulds/cycles
+# =========================
+@router.post("/cycles", response_model=MouldCyclesResult, dependencies=[Depends(user_required)])
+async def ingest_cycles(payload: MouldCyclesIngest, db: async_db_dependency):
+    """
+    Przyrosty cykli z maszyn / kolektora, wiele form w jednym żądaniu.
+    Każda forma to jedno atomowe UPDATE ... SET total_cycles = total_cycles + :n
+    (bez read-modify-write). Zwraca formy, których to_maint przekroczył próg.
+    """
+    increments: Dict[str, int] = {}
+    for item in payload.items:
+        increments[item.mould_number] = increments.get(item.mould_number, 0) + item.cycles
+
+    updated = 0
+    not_found: List[str] = []
+    crossed: List[MouldMaintAlert] = []
+
+    # stała kolejność blokad wierszy -> równoległe kolektory nie zrobią deadlocka
+    for mould_number, n in sorted(increments.items()):
+        row = (await db.execute(
+            update(Mould)
+            .where(Mould.mould_number == mould_number)
+            .values(
+                total_cycles=Mould.total_cycles + n,
+                from_maint_cycles=Mould.from_maint_cycles + n,
+            )
+            .returning(Mould.id, Mould.mould_number, Mould.from_maint_cycles, Mould.to_maint_cycles)
+            .execution_options(synchronize_session=False)
+        )).first()
+
+        if row is None:
+            not_found.append(mould_number)
+            continue
+        updated += 1
+
+        # ten sam wzór co Mould.to_maint(), liczony przed i po przyroście
+        if row.to_maint_cycles > 0:
+            pct_before = (row.from_maint_cycles - n) * 100 // row.to_maint_cycles
+            pct_after = row.from_maint_cycles * 100 // row.to_maint_cycles
+            if pct_before < payload.threshold <= pct_after:
+                crossed.append(MouldMaintAlert(
+                    id=row.id,
+                    mould_number=row.mould_number,
+                    from_maint_cycles=row.from_maint_cycles,
+                    to_maint_cycles=row.to_maint_cycles,
+                    to_maint=pct_after,
+                ))
+
+    await db.commit()
+
+    return MouldCyclesResult(updated=updated, not_found=not_found, crossed=crossed)
+
+
 # =========================
 # GET ONE
 # =========================
 @router.get("/{mould_number}", response_model=MouldReadWithTpm)
-async def get_mould(mould_number: str, db: db_dependency):
+async def get_mould(mould_number: str, db: async_db_dependency):
     mould_number_up = mould_number.strip().upper()
 
-    m = db.query(Mould).filter(Mould.mould_number == mould_number_up).first()
+    m = await db.scalar(select(Mould).where(Mould.mould_number == mould_number_up))
     if not m:
         raise HTTPException(status_code=404, detail="Mould not found")
 
-    open_statuses = [Statusy.OTWARTY.value, Statusy.W_TRAKCIE_REALIZACJI.value]
-    has_open = (
-        db.query(MouldsTpm.id)
-        .filter(and_(MouldsTpm.mould_id == m.id, MouldsTpm.status.in_(open_statuses)))
-        .first()
-        is not None
-    )
-
     out = MouldReadWithTpm.model_validate(m).model_dump()
-    out["has_open_tpm"] = bool(has_open)
+    out["has_open_tpm"] = await has_open_tpm(db, m.id)
     return out
 
 
@@ -241,18 +336,18 @@ async def update_mould(
     extra_photo_5: Optional[UploadFile] = File(None),
     extra_photo_5_path: Optional[str] = Form(None),
 
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
     mould_number_up = mould_number.strip().upper()
 
-    m: Mould | None = db.query(Mould).filter(Mould.mould_number == mould_number_up).first()
+    m: Mould | None = await db.scalar(select(Mould).where(Mould.mould_number == mould_number_up))
     if not m:
         raise HTTPException(status_code=404, detail="Mould not found")
 
     if new_mould_number is not None:
         new_up = new_mould_number.strip().upper()
         if new_up != mould_number_up:
-            exists_m = db.query(Mould).filter(Mould.mould_number == new_up).first()
+            exists_m = await db.scalar(select(Mould.id).where(Mould.mould_number == new_up))
             if exists_m:
                 raise HTTPException(status_code=400, detail="Mould with this number already exists")
             m.mould_number = new_up
@@ -300,26 +395,23 @@ async def update_mould(
         "extra_photo_5": (extra_photo_5, extra_photo_5_path),
     }
 
+    uploaded = await save_upload_files(
+        {field_name: upload_obj for field_name, (upload_obj, _) in file_map.items() if upload_obj is not None}
+    )
+
     for field_name, (upload_obj, path_value) in file_map.items():
         if upload_obj is not None:
-            _, public_url = await save_upload_file(upload_obj)
-            setattr(m, field_name, public_url)
+            setattr(m, field_name, uploaded[field_name])
         elif path_value is not None:
             setattr(m, field_name, path_value if path_value.strip() != "" else None)
 
-    db.commit()
-    db.refresh(m)
-
-    open_statuses = [Statusy.OTWARTY.value, Statusy.W_TRAKCIE_REALIZACJI.value]
-    has_open = (
-        db.query(MouldsTpm.id)
-        .filter(and_(MouldsTpm.mould_id == m.id, MouldsTpm.status.in_(open_statuses)))
-        .first()
-        is not None
-    )
+    urls = {f: getattr(m, f) for f in MOULD_PHOTO_FIELDS}
+    await db.run_sync(sync_media_refs, "mould", m.id, urls)
+    await db.commit()
+    await db.refresh(m)
 
     out = MouldReadWithTpm.model_validate(m).model_dump()
-    out["has_open_tpm"] = bool(has_open)
+    out["has_open_tpm"] = await has_open_tpm(db, m.id)
     return out
 
 @router.delete(
@@ -329,7 +421,7 @@ async def update_mould(
 )
 async def delete_mould(
     mould_number: str = Path(...),
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
     user: user_dependency = None,
 ):
     # ✅ tylko superadmin
@@ -338,15 +430,17 @@ async def delete_mould(
 
     mould_number_up = mould_number.strip().upper()
 
-    m = db.query(Mould).filter(Mould.mould_number == mould_number_up).first()
+    m = await db.scalar(select(Mould).where(Mould.mould_number == mould_number_up))
     if not m:
         raise HTTPException(status_code=404, detail="Mould not found")
 
     try:
-        db.delete(m)
-        db.commit()
+        # powiązania zdjęć formy i jej TPM / wpisów książki (kasowanych kaskadowo)
+        await db.run_sync(_drop_mould_media_refs, m)
+        await db.delete(m)
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=409,
             detail="Nie można usunąć formy (powiązane rekordy / ograniczenia FK). Usuń zależności lub dodaj cascade/ondelete.",
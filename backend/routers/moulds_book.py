@@ -1,24 +1,17 @@
 # routers/moulds_book.py
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, Path, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from typing import Optional, List
 from datetime import date, datetime
 
-from db.database import SessionLocal, db_dependency
+from db.database import async_db_dependency, async_read_db_dependency
 from models.moulds_book import MouldsBook
 from models.mould import Mould
 from schemas.moulds_book import MouldsBookRead
-from app.images import save_upload_file
+from app.images import save_upload_files
+from app.media_refs import sync_media_refs, drop_media_refs
 
 router = APIRouter(prefix="/book", tags=["moulds_book"])
-
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 
 def parse_date_or_none(value: Optional[str]) -> Optional[date]:
@@ -57,24 +50,18 @@ async def create_book_entry(
     extra_photo_1_path: Optional[str] = Form(None),
     extra_photo_2: Optional[UploadFile] = File(None),
     extra_photo_2_path: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
-    mould = db.query(Mould).filter(Mould.id == mould_id).first()
+    mould = await db.get(Mould, mould_id)
     if not mould:
         raise HTTPException(status_code=404, detail="Mould not found")
 
-    photo1_url = None
-    photo2_url = None
+    uploaded = await save_upload_files(
+        {k: v for k, v in (("extra_photo_1", extra_photo_1), ("extra_photo_2", extra_photo_2)) if v is not None},
+    )
 
-    if extra_photo_1 is not None:
-        _, photo1_url = await save_upload_file(extra_photo_1, media_dir="media/book")
-    elif extra_photo_1_path:
-        photo1_url = extra_photo_1_path
-
-    if extra_photo_2 is not None:
-        _, photo2_url = await save_upload_file(extra_photo_2, media_dir="media/book")
-    elif extra_photo_2_path:
-        photo2_url = extra_photo_2_path
+    photo1_url = uploaded.get("extra_photo_1") or extra_photo_1_path or None
+    photo2_url = uploaded.get("extra_photo_2") or extra_photo_2_path or None
 
     created_date = parse_date_or_none(created)
 
@@ -94,8 +81,10 @@ async def create_book_entry(
         book.created = created_date
 
     db.add(book)
-    db.commit()
-    db.refresh(book)
+    await db.flush()
+    await db.run_sync(sync_media_refs, "book", book.id, {"extra_photo_1": book.extra_photo_1, "extra_photo_2": book.extra_photo_2})
+    await db.commit()
+    await db.refresh(book)
     return book
 
 
@@ -104,19 +93,19 @@ async def create_book_entry(
 # -------------------------
 @router.get("/", response_model=List[MouldsBookRead])
 async def read_moulds_books(
-    db: db_dependency,
+    db: async_read_db_dependency,
     search: str | None = Query(None, description="Szukana forma (mould_number)"),
     skip: int = 0,
     limit: int = 1000,
 ):
-    query = db.query(MouldsBook)
+    query = select(MouldsBook)
 
     if search:
         like = f"%{search}%"
         # relacja: MouldsBook.mould -> Mould
-        query = query.filter(MouldsBook.mould.has(Mould.mould_number.ilike(like)))
+        query = query.where(MouldsBook.mould.has(Mould.mould_number.ilike(like)))
 
-    return query.offset(skip).limit(limit).all()
+    return (await db.scalars(query.offset(skip).limit(limit))).all()
 
 
 # -------------------------
@@ -125,9 +114,9 @@ async def read_moulds_books(
 @router.get("/{book_id}", response_model=MouldsBookRead)
 async def read_book_entry(
     book_id: int = Path(..., description="ID wpisu książki"),
-    db: db_dependency = None,
+    db: async_db_dependency = None,
 ):
-    entry = db.query(MouldsBook).filter(MouldsBook.id == book_id).first()
+    entry = await db.get(MouldsBook, book_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Book entry not found")
     return entry
@@ -155,9 +144,9 @@ async def update_book_entry(
     extra_photo_2: Optional[UploadFile] = File(None),
     extra_photo_2_path: Optional[str] = Form(None),
 
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
-    entry = db.query(MouldsBook).filter(MouldsBook.id == book_id).first()
+    entry = await db.get(MouldsBook, book_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Book entry not found")
 
@@ -182,21 +171,24 @@ async def update_book_entry(
         entry.czas_wylaczenia = czas_wylaczenia
 
     # zdjęcia: upload ma pierwszeństwo, potem path, inaczej zostaw
+    uploaded = await save_upload_files(
+        {k: v for k, v in (("extra_photo_1", extra_photo_1), ("extra_photo_2", extra_photo_2)) if v is not None},
+    )
+
     if extra_photo_1 is not None:
-        _, url = await save_upload_file(extra_photo_1, media_dir="media/book")
-        entry.extra_photo_1 = url
+        entry.extra_photo_1 = uploaded["extra_photo_1"]
     elif extra_photo_1_path is not None:
         entry.extra_photo_1 = extra_photo_1_path
 
     if extra_photo_2 is not None:
-        _, url = await save_upload_file(extra_photo_2, media_dir="media/book")
-        entry.extra_photo_2 = url
+        entry.extra_photo_2 = uploaded["extra_photo_2"]
     elif extra_photo_2_path is not None:
         entry.extra_photo_2 = extra_photo_2_path
 
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
+    await db.run_sync(sync_media_refs, "book", entry.id, {"extra_photo_1": entry.extra_photo_1, "extra_photo_2": entry.extra_photo_2})
+    await db.commit()
+    await db.refresh(entry)
     return entry
 
 # -------------------------
@@ -205,12 +197,13 @@ async def update_book_entry(
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book_entry(
     book_id: int = Path(..., description="ID wpisu książki"),
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
-    entry = db.query(MouldsBook).filter(MouldsBook.id == book_id).first()
+    entry = await db.get(MouldsBook, book_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Book entry not found")
 
-    db.delete(entry)
-    db.commit()
+    await db.run_sync(drop_media_refs, "book", [entry.id])
+    await db.delete(entry)
+    await db.commit()
     return
@@ -1,24 +1,19 @@
 # routers/moulds_tpm.py - fragment create_tpm
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
-from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional, List
-from db.database import SessionLocal
 from models.moulds_tpm import MouldsTpm
 from models.mould import Mould
 from schemas.moulds_tpm import MouldsTpmRead
-from app.images import save_upload_file
-from db.database import db_dependency
-from sqlalchemy import or_
+from app.images import save_upload_files
+from app.media_refs import sync_media_refs, drop_media_refs
+from app.responses import LIST_FORMAT_RESPONSES, ListAdapter, columns, list_format_dependency
+from db.database import async_db_dependency, async_read_db_dependency
+from sqlalchemy import or_, select
 
 router = APIRouter(prefix="/tpm", tags=["moulds_tpm"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+TPM_LIST = ListAdapter(MouldsTpmRead)
 
 @router.post("/", response_model=MouldsTpmRead)
 async def create_tpm(
@@ -34,9 +29,9 @@ async def create_tpm(
     extra_photo_1_path: Optional[str] = Form(None),
     extra_photo_2: Optional[UploadFile] = File(None),
     extra_photo_2_path: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
-    mould = db.query(Mould).filter(Mould.id == mould_id).first()
+    mould = await db.get(Mould, mould_id)
     if not mould:
         raise HTTPException(status_code=404, detail="Mould not found")
 
@@ -44,17 +39,12 @@ async def create_tpm(
     if changed:
         changed_date = datetime.strptime(changed, "%Y-%m-%d").date()
 
-    photo1_url = None
-    photo2_url = None
-    if extra_photo_1 is not None:
-        _, photo1_url = await save_upload_file(extra_photo_1, media_dir="media/tpm")
-    elif extra_photo_1_path:
-        photo1_url = extra_photo_1_path
+    uploaded = await save_upload_files(
+        {k: v for k, v in (("extra_photo_1", extra_photo_1), ("extra_photo_2", extra_photo_2)) if v is not None},
+    )
 
-    if extra_photo_2 is not None:
-        _, photo2_url = await save_upload_file(extra_photo_2, media_dir="media/tpm")
-    elif extra_photo_2_path:
-        photo2_url = extra_photo_2_path
+    photo1_url = uploaded.get("extra_photo_1") or extra_photo_1_path or None
+    photo2_url = uploaded.get("extra_photo_2") or extra_photo_2_path or None
 
     tpm = MouldsTpm(
         mould_id=mould_id,
@@ -69,8 +59,10 @@ async def create_tpm(
         extra_photo_2=photo2_url,
     )
     db.add(tpm)
-    db.commit()
-    db.refresh(tpm)
+    await db.flush()
+    await db.run_sync(sync_media_refs, "tpm", tpm.id, {"extra_photo_1": tpm.extra_photo_1, "extra_photo_2": tpm.extra_photo_2})
+    await db.commit()
+    await db.refresh(tpm)
     return tpm
 
 # @router.get("/", response_model=List[MouldsTpmRead])
@@ -80,30 +72,31 @@ async def create_tpm(
 #     return molds_tpms
 
 
-@router.get("/", response_model=List[MouldsTpmRead])
+@router.get("/", response_model=List[MouldsTpmRead], responses=LIST_FORMAT_RESPONSES)
 async def read_molds_tpms(
-    db: db_dependency,
+    db: async_read_db_dependency,
+    fmt: list_format_dependency,
     search: str | None = Query(None, description="Szukana forma"),
     skip: int = 0,
     limit: int = 1000,
 ):
-    query = db.query(MouldsTpm)
+    query = select(*columns(MouldsTpm))
 
     if search:
         like = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             MouldsTpm.mould.has(Mould.mould_number.ilike(like))
         )
 
-    molds = query.offset(skip).limit(limit).all()
-    return molds
+    rows = (await db.execute(query.offset(skip).limit(limit))).all()
+    return TPM_LIST.response(rows, fmt)
 
 @router.get("/{tpm_id}", response_model=MouldsTpmRead)
 async def read_tpm_one(
     tpm_id: int,
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
-    tpm = db.query(MouldsTpm).filter(MouldsTpm.id == tpm_id).first()
+    tpm = await db.get(MouldsTpm, tpm_id)
     if not tpm:
         raise HTTPException(status_code=404, detail="TPM entry not found")
     return tpm
@@ -125,9 +118,9 @@ async def update_tpm(
     extra_photo_2: Optional[UploadFile] = File(None),
     extra_photo_2_path: Optional[str] = Form(None),
 
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
-    tpm = db.query(MouldsTpm).filter(MouldsTpm.id == tpm_id).first()
+    tpm = await db.get(MouldsTpm, tpm_id)
     if not tpm:
         raise HTTPException(status_code=404, detail="TPM entry not found")
 
@@ -162,32 +155,36 @@ async def update_tpm(
     # --- zdjęcia ---
     # jeśli upload -> zapis, jeśli path -> ustaw/wyczyść, jeśli brak -> nie ruszaj
 
+    uploaded = await save_upload_files(
+        {k: v for k, v in (("extra_photo_1", extra_photo_1), ("extra_photo_2", extra_photo_2)) if v is not None},
+    )
+
     if extra_photo_1 is not None:
-        _, url1 = await save_upload_file(extra_photo_1, media_dir="media/tpm")
-        tpm.extra_photo_1 = url1
+        tpm.extra_photo_1 = uploaded["extra_photo_1"]
     elif extra_photo_1_path is not None:
         tpm.extra_photo_1 = extra_photo_1_path.strip() or None
 
     if extra_photo_2 is not None:
-        _, url2 = await save_upload_file(extra_photo_2, media_dir="media/tpm")
-        tpm.extra_photo_2 = url2
+        tpm.extra_photo_2 = uploaded["extra_photo_2"]
     elif extra_photo_2_path is not None:
         tpm.extra_photo_2 = extra_photo_2_path.strip() or None
 
     db.add(tpm)
-    db.commit()
-    db.refresh(tpm)
+    await db.run_sync(sync_media_refs, "tpm", tpm.id, {"extra_photo_1": tpm.extra_photo_1, "extra_photo_2": tpm.extra_photo_2})
+    await db.commit()
+    await db.refresh(tpm)
     return tpm
 
 @router.delete("/{tpm_id}", status_code=204)
 async def delete_tpm(
     tpm_id: int,
-    db: Session = Depends(get_db),
+    db: async_db_dependency = None,
 ):
-    tpm = db.query(MouldsTpm).filter(MouldsTpm.id == tpm_id).first()
+    tpm = await db.get(MouldsTpm, tpm_id)
     if not tpm:
         raise HTTPException(status_code=404, detail="TPM entry not found")
 
-    db.delete(tpm)
-    db.commit()
+    await db.run_sync(drop_media_refs, "tpm", [tpm.id])
+    await db.delete(tpm)
+    await db.commit()
     return
@@ -1,11 +1,13 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from db.database import db_dependency
+from app import response_cache
+from app.responses import ListAdapter, columns
+from db.database import db_dependency, read_db_dependency
 from models.service import ServiceWorkstation, ServiceLog
 from models.user import Users
 from routers.auth import user_required, admin_required, superadmin_required
@@ -20,6 +22,9 @@ from schemas.service import (
 
 router = APIRouter(prefix="/service", tags=["service"])
 
+# lista stanowisk – app/response_cache.py, przy braku w cache czytana z primary
+SERVICE_WORKSTATION_LIST = ListAdapter(ServiceWorkstationRead)
+
 
 def require_row(db: Session, model, row_id: int, label: str):
     obj = db.query(model).filter(model.id == row_id).first()
@@ -39,24 +44,29 @@ def commit_or_409(db: Session, detail: str):
 # ─── Service Workstations ───────────────────────────────────────────────────
 
 @router.get("/workstations", response_model=List[ServiceWorkstationRead])
-async def list_service_workstations(db: db_dependency):
-    return db.query(ServiceWorkstation).order_by(ServiceWorkstation.nazwa_stanowiska.asc()).all()
+def list_service_workstations(request: Request, db: db_dependency):
+    cached = response_cache.lookup(request, "service_workstations")
+    if cached.response is not None:
+        return cached.response
+    rows = db.query(*columns(ServiceWorkstation)).order_by(ServiceWorkstation.nazwa_stanowiska.asc()).all()
+    return cached.store(SERVICE_WORKSTATION_LIST.dump(rows))
 
 
 @router.post("/workstations", response_model=ServiceWorkstationRead, dependencies=[Depends(admin_required)])
-async def create_service_workstation(payload: ServiceWorkstationCreate, db: db_dependency):
+def create_service_workstation(payload: ServiceWorkstationCreate, db: db_dependency):
     data = payload.model_dump()
     if data.get("user_id") is not None:
         require_row(db, Users, data["user_id"], "User")
     obj = ServiceWorkstation(**data)
     db.add(obj)
     commit_or_409(db, "Service workstation already exists")
+    response_cache.invalidate("service_workstations")
     db.refresh(obj)
     return obj
 
 
 @router.put("/workstations/{workstation_id}", response_model=ServiceWorkstationRead, dependencies=[Depends(user_required)])
-async def update_service_workstation(workstation_id: int, payload: ServiceWorkstationUpdate, db: db_dependency):
+def update_service_workstation(workstation_id: int, payload: ServiceWorkstationUpdate, db: db_dependency):
     obj = require_row(db, ServiceWorkstation, workstation_id, "Service workstation")
     data = payload.model_dump(exclude_unset=True)
     if "user_id" in data and data["user_id"] is not None:
@@ -64,27 +74,29 @@ async def update_service_workstation(workstation_id: int, payload: ServiceWorkst
     for key, value in data.items():
         setattr(obj, key, value)
     commit_or_409(db, "Service workstation already exists")
+    response_cache.invalidate("service_workstations")
     db.refresh(obj)
     return obj
 
 
 @router.delete("/workstations/{workstation_id}", status_code=204, dependencies=[Depends(admin_required)])
-async def delete_service_workstation(workstation_id: int, db: db_dependency):
+def delete_service_workstation(workstation_id: int, db: db_dependency):
     obj = require_row(db, ServiceWorkstation, workstation_id, "Service workstation")
     db.delete(obj)
     commit_or_409(db, "Service workstation could not be deleted")
+    response_cache.invalidate("service_workstations")
     return
 
 
 # ─── Service Logs ───────────────────────────────────────────────────────────
 
 @router.get("/logs", response_model=List[ServiceLogRead])
-async def list_service_logs(db: db_dependency):
+def list_service_logs(db: read_db_dependency):
     return db.query(ServiceLog).order_by(ServiceLog.id.desc()).all()
 
 
 @router.post("/logs", response_model=ServiceLogRead, dependencies=[Depends(user_required)])
-async def create_service_log(payload: ServiceLogCreate, db: db_dependency):
+def create_service_log(payload: ServiceLogCreate, db: db_dependency):
     data = payload.model_dump()
     if not data.get("created_at"):
         data["created_at"] = datetime.now().isoformat()
@@ -96,7 +108,7 @@ async def create_service_log(payload: ServiceLogCreate, db: db_dependency):
 
 
 @router.put("/logs/{log_id}", response_model=ServiceLogRead, dependencies=[Depends(admin_required)])
-async def update_service_log(log_id: int, payload: ServiceLogUpdate, db: db_dependency):
+def update_service_log(log_id: int, payload: ServiceLogUpdate, db: db_dependency):
     obj = require_row(db, ServiceLog, log_id, "Service log")
     data = payload.model_dump(exclude_unset=True)
     for key, value in data.items():
@@ -107,7 +119,7 @@ async def update_service_log(log_id: int, payload: ServiceLogUpdate, db: db_depe
 
 
 @router.delete("/logs/{log_id}", status_code=204, dependencies=[Depends(admin_required)])
-async def delete_service_log(log_id: int, db: db_dependency):
+def delete_service_log(log_id: int, db: db_dependency):
     obj = require_row(db, ServiceLog, log_id, "Service log")
     db.delete(obj)
     commit_or_409(db, "Service log could not be deleted")
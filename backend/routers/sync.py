@@ -0,0 +1,77 @@
+# routers/sync.py
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app import sync
+from app.responses import FastJSONResponse, ListAdapter, columns
+from db.database import async_read_db_dependency
+from models.calendar import CalendarEntry
+from models.changeovers import Changeover
+from models.mould import Mould
+from models.moulds_tpm import MouldsTpm
+from models.production import Operation, Workstation
+from routers.changeovers import CHANGEOVER_LIST
+from routers.mould import HAS_OPEN_TPM, MOULD_LIST
+from routers.moulds_tpm import TPM_LIST
+from routers.production import OPERATION_LIST
+from schemas.calendar import CalendarRead
+from schemas.production import WorkstationRead
+from schemas.sync import SyncRead
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@dataclass(frozen=True)
+class Entity:
+    model: type
+    adapter: ListAdapter
+    query: Callable  # () -> select; /sync dokłada WHERE id IN (...)
+    orm: bool = False  # encje ORM (zagnieżdżone relacje w schemacie) zamiast wierszy
+
+
+# klucze = nazwy tabel z dziennika (SYNC_TABLES); wiersze w tych samych schematach co listy,
+# żeby klient podmieniał je 1:1
+ENTITIES = {
+    "workstations": Entity(Workstation, ListAdapter(WorkstationRead),
+                           lambda: select(Workstation).options(selectinload(Workstation.machine_group)), orm=True),
+    "operations": Entity(Operation, OPERATION_LIST, lambda: select(*columns(Operation))),
+    "changeovers": Entity(Changeover, CHANGEOVER_LIST, lambda: select(*columns(Changeover))),
+    "calendar_entries": Entity(CalendarEntry, ListAdapter(CalendarRead), lambda: select(*columns(CalendarEntry))),
+    "moulds": Entity(Mould, MOULD_LIST, lambda: select(*columns(Mould), HAS_OPEN_TPM)),
+    "moulds_tpm": Entity(MouldsTpm, TPM_LIST, lambda: select(*columns(MouldsTpm))),
+}
+
+
+@router.get("", response_model=SyncRead)
+async def sync_changes(
+    db: async_read_db_dependency,
+    since: Optional[str] = Query(None, description="token z poprzedniej odpowiedzi; bez niego tylko bieżący token"),
+):
+    position = sync.parse_token(since) if since else None
+    await sync.prune_if_due()
+
+    # pozycja przed odczytem dziennika – zmiana zapisana w międzyczasie przyjdzie najwyżej dwa razy
+    out = {"token": sync.make_token(await sync.current_position(db)), "changes": {}, "deleted": {}}
+    if position is None:
+        return FastJSONResponse(out)
+
+    changed = await sync.changed_since(db, position)
+    if changed is None:
+        raise HTTPException(status_code=410, detail="Too many changes – reload lists")
+
+    for name, ids in changed.items():
+        entity = ENTITIES.get(name)
+        if entity is None:
+            continue
+        result = await db.execute(entity.query().where(entity.model.id.in_(ids)))
+        rows = result.scalars().all() if entity.orm else result.all()
+        if rows:
+            out["changes"][name] = entity.adapter.dump_python(rows)
+        deleted = ids - {row.id for row in rows}
+        if deleted:
+            out["deleted"][name] = sorted(deleted)
+    return FastJSONResponse(out)
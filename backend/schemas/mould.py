@@ -1,7 +1,14 @@
 # schemas/mould.py
 from datetime import date
-from typing import Optional
-from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
+
+from app.images import photo_variants
+
+MOULD_PHOTO_FIELDS = (
+    "mould_photo", "product_photo", "hot_system_photo",
+    "extra_photo_1", "extra_photo_2", "extra_photo_3", "extra_photo_4", "extra_photo_5",
+)
 
 
 class MouldBase(BaseModel):
@@ -53,6 +60,46 @@ class MouldRead(MouldBase):
     extra_photo_4: Optional[str] = None
     extra_photo_5: Optional[str] = None
 
+    # miniatury (thumb/medium) obok oryginałów
+    @computed_field
+    @property
+    def photo_variants(self) -> Dict[str, Dict[str, str]]:
+        return photo_variants(self, MOULD_PHOTO_FIELDS)
+
 
 class MouldReadWithTpm(MouldRead):
     has_open_tpm: bool = False
+
+
+class MouldMaintenanceDue(MouldRead):
+    to_maint: int = 0
+
+
+class MouldCyclesItem(BaseModel):
+    mould_number: str
+    cycles: int = Field(..., gt=0)
+
+    @field_validator("mould_number")
+    @classmethod
+    def uppercase_mould_number(cls, v: str) -> str:
+        return v.strip().upper()
+
+
+class MouldCyclesIngest(BaseModel):
+    items: List[MouldCyclesItem] = Field(..., min_length=1, max_length=5000)
+    # próg procentowy (Mould.to_maint) – zwracamy formy, które go przekroczyły
+    threshold: int = Field(90, ge=1, le=1000)
+
+
+class MouldMaintAlert(BaseModel):
+    id: int
+    mould_number: str
+    from_maint_cycles: int
+    to_maint_cycles: int
+    to_maint: int
+
+
+class MouldCyclesResult(BaseModel):
+    updated: int
+    not_found: List[str] = []
+    crossed: List[MouldMaintAlert] = []
@@ -1,7 +1,9 @@
 # schemas/moulds_tpm.py
 from datetime import date
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from typing import Dict, Optional
+from pydantic import BaseModel, ConfigDict, computed_field
+
+from app.images import photo_variants
 
 class MouldsBookBase(BaseModel):
     sv: Optional[int] = 0
@@ -28,3 +30,8 @@ class MouldsBookRead(MouldsBookBase):
     extra_photo_1: Optional[str] = None
     extra_photo_2: Optional[str] = None
     opis_zgloszenia: Optional[str] = None
+
+    @computed_field
+    @property
+    def photo_variants(self) -> Dict[str, Dict[str, str]]:
+        return photo_variants(self, ("extra_photo_1", "extra_photo_2"))
@@ -1,7 +1,9 @@
 # schemas/moulds_tpm.py
 from datetime import date
-from typing import Optional
-from pydantic import BaseModel
+from typing import Dict, Optional
+from pydantic import BaseModel, computed_field
+
+from app.images import photo_variants
 
 class MouldsTpmBase(BaseModel):
     sv: Optional[int] = 0
@@ -25,5 +27,10 @@ class MouldsTpmRead(MouldsTpmBase):
     extra_photo_1: Optional[str] = None
     extra_photo_2: Optional[str] = None
 
+    @computed_field
+    @property
+    def photo_variants(self) -> Dict[str, Dict[str, str]]:
+        return photo_variants(self, ("extra_photo_1", "extra_photo_2"))
+
     class Config:
         model_config = {"from_attributes": True}
@@ -0,0 +1,11 @@
+# schemas/sync.py
+from typing import Any, Dict, List
+from pydantic import BaseModel
+
+
+class SyncRead(BaseModel):
+    token: str
+    # nazwa tabeli -> wiersze w schemacie jej listy (WorkstationRead, MouldReadWithTpm, ...)
+    changes: Dict[str, List[Dict[str, Any]]] = {}
+    # nazwa tabeli -> id usuniętych wierszy
+    deleted: Dict[str, List[int]] = {}
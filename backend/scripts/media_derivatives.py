@@ -0,0 +1,103 @@
+# scripts/media_derivatives.py
+"""
+Backfill miniatur (thumb/medium) dla zdjęć już zapisanych w media/.
+
+    cd backend
+    python -m scripts.media_derivatives            # tylko brakujące
+    python -m scripts.media_derivatives --force    # wygeneruj wszystkie od nowa
+
+Na końcu ustawia media_blobs.derivatives dla blobów z kompletem miniatur –
+dopiero wtedy API podaje ich URL-e w photo_variants (po migracji 0005
+wystarczy jedno uruchomienie, które tylko uzupełni flagi).
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import as_completed
+from pathlib import Path
+
+from app.images import (
+    IMAGE_EXTENSIONS,
+    MEDIA_ROOT,
+    DERIVATIVE_SIZES,
+    HAS_PILLOW,
+    derivative_name,
+    get_derivative_pool,
+    is_derivative,
+    make_derivatives,
+)
+from app.media_refs import mark_derivatives
+from db.database import SessionLocal
+
+
+def iter_originals(root: Path):
+    """Chodzi po drzewie katalogów leniwie (os.scandir), zwraca oryginały bez kompletu pochodnych."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except FileNotFoundError:
+            continue
+        names = {e.name for e in entries}
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+                continue
+            name = entry.name
+            if is_derivative(name) or Path(name).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            missing = any(derivative_name(name, size) not in names for size in DERIVATIVE_SIZES)
+            yield entry.path, missing
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate thumbnail/medium derivatives for existing media.")
+    parser.add_argument("--root", default=str(MEDIA_ROOT), help="media root (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="regenerate derivatives that already exist")
+    args = parser.parse_args(argv)
+
+    if not HAS_PILLOW:
+        print("Pillow is not installed – nothing to do.", file=sys.stderr)
+        return 1
+
+    pool = get_derivative_pool()
+    futures = {}
+    complete = []
+    for path, missing in iter_originals(Path(args.root)):
+        if not missing and not args.force:
+            complete.append(path)
+            continue
+        futures[pool.submit(make_derivatives, path, args.force)] = path
+    skipped = len(complete)
+
+    created = failed = 0
+    for fut in as_completed(futures):
+        try:
+            created += len(fut.result())
+        except Exception as exc:  # uszkodzony / nie-obraz – raportujemy i lecimy dalej
+            failed += 1
+            print(f"FAILED {futures[fut]}: {exc}", file=sys.stderr)
+        else:
+            complete.append(futures[fut])
+
+    pool.shutdown()
+
+    media_root = MEDIA_ROOT.resolve()
+    urls = []
+    for path in complete:
+        try:
+            urls.append(f"/media/{Path(path).resolve().relative_to(media_root).as_posix()}")
+        except ValueError:
+            pass  # --root poza MEDIA_ROOT – pliki bez URL-a w API
+    with SessionLocal() as db:
+        marked = mark_derivatives(db, urls)
+        db.commit()
+
+    print(f"originals processed: {len(futures)}, already complete: {skipped}, "
+          f"derivatives created: {created}, failed: {failed}, blobs marked: {marked}")
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# scripts/media_gc.py
+"""
+Sprzątanie osieroconych plików w media/ (zdjęcia podmienione / wyczyszczone
+w update_mould, update_tpm, update_book_entry albo po skasowanych rekordach).
+
+    cd backend
+    python -m scripts.media_gc --dry-run                 # tylko raport
+    python -m scripts.media_gc                           # przenieś do kwarantanny
+    python -m scripts.media_gc --action delete --grace-hours 72 --report gc.json
+
+Zbiór żywych plików budowany jest strumieniowo ze wszystkich kolumn ze
+zdjęciami (Mould, MouldsTpm, MouldsBook). Miniatury (.thumb/.medium) żyją
+tak długo jak ich oryginał. Pliki młodsze niż --grace-hours nie są ruszane
+(upload w toku albo zapis przed commitem).
+
+Zbiór żywych plików to migawka ze startu – tuż przed usunięciem /
+przeniesieniem każdy kandydat jest sprawdzany w bazie jeszcze raz, a potem
+ponownie jego mtime (upload trafiający w istniejący blob odświeża mtime
+przed commitem, więc po tym sprawdzeniu plik zostaje).
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import delete, exists, or_, select
+
+from app.images import BASE_DIR, MEDIA_ROOT, is_derivative
+from db.database import SessionLocal
+from models.media import MediaBlob
+from models.mould import Mould
+from models.moulds_book import MouldsBook
+from models.moulds_tpm import MouldsTpm
+import models.changeovers, models.changeovers_log, models.calendar, models.calendar_log  # noqa: F401 – relacje Mould muszą być zmapowane
+
+QUARANTINE_ROOT = BASE_DIR / "media_quarantine"  # poza /media – nie jest serwowane
+
+PHOTO_COLUMNS = [
+    Mould.mould_photo, Mould.product_photo, Mould.hot_system_photo,
+    Mould.extra_photo_1, Mould.extra_photo_2, Mould.extra_photo_3, Mould.extra_photo_4, Mould.extra_photo_5,
+    MouldsTpm.extra_photo_1, MouldsTpm.extra_photo_2,
+    MouldsBook.extra_photo_1, MouldsBook.extra_photo_2,
+]
+
+
+def _stem(rel: str) -> str:
+    head, _, name = rel.rpartition("/")
+    stem = name.split(".", 1)[0]
+    return f"{head}/{stem}" if head else stem
+
+
+def load_live_set(db, batch_size: int = 2000):
+    """Zwraca (ścieżki względem MEDIA_ROOT, ich 'stemy') – czytane partiami, bez ładowania obiektów ORM."""
+    live, stems = set(), set()
+    for column in PHOTO_COLUMNS:
+        rows = (
+            db.query(column)
+            .filter(column.isnot(None), column != "")
+            .execution_options(yield_per=batch_size)
+        )
+        for (url,) in rows:
+            if not url.startswith("/media/"):
+                continue
+            rel = url[len("/media/"):]
+            live.add(rel)
+            stems.add(_stem(rel))
+    return live, stems
+
+
+def iter_media_files(root: Path):
+    """Leniwy spacer po drzewie (os.scandir), zwraca (DirEntry, ścieżka względna)."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry, Path(entry.path).relative_to(root).as_posix()
+        except FileNotFoundError:
+            continue
+
+
+def is_live(rel: str, live: set, stems: set) -> bool:
+    if rel in live:
+        return True
+    name = rel.rsplit("/", 1)[-1]
+    if is_derivative(name):
+        return _stem(rel) in stems
+    return False
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def still_referenced(db, rel: str) -> bool:
+    """Świeże sprawdzenie jednego pliku (miniatura: czy jest jeszcze jej oryginał) – jedno zapytanie."""
+    name = rel.rsplit("/", 1)[-1]
+    if is_derivative(name):
+        pattern = f"/media/{_like_escape(_stem(rel))}.%"
+        conditions = [column.like(pattern, escape="\\") for column in PHOTO_COLUMNS]
+    else:
+        conditions = [column == f"/media/{rel}" for column in PHOTO_COLUMNS]
+    return bool(db.scalar(select(or_(*(exists().where(condition) for condition in conditions)))))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Remove or quarantine media files no row points at.")
+    parser.add_argument("--root", default=str(MEDIA_ROOT), help="media root (default: %(default)s)")
+    parser.add_argument("--action", choices=("quarantine", "delete"), default="quarantine")
+    parser.add_argument("--grace-hours", type=float, default=24.0, help="skip files newer than this")
+    parser.add_argument("--dry-run", action="store_true", help="only report, do not touch files")
+    parser.add_argument("--report", help="write a JSON report (orphan list) to this path")
+    args = parser.parse_args(argv)
+
+    root = Path(args.root)
+    cutoff = time.time() - args.grace_hours * 3600
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    db = SessionLocal()
+    try:
+        live, stems = load_live_set(db)
+
+        scanned = kept_live = kept_grace = kept_recheck = 0
+        orphans = []
+        orphan_bytes = 0
+        for entry, rel in iter_media_files(root):
+            scanned += 1
+            if is_live(rel, live, stems):
+                kept_live += 1
+                continue
+            st = entry.stat(follow_symlinks=False)
+            if st.st_mtime > cutoff:
+                kept_grace += 1
+                continue
+
+            # migawka mogła się zestarzeć – ponowny upload tej samej treści, nowy wiersz
+            if still_referenced(db, rel) or os.stat(entry.path, follow_symlinks=False).st_mtime > cutoff:
+                kept_recheck += 1
+                continue
+
+            orphans.append(rel)
+            orphan_bytes += st.st_size
+            if args.dry_run:
+                continue
+            if args.action == "delete":
+                os.unlink(entry.path)
+            else:
+                target = QUARANTINE_ROOT / stamp / rel
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(entry.path, target)
+
+        # bloby, których plików już nie ma, nie powinny wisieć w media_blobs
+        if not args.dry_run and orphans:
+            urls = [f"/media/{rel}" for rel in orphans]
+            for i in range(0, len(urls), 1000):
+                db.execute(delete(MediaBlob).where(MediaBlob.url.in_(urls[i:i + 1000])))
+            db.commit()
+    finally:
+        db.close()
+
+    summary = {
+        "root": str(root),
+        "action": "dry-run" if args.dry_run else args.action,
+        "grace_hours": args.grace_hours,
+        "live_urls": len(live),
+        "scanned": scanned,
+        "kept_live": kept_live,
+        "kept_grace": kept_grace,
+        "kept_recheck": kept_recheck,
+        "orphans": len(orphans),
+        "orphan_bytes": orphan_bytes,
+    }
+    if args.action == "quarantine" and not args.dry_run and orphans:
+        summary["quarantine_dir"] = str(QUARANTINE_ROOT / stamp)
+
+    for key, value in summary.items():
+        print(f"{key:>15}: {value}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fh:
+            json.dump({**summary, "files": orphans}, fh, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
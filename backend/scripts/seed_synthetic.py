@@ -0,0 +1,673 @@
+# scripts/seed_synthetic.py
+"""
+Generator syntetycznych danych produkcyjnych do testów wydajności.
+
+    cd backend
+    python -m scripts.seed_synthetic --scale small                 # ~20 tys. logów, kilka sekund
+    python -m scripts.seed_synthetic --scale large --seed 7        # ~10 mln logów, kilka minut
+    python -m scripts.seed_synthetic --scale medium --logs 3000000 --workstations 60
+    python -m scripts.seed_synthetic --scale small --truncate      # najpierw czyści tabele
+
+Wynik zależy tylko od (--seed, skali / liczności, --end) – ten sam zestaw
+daje te same wiersze. Rekordy mają prefiks SYN- / syn_, żeby nie pomylić ich
+z prawdziwymi.
+
+Logi operacji symulowane są per stanowisko i zmiana (6-14, 14-22, 22-6):
+łańcuch Markowa po statusach maszyn (Ustawianie -> Praca -> Przerwa /
+Awaria ...), zmiana kończy się statusem "Koniec zmiany", operator jest
+przypisany do zmiany, a stanowisko co kilka zmian przechodzi do kolejnej
+operacji ze swojej kolejki. Wszystkie tabele ładowane są przez COPY
+strumieniowo (bez trzymania milionów wierszy w pamięci); przy operation_logs
+klucze obce i indeksy zakładane są dopiero po załadowaniu.
+
+Działa też na SQLite (DATABASE_URL=sqlite:///..., db/sqlite.py) – zamiast
+COPY executemany, bez sekwencji i bez zdejmowania kluczy obcych. Schemat
+trzeba najpierw założyć (start aplikacji albo db.schema.create_sqlite_schema).
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from app import settings
+from db.database import engine
+
+SCALES = {
+    "small": dict(
+        workstations=10, users=20, orders=200, moulds=300, tpm=900, book=1_200,
+        changeovers=500, calendar=300, days=30, logs=20_000,
+    ),
+    "medium": dict(
+        workstations=40, users=80, orders=5_000, moulds=2_000, tpm=6_000, book=8_000,
+        changeovers=5_000, calendar=3_000, days=365, logs=1_000_000,
+    ),
+    "large": dict(
+        workstations=120, users=300, orders=50_000, moulds=5_000, tpm=20_000, book=30_000,
+        changeovers=20_000, calendar=10_000, days=3 * 365, logs=10_000_000,
+    ),
+}
+
+# status_no -> (nazwa, kolor); 1-3 to praca (analytics.WORK_STATUS_NOS), 5-7 bez timera (production._NO_TIMER_NOS)
+STATUSES = {
+    1: ("Praca z operatorem", "#22c55e"),
+    2: ("Praca bez operatora", "#16a34a"),
+    3: ("Ustawianie", "#eab308"),
+    4: ("Awaria", "#ef4444"),
+    5: ("Przerwa", "#94a3b8"),
+    6: ("Koniec zmiany", "#64748b"),
+    7: ("Brak zlecenia", "#a855f7"),
+}
+END_SHIFT_NO = 6
+
+# następny status: (status_no, prawdopodobieństwo)
+TRANSITIONS = {
+    1: ((2, 0.25), (5, 0.35), (4, 0.08), (3, 0.17), (7, 0.15)),
+    2: ((1, 0.60), (4, 0.15), (5, 0.10), (3, 0.15)),
+    3: ((1, 0.75), (2, 0.10), (4, 0.10), (5, 0.05)),
+    4: ((3, 0.50), (1, 0.40), (7, 0.10)),
+    5: ((1, 0.80), (2, 0.10), (3, 0.10)),
+    7: ((3, 0.70), (5, 0.30)),
+}
+# względna długość przebywania w statusie (praca trwa dłużej niż przerwa)
+DWELL = {1: 3.0, 2: 2.0, 3: 1.0, 4: 0.8, 5: 0.4, 7: 0.6}
+
+SHIFT_STARTS = (6, 14, 22)
+SHIFT_MINUTES = 480
+
+MACHINE_GROUPS = ("Wtryskarki", "CNC", "Erodowanie", "Montaż")
+ORDER_TYPES = (("PROD", "Produkcja"), ("NARZ", "Narzędziownia"), ("REM", "Remont"))
+PRODUCTS = ("obudowa", "pokrywa", "uchwyt", "korek", "zaślepka", "tuleja", "kratka", "pojemnik", "listwa", "klips")
+TPM_ISSUES = (
+    "wyciek z gorącego kanału", "zadzior na linii podziału", "uszkodzony wypychacz", "nieszczelny obieg wody",
+    "zużyta płyta formująca", "brak wypełnienia gniazda", "pęknięty insert", "zatarta prowadnica",
+)
+CAVITIES = ("1", "2", "4", "8", "16")
+
+TRUNCATE_TABLES = (
+    "operation_logs", "operations", "production_tasks", "production_orders", "workstations",
+    "changeovers_log", "changeovers", "calendar_log", "calendar_entries",
+    "mouldbase_mouldsbook", "moulds_tpm", "moulds",
+    # na końcu – na SQLite DELETE powyżej dopisuje do dziennika przez triggery
+    "sync_changes",
+)
+
+
+class CopyStream(io.TextIOBase):
+    """Plik tylko do odczytu nad generatorem linii CSV – dla cursor.copy_expert."""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ""
+        self.rows = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            try:
+                line = next(self._lines)
+            except StopIteration:
+                break
+            chunks.append(line)
+            length += len(line)
+            self.rows += 1
+        data = "".join(chunks)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def csv_lines(rows):
+    """Wiersze (krotki) -> linie CSV; None = NULL (puste pole bez cudzysłowów)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class SqliteCursor:
+    """Kursor sqlite3 z interfejsem używanym tutaj od psycopg2 (%s zamiast ?)."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql: str, params=()):
+        self._cur.execute(sql.replace("%s", "?").replace("%%", "%"), params)
+
+    def executemany(self, sql: str, rows):
+        self._cur.executemany(sql, rows)
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    @property
+    def rowcount(self) -> int:
+        # wiersze samego INSERT/UPDATE/DELETE – bez zapisów triggerów (total_changes je liczy)
+        return self._cur.rowcount
+
+
+def sqlite_value(value: str):
+    # semantyka COPY ... csv: puste pole = NULL; bool z csv.writer to "True" / "False"
+    if value == "":
+        return None
+    return {"True": 1, "False": 0}.get(value, value)
+
+
+def copy_rows(cur, table: str, columns, lines) -> int:
+    if isinstance(cur, SqliteCursor):
+        rows = ([sqlite_value(v) for v in row] for row in csv.reader(lines))
+        placeholders = ", ".join("?" * len(columns))
+        cur.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+        return cur.rowcount
+    stream = CopyStream(lines)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", stream, size=1 << 16)
+    return stream.rows
+
+
+def next_id(cur, table: str) -> int:
+    cur.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    return cur.fetchone()[0]
+
+
+def sync_sequence(cur, table: str) -> None:
+    if isinstance(cur, SqliteCursor):
+        return  # SQLite bierze kolejne id z MAX(rowid)
+    cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), GREATEST((SELECT MAX(id) FROM {table}), 1))")
+
+
+@contextmanager
+def bulk_load(cur, table: str):
+    """
+    Na czas COPY zdejmuje klucze obce i indeksy pomocnicze tabeli, potem
+    zakłada je jednym przebiegiem (dużo szybciej niż sprawdzanie FK wiersz
+    po wierszu). Wszystko w tej samej transakcji – błąd = rollback całości.
+    """
+    if isinstance(cur, SqliteCursor):
+        yield  # SQLite nie ma ALTER TABLE ... DROP CONSTRAINT
+        return
+    cur.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        (table,),
+    )
+    foreign_keys = cur.fetchall()
+    cur.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass AND NOT x.indisprimary AND NOT x.indisunique
+        """,
+        (table,),
+    )
+    indexes = cur.fetchall()
+    for name, _ in foreign_keys:
+        cur.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+    for name, _ in indexes:
+        cur.execute(f'DROP INDEX "{name}"')
+    yield
+    for _, definition in indexes:
+        cur.execute(definition)
+    for name, definition in foreign_keys:
+        cur.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+
+
+def ts(value: datetime) -> str:
+    return value.isoformat(" ", "seconds")
+
+
+class Generator:
+    def __init__(self, cur, rng: random.Random, cfg: dict, end: date):
+        self.cur = cur
+        self.rng = rng
+        self.cfg = cfg
+        self.end = datetime.combine(end, datetime.min.time())
+        self.start = self.end - timedelta(days=cfg["days"])
+
+    def random_moment(self) -> datetime:
+        span = (self.end - self.start).total_seconds()
+        return self.start + timedelta(seconds=self.rng.random() * span)
+
+    def weighted_ids(self, ids):
+        # część form / stanowisk ma dużo więcej zgłoszeń niż reszta (rozkład "długiego ogona")
+        weights = [self.rng.random() ** 3 for _ in ids]
+        total, acc, cum = sum(weights), 0.0, []
+        for w in weights:
+            acc += w / total
+            cum.append(acc)
+        return lambda: self.rng.choices(ids, cum_weights=cum)[0]
+
+    # ---------- słowniki ----------
+
+    def ensure_reference_data(self):
+        cur = self.cur
+        cur.execute("SELECT status_no, id FROM machine_statuses")
+        existing = dict(cur.fetchall())
+        for no, (name, color) in STATUSES.items():
+            if no not in existing:
+                cur.execute(
+                    "INSERT INTO machine_statuses (status_no, name, color) VALUES (%s, %s, %s) RETURNING id",
+                    (no, name, color),
+                )
+                existing[no] = cur.fetchone()[0]
+        self.status_ids = existing
+
+        self.group_ids = []
+        for name in MACHINE_GROUPS:
+            cur.execute(
+                "INSERT INTO machine_groups (name) VALUES (%s) ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name RETURNING id",
+                (name,),
+            )
+            self.group_ids.append(cur.fetchone()[0])
+
+        self.order_type_ids = []
+        for code, name in ORDER_TYPES:
+            cur.execute(
+                "INSERT INTO order_types (code, name) VALUES (%s, %s) ON CONFLICT (code) DO UPDATE SET code = EXCLUDED.code RETURNING id",
+                (code, name),
+            )
+            self.order_type_ids.append(cur.fetchone()[0])
+        return len(self.status_ids), len(self.group_ids), len(self.order_type_ids)
+
+    def users(self):
+        from routers.auth import get_bcrypt_context
+
+        # jeden hash dla wszystkich – bcrypt per użytkownik to minuty przy dużej skali
+        hashed = get_bcrypt_context().hash("synthetic")
+        first = next_id(self.cur, "users")
+        n = self.cfg["users"]
+        self.user_ids = list(range(first, first + n))
+        self.usernames = [f"syn_user_{i:04d}" for i in range(1, n + 1)]
+        rows = (
+            (uid, name, hashed, "synthetic", "admin" if i % 25 == 0 else "user")
+            for i, (uid, name) in enumerate(zip(self.user_ids, self.usernames))
+        )
+        return copy_rows(self.cur, "users", ("id", "username", "hashed_password", "author", "role"), csv_lines(rows))
+
+    # ---------- formy ----------
+
+    def moulds(self):
+        rng = self.rng
+        first = next_id(self.cur, "moulds")
+        n = self.cfg["moulds"]
+        self.mould_ids = list(range(first, first + n))
+        self.changeable_mould_ids = []
+
+        def rows():
+            for i, mid in enumerate(self.mould_ids, start=1):
+                to_maint = rng.choice((50_000, 100_000, 150_000, 250_000))
+                changeable = rng.random() < 0.4
+                if changeable:
+                    self.changeable_mould_ids.append(mid)
+                yield (
+                    mid, f"SYN-F{i:05d}", f"{rng.choice(PRODUCTS)} {rng.randint(100, 999)}",
+                    (self.start.date() - timedelta(days=rng.randint(0, 15 * 365))).isoformat(),
+                    rng.choice(("Lamela", "Lamela", "Lamela", "Kooperant")), changeable,
+                    rng.choice(CAVITIES), f"{rng.randint(80, 4000)} kg",
+                    rng.randint(0, 5_000_000), to_maint, int(to_maint * rng.betavariate(2, 2.5)),
+                    rng.choices((0, 1, 2, 3), weights=(60, 15, 5, 20))[0],
+                    rng.choices((0, 1, 2, 3, 4, 5), weights=(75, 8, 4, 3, 5, 5))[0],
+                    None,
+                )
+
+        return copy_rows(self.cur, "moulds", (
+            "id", "mould_number", "product", "released", "company", "czy_przezbrajalna",
+            "num_of_cavities", "tool_weight", "total_cycles", "to_maint_cycles", "from_maint_cycles",
+            "place", "status", "notes",
+        ), csv_lines(rows()))
+
+    def tpm(self):
+        rng = self.rng
+        pick = self.weighted_ids(self.mould_ids)
+        recent = self.end - timedelta(days=30)
+
+        def rows():
+            for _ in range(self.cfg["tpm"]):
+                created = self.random_moment()
+                if created > recent:
+                    status = rng.choices((0, 1, 2, 3), weights=(45, 35, 15, 5))[0]
+                else:
+                    status = rng.choices((2, 3), weights=(92, 8))[0]
+                changed = created + timedelta(days=rng.randint(0, 20)) if status >= 2 else None
+                yield (
+                    pick(), rng.randint(0, 9999), created.date().isoformat(), rng.choice((0, 0, 1, 2)),
+                    rng.choice(TPM_ISSUES), rng.randint(0, 999), status,
+                    changed.date().isoformat() if changed else None, rng.choice(self.usernames),
+                )
+
+        return copy_rows(self.cur, "moulds_tpm", (
+            "mould_id", "sv", "created", "tpm_time_type", "opis_zgloszenia", "ido", "status", "changed", "author",
+        ), csv_lines(rows()))
+
+    def book(self):
+        rng = self.rng
+        pick = self.weighted_ids(self.mould_ids)
+
+        def rows():
+            for _ in range(self.cfg["book"]):
+                created = self.random_moment()
+                tpm_type = rng.choices((0, 1, 2), weights=(35, 40, 25))[0]
+                duration = int(rng.expovariate(1 / (240 if tpm_type == 0 else 90))) + 5
+                yield (
+                    pick(), rng.randint(0, 9999), created.date().isoformat(), duration,
+                    int(duration * rng.random()), tpm_type, 1 if created < self.end - timedelta(days=14) else rng.randint(0, 1),
+                    rng.choice(TPM_ISSUES), rng.randint(0, 999),
+                )
+
+        return copy_rows(self.cur, "mouldbase_mouldsbook", (
+            "mould_id_id", "sv", "created", "czas_trwania", "czas_wylaczenia", "tpm_type", "status",
+            "opis_zgloszenia", "ido",
+        ), csv_lines(rows()))
+
+    # ---------- historia z JSONB ----------
+
+    def _history(self, table, log_table, fk, n, make_entry, mutate, toggle, author_field):
+        """
+        Encje + ich log z JSONB (old_data / new_data) w kształcie dump_* z routerów:
+        CREATE, 0-4 x UPDATE, na końcu ewentualnie przełączenie flagi `toggle`
+        = (akcja, pole, wartość początkowa).
+        """
+        rng = self.rng
+        action, field, initial = toggle
+        first = next_id(self.cur, table)
+        entries, logs = [], []
+        for eid in range(first, first + n):
+            entry = make_entry(eid)
+            moment = datetime.fromisoformat(entry["created"])
+            snapshot = dict(entry, **{field: initial})
+            logs.append((eid, "CREATE", None, json.dumps(snapshot), entry[author_field], ts(moment)))
+            for _ in range(rng.choices((0, 1, 2, 3, 4), weights=(30, 30, 20, 12, 8))[0]):
+                moment += timedelta(minutes=rng.randint(10, 60 * 24 * 5))
+                old = json.dumps(snapshot)
+                mutate(snapshot)
+                snapshot["updated"] = ts(moment)
+                logs.append((eid, "UPDATE", old, json.dumps(snapshot), rng.choice(self.usernames), ts(moment)))
+            if entry[field] != initial:
+                moment += timedelta(minutes=rng.randint(10, 60 * 24 * 3))
+                old = json.dumps(snapshot)
+                snapshot[field] = entry[field]
+                snapshot["updated"] = ts(moment)
+                logs.append((eid, action, old, json.dumps(snapshot), rng.choice(self.usernames), ts(moment)))
+            entry.update({k: v for k, v in snapshot.items() if k in entry})
+            entries.append(entry)
+
+        count = copy_rows(self.cur, table, tuple(entries[0]) if entries else (), csv_lines(e.values() for e in entries))
+        logged = copy_rows(self.cur, log_table, (fk, "action", "old_data", "new_data", "updated_by", "created"), csv_lines(logs))
+        return count, logged
+
+    def changeovers(self):
+        rng = self.rng
+        moulds = self.changeable_mould_ids or self.mould_ids
+
+        def make_entry(eid):
+            created = self.random_moment()
+            available = created + timedelta(hours=rng.randint(1, 24 * 7))
+            return {
+                "id": eid,
+                "from_mould_id": rng.choice(moulds),
+                "to_mould_id": rng.choice(moulds),
+                "available_date": ts(available),
+                "needed_date": ts(available + timedelta(hours=rng.randint(2, 48))),
+                "czy_wykonano": available < self.end - timedelta(days=2) and rng.random() < 0.9,
+                "updated_by": rng.choice(self.usernames),
+                "created": ts(created),
+                "updated": ts(created),
+            }
+
+        def mutate(snapshot):
+            needed = datetime.fromisoformat(snapshot["needed_date"]) + timedelta(hours=rng.randint(-12, 24))
+            snapshot["needed_date"] = ts(needed)
+            snapshot["updated_by"] = rng.choice(self.usernames)
+
+        return self._history("changeovers", "changeovers_log", "changeover_id", self.cfg["changeovers"],
+                             make_entry, mutate, ("TOGGLE_DONE", "czy_wykonano", False), "updated_by")
+
+    def calendar(self):
+        rng = self.rng
+        comments = ("przegląd", "modyfikacja", "kooperacja", "próby", None)
+
+        def make_entry(eid):
+            created = self.random_moment()
+            start = created + timedelta(days=rng.randint(0, 30))
+            return {
+                "id": eid,
+                "mould_id": rng.choice(self.mould_ids),
+                "start_date": ts(start),
+                "end_date": ts(start + timedelta(days=rng.randint(1, 10))),
+                "comment": rng.choice(comments),
+                "is_active": start > self.end - timedelta(days=10),
+                "created_by": rng.choice(self.usernames),
+                "created": ts(created),
+                "updated": ts(created),
+            }
+
+        def mutate(snapshot):
+            snapshot["comment"] = rng.choice(comments)
+
+        return self._history("calendar_entries", "calendar_log", "calendar_entry_id", self.cfg["calendar"],
+                             make_entry, mutate, ("TOGGLE_STATUS", "is_active", True), "created_by")
+
+    # ---------- produkcja ----------
+
+    def workstations(self):
+        rng = self.rng
+        first = next_id(self.cur, "workstations")
+        n = self.cfg["workstations"]
+        self.workstation_ids = list(range(first, first + n))
+        rows = (
+            (wid, f"SYN-M{i:03d}", f"MPK-{rng.randint(100, 999)}", rng.choice(self.group_ids))
+            for i, wid in enumerate(self.workstation_ids, start=1)
+        )
+        return copy_rows(self.cur, "workstations", ("id", "name", "cost_center", "machine_group_id"), csv_lines(rows))
+
+    def orders(self):
+        """Zlecenia -> zadania -> operacje; każda operacja ma stanowisko, kolejka per stanowisko."""
+        rng = self.rng
+        order_first = next_id(self.cur, "production_orders")
+        task_first = next_id(self.cur, "production_tasks")
+        op_first = next_id(self.cur, "operations")
+        tasks, operations = [], []
+        self.queues = {wid: [] for wid in self.workstation_ids}
+        self.operation_task = {}
+        done_before = self.end - timedelta(days=max(1, self.cfg["days"] // 20))
+
+        def order_rows():
+            task_id, op_id = task_first, op_first
+            for i in range(self.cfg["orders"]):
+                oid = order_first + i
+                created = self.start + (self.end - self.start) * (i / max(1, self.cfg["orders"]))
+                done = created < done_before
+                yield (oid, f"SYN-Z{i + 1:07d}", rng.choice(self.order_type_ids), done,
+                       f"Zespół {rng.randint(1, 6)}", f"{rng.choice(PRODUCTS)} {rng.randint(100, 999)}")
+                for _ in range(rng.randint(1, 4)):
+                    tasks.append((task_id, oid, f"D-{rng.randint(10000, 99999)}", rng.choice(PRODUCTS), done,
+                                  rng.choice((None, 10, 50, 100, 500, 1000))))
+                    for no in range(1, rng.randint(1, 5) + 1):
+                        wid = rng.choice(self.workstation_ids)
+                        operations.append((op_id, task_id, no * 10, f"Operacja {no * 10}", ts(created),
+                                           rng.choice((None, 30, 60, 120, 240, 480)), done, True, done, 0, 0, no, wid))
+                        self.queues[wid].append(op_id)
+                        self.operation_task[op_id] = task_id
+                        op_id += 1
+                    task_id += 1
+
+        count = copy_rows(self.cur, "production_orders",
+                          ("id", "order_number", "order_type_id", "is_done", "team", "product_name"), csv_lines(order_rows()))
+        copy_rows(self.cur, "production_tasks",
+                  ("id", "order_id", "detail_number", "detail_name", "is_done", "quantity"), csv_lines(tasks))
+        copy_rows(self.cur, "operations", (
+            "id", "task_id", "operation_no", "description", "created_at", "suggested_duration_min",
+            "is_done", "is_released", "is_started", "duration_total_min", "duration_shift_min",
+            "sort_order", "workstation_id",
+        ), csv_lines(operations))
+        for wid, queue in self.queues.items():
+            if not queue:  # stanowisko bez operacji – dostaje cudzą, żeby mogło logować
+                queue.append(rng.choice(operations)[0])
+        return count, len(tasks), len(operations)
+
+    def shift_statuses(self, events: int, new_operation: bool):
+        """Sekwencja (status_no, minuta od początku zmiany) dla jednej zmiany."""
+        rng = self.rng
+        status = 3 if new_operation else rng.choices((1, 3, 7), weights=(70, 20, 10))[0]
+        seq = [status]
+        for _ in range(events - 2):
+            choices, weights = zip(*TRANSITIONS[status])
+            status = rng.choices(choices, weights=weights)[0]
+            seq.append(status)
+
+        # czasy przebywania ~ Exp, skalowane do długości zmiany (ostatnie 0-10 min = koniec zmiany)
+        dwell = [rng.expovariate(1.0) * DWELL[s] for s in seq]
+        scale = (SHIFT_MINUTES - 15) / (sum(dwell) or 1.0)
+        minute = rng.uniform(0, 5)
+        out = []
+        for s, d in zip(seq, dwell):
+            out.append((s, minute))
+            minute += d * scale
+        out.append((END_SHIFT_NO, SHIFT_MINUTES - rng.uniform(0, 10)))
+        return out
+
+    def operation_logs(self, progress=None):
+        rng = self.rng
+        cfg = self.cfg
+        shifts = cfg["days"] * len(SHIFT_STARTS)
+        per_shift = max(2, round(cfg["logs"] / max(1, cfg["workstations"] * shifts)))
+        status_ids = self.status_ids
+        self.final_state = {}
+
+        state = {wid: {"pos": rng.randrange(len(q)), "left": rng.randint(1, 6)} for wid, q in self.queues.items()}
+        shift_bases = []
+        for day in range(cfg["days"]):
+            base = self.start + timedelta(days=day)
+            for hour in SHIFT_STARTS:
+                shift_bases.append(base + timedelta(hours=hour))
+
+        def lines():
+            produced = 0
+            for shift_no, shift_start in enumerate(shift_bases):
+                for wid in self.workstation_ids:
+                    st = state[wid]
+                    queue = self.queues[wid]
+                    new_operation = st["left"] == 0
+                    if new_operation:
+                        st["pos"] = (st["pos"] + 1) % len(queue)
+                        st["left"] = rng.randint(1, 6)
+                    st["left"] -= 1
+                    op_id = queue[st["pos"]]
+                    user_id = rng.choice(self.user_ids) if self.user_ids else ""
+                    events = max(2, int(rng.gauss(per_shift, math.sqrt(per_shift))))
+                    last = None
+                    for status_no, minute in self.shift_statuses(events, new_operation):
+                        created = shift_start + timedelta(minutes=minute)
+                        yield f"{op_id},{status_ids[status_no]},{wid},{user_id},,{ts(created)}\n"
+                        last = status_no
+                    produced += events
+                    self.final_state[wid] = (status_ids[last], op_id, user_id or None)
+                if progress and shift_no % 300 == 0:
+                    progress(produced)
+
+        with bulk_load(self.cur, "operation_logs"):
+            return copy_rows(self.cur, "operation_logs",
+                             ("operation_id", "status_id", "workstation_id", "user_id", "note", "created_at"), lines())
+
+    def finish_workstations(self):
+        for wid, (status_id, op_id, user_id) in self.final_state.items():
+            self.cur.execute(
+                "UPDATE workstations SET status_id = %s, current_operation_id = %s, current_task_id = %s, user_id = %s WHERE id = %s",
+                (status_id, op_id, self.operation_task.get(op_id), user_id, wid),
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fill the database with deterministic synthetic production data.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(),
+                        help="last day of generated history (default: today; fix it for reproducible runs)")
+    for key in SCALES["small"]:
+        parser.add_argument(f"--{key}", type=int, help=f"override {key} of the chosen scale")
+    parser.add_argument("--truncate", action="store_true",
+                        help="TRUNCATE moulds, production and history tables, the sync journal (and syn_ users) first")
+    args = parser.parse_args(argv)
+
+    cfg = dict(SCALES[args.scale])
+    for key in cfg:
+        if getattr(args, key) is not None:
+            cfg[key] = getattr(args, key)
+
+    raw = engine.raw_connection()
+    try:
+        if engine.dialect.name == "sqlite":
+            cur = SqliteCursor(raw.cursor())
+            if args.truncate:
+                for table in TRUNCATE_TABLES:
+                    cur.execute(f"DELETE FROM {table}")
+        else:
+            cur = raw.cursor()
+            cur.execute("SET statement_timeout = 0")  # COPY milionów wierszy > DB_STATEMENT_TIMEOUT_MS
+            if args.truncate:
+                cur.execute(f"TRUNCATE {', '.join(TRUNCATE_TABLES)} RESTART IDENTITY CASCADE")
+        if args.truncate:
+            cur.execute("DELETE FROM users WHERE username LIKE 'syn\\_user\\_%%' ESCAPE '\\'")
+        else:
+            cur.execute("SELECT 1 FROM moulds WHERE mould_number LIKE 'SYN-%%' LIMIT 1")
+            if cur.fetchone():
+                print("Synthetic rows already present – run again with --truncate.", file=sys.stderr)
+                return 1
+
+        gen = Generator(cur, random.Random(args.seed), cfg, args.end)
+        summary = {}
+
+        def step(name, fn, *a):
+            t0 = time.perf_counter()
+            result = fn(*a)
+            summary[name] = (result, round(time.perf_counter() - t0, 2))
+            print(f"\r{name:>16}: {result}  ({summary[name][1]} s)".ljust(48), flush=True)
+
+        def progress(rows):
+            print(f"{'':>16}  ... {rows:,} logs", end="\r", flush=True)
+
+        step("reference", gen.ensure_reference_data)
+        step("users", gen.users)
+        step("moulds", gen.moulds)
+        step("moulds_tpm", gen.tpm)
+        step("moulds_book", gen.book)
+        step("changeovers", gen.changeovers)
+        step("calendar", gen.calendar)
+        step("workstations", gen.workstations)
+        step("orders/tasks/ops", gen.orders)
+        step("operation_logs", gen.operation_logs, progress)
+        gen.finish_workstations()
+
+        for table in ("users", "moulds", "moulds_tpm", "mouldbase_mouldsbook", "changeovers", "changeovers_log",
+                      "calendar_entries", "calendar_log", "workstations", "production_orders",
+                      "production_tasks", "operations", "operation_logs"):
+            sync_sequence(cur, table)
+        raw.commit()
+
+        t0 = time.perf_counter()
+        cur.execute("ANALYZE")
+        raw.commit()
+        print(f"{'analyze':>16}: ({round(time.perf_counter() - t0, 2)} s)")
+    finally:
+        raw.close()
+
+    print(f"scale={args.scale} seed={args.seed} end={args.end} db={settings.DATABASE_URL.rsplit('@', 1)[-1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())